@@ -2,32 +2,118 @@
 
 from __future__ import annotations
 
+import threading
+import time
+from bisect import bisect_right
+from collections.abc import Iterable
+from dataclasses import dataclass
 from uuid import UUID
-from decimal import Decimal
 
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
 from django.db.models import QuerySet
 
 from academics.models import GradePolicy
 from shared.base_service import BaseService
 from shared.exceptions import ConflictException, NotFoundException
 
+GRADE_TABLE_VERSION_KEY = "grading:policy_version"
+UNGRADED = ("N/A", 0.0)
+
+
+@dataclass(frozen=True)
+class GradeTable:
+    """Active grade policies compiled into boundary arrays sorted by min percentage."""
+
+    version: int
+    mins: tuple[float, ...]
+    maxs: tuple[float, ...]
+    labels: tuple[str, ...]
+    points: tuple[float, ...]
+
+    @classmethod
+    def compile(cls, policies: Iterable[GradePolicy], version: int) -> GradeTable:
+        ordered = sorted(policies, key=lambda p: p.min_percentage)
+        return cls(
+            version=version,
+            mins=tuple(float(p.min_percentage) for p in ordered),
+            maxs=tuple(float(p.max_percentage) for p in ordered),
+            labels=tuple(p.grade_label for p in ordered),
+            points=tuple(float(p.grade_point) for p in ordered),
+        )
+
+    def lookup(self, percentage: float) -> tuple[str, float]:
+        """Return (label, point) for the highest band whose range contains percentage."""
+        pct = float(percentage)
+        i = bisect_right(self.mins, pct) - 1
+        while i >= 0:
+            if pct <= self.maxs[i]:
+                return self.labels[i], self.points[i]
+            i -= 1
+        return UNGRADED
+
+
+_table: GradeTable | None = None
+_table_checked_at = 0.0
+_table_lock = threading.Lock()
+
+
+def _shared_version() -> int:
+    return cache.get_or_set(GRADE_TABLE_VERSION_KEY, 1, timeout=None)
+
+
+def get_grade_table() -> GradeTable:
+    """Return the process-wide grade table, recompiling when the policy version moves.
+
+    The shared version lives in the Django cache so every worker process notices
+    policy edits; it is re-read at most every ``GRADE_TABLE_CHECK_INTERVAL`` seconds.
+    """
+    global _table, _table_checked_at
+
+    now = time.monotonic()
+    interval = getattr(settings, "GRADE_TABLE_CHECK_INTERVAL", 30)
+    table = _table
+    if table is not None and now - _table_checked_at < interval:
+        return table
+
+    with _table_lock:
+        version = _shared_version()
+        if _table is None or _table.version != version:
+            policies = GradePolicy.objects.filter(is_active=True)
+            _table = GradeTable.compile(policies, version)
+        _table_checked_at = now
+        return _table
+
+
+def invalidate_grade_table() -> None:
+    """Bump the shared policy version and drop this process's compiled table."""
+    global _table
+
+    try:
+        cache.incr(GRADE_TABLE_VERSION_KEY)
+    except ValueError:
+        cache.set(GRADE_TABLE_VERSION_KEY, 2, timeout=None)
+    with _table_lock:
+        _table = None
+
 
 class GradingService(BaseService):
     """Business logic for grading policy management."""
 
     def calculate_grade(self, percentage: float) -> tuple[str, float]:
         """Calculate grade label and grade point from percentage."""
-        policies = GradePolicy.objects.filter(is_active=True).order_by("-min_percentage")
-        for policy in policies:
-            if policy.min_percentage <= Decimal(str(percentage)) <= policy.max_percentage:
-                self.log.info(
-                    "grade.calculated",
-                    percentage=percentage,
-                    label=policy.grade_label,
-                )
-                return policy.grade_label, float(policy.grade_point)
-        self.log.warning("grade.not_found", percentage=percentage)
-        return "N/A", 0.0
+        grade = get_grade_table().lookup(percentage)
+        if grade is UNGRADED:
+            self.log.debug("grade.not_found", percentage=percentage)
+        return grade
+
+    def calculate_grades(
+        self, percentages: Iterable[float]
+    ) -> list[tuple[str, float]]:
+        """Calculate grades for many percentages against one table snapshot."""
+        lookup = get_grade_table().lookup
+        return [lookup(p) for p in percentages]
 
     def get_all_policies(self) -> QuerySet[GradePolicy]:
         return GradePolicy.objects.filter(is_active=True).order_by("display_order")
@@ -47,13 +133,16 @@ class GradingService(BaseService):
             existing.grade_point = grade_point
             existing.display_order = display_order
             existing.save()
+            transaction.on_commit(invalidate_grade_table)
             self.log.info("grade_policy.update", grade_label=grade_label)
             return existing
         self.log.info("grade_policy.create", grade_label=grade_label)
-        return GradePolicy.objects.create(
+        policy = GradePolicy.objects.create(
             grade_label=grade_label,
             min_percentage=min_percentage,
             max_percentage=max_percentage,
             grade_point=grade_point,
             display_order=display_order,
         )
+        transaction.on_commit(invalidate_grade_table)
+        return policy
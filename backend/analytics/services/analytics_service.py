@@ -6,13 +6,13 @@ from uuid import UUID
 from decimal import Decimal
 
 import structlog
-from django.db.models import Sum, Count, Avg, Q, F
-from django.db.models.functions import Round
+from django.db.models import Count, Avg, Q, F, Value
+from django.db.models.functions import Coalesce, Round
 
 from shared.base_service import BaseService
-from results.models import SubjectResult, MarksEntry
+from results.models import EnrollmentResult, SubjectResult, MarksEntry
 from enrollments.models import Enrollment, Student
-from academics.models import AcademicSession, Class, Subject, GradePolicy
+from academics.models import AcademicSession, Subject, GradePolicy
 
 logger = structlog.get_logger(__name__)
 
@@ -106,41 +106,32 @@ class AnalyticsService(BaseService):
 
     def get_top_performers(self, session_id: UUID, class_id: UUID = None, limit: int = 10) -> list[dict]:
         """Get top performing students."""
-        qs = Enrollment.objects.filter(
-            session_id=session_id,
-            is_active=True,
-        ).select_related("student", "class_field")
-        if class_id:
-            qs = qs.filter(class_field_id=class_id)
-
-        student_totals = []
-        for enrollment in qs:
-            agg = SubjectResult.objects.filter(
-                enrollment=enrollment
-            ).aggregate(
-                total_obtained=Sum("total_obtained"),
-                total_full=Sum("total_full"),
-            )
-            total_obtained = agg["total_obtained"] or 0
-            total_full = agg["total_full"] or 0
-            percentage = float(total_obtained / total_full * 100) if total_full > 0 else 0
-
-            student_totals.append({
-                "student_name": enrollment.student.name,
-                "student_id": enrollment.student.student_id,
-                "class_name": enrollment.class_field.name,
-                "percentage": round(percentage, 2),
-                "total_obtained": float(total_obtained),
-                "total_full": float(total_full),
-            })
-
-        student_totals.sort(key=lambda x: x["percentage"], reverse=True)
-        return student_totals[:limit]
+        return self._performers(session_id, class_id, "-percentage", limit)
 
     def get_bottom_performers(self, session_id: UUID, class_id: UUID = None, limit: int = 10) -> list[dict]:
-        """Get bottom performing students."""
-        all_students = self.get_top_performers(session_id, class_id, limit=9999)
-        return all_students[-limit:] if len(all_students) >= limit else all_students
+        """Get bottom performing students, best first."""
+        return self._performers(session_id, class_id, "percentage", limit)[::-1]
+
+    def _performers(self, session_id: UUID, class_id: UUID | None, order: str, limit: int) -> list[dict]:
+        """Read the precomputed EnrollmentResult rows, sorted on the percentage index."""
+        qs = EnrollmentResult.objects.filter(
+            enrollment__session_id=session_id,
+            enrollment__status="active",
+        ).select_related("enrollment__student", "enrollment__class_field")
+        if class_id:
+            qs = qs.filter(enrollment__class_field_id=class_id)
+
+        return [
+            {
+                "student_name": r.enrollment.student.name,
+                "student_id": r.enrollment.student.student_id,
+                "class_name": r.enrollment.class_field.name,
+                "percentage": float(r.percentage),
+                "total_obtained": float(r.total_obtained),
+                "total_full": float(r.total_full),
+            }
+            for r in qs.order_by(order)[:limit]
+        ]
 
     def get_session_comparison(self, session_ids: list[UUID]) -> list[dict]:
         """Compare metrics across multiple sessions."""
@@ -166,38 +157,27 @@ class AnalyticsService(BaseService):
 
     def get_class_performance(self, session_id: UUID) -> list[dict]:
         """Get performance summary for each class in a session."""
-        classes = Class.objects.filter(is_active=True)
-        results = []
-
-        for cls in classes:
-            enrollments = Enrollment.objects.filter(
+        stats = (
+            Enrollment.objects.filter(
                 session_id=session_id,
-                class_field=cls,
-                is_active=True,
+                status="active",
             )
-            student_count = enrollments.count()
-
-            if student_count == 0:
-                continue
-
-            total_percentage = 0
-            for enrollment in enrollments:
-                agg = SubjectResult.objects.filter(
-                    enrollment=enrollment
-                ).aggregate(
-                    total_obtained=Sum("total_obtained"),
-                    total_full=Sum("total_full"),
-                )
-                t_obtained = agg["total_obtained"] or 0
-                t_full = agg["total_full"] or 0
-                pct = float(t_obtained / t_full * 100) if t_full > 0 else 0
-                total_percentage += pct
-
-            results.append({
-                "class_name": cls.name,
-                "class_id": str(cls.id),
-                "student_count": student_count,
-                "avg_percentage": round(total_percentage / student_count, 2),
-            })
+            .values("class_field_id", "class_field__name", "class_field__level")
+            .annotate(
+                student_count=Count("id"),
+                avg_percentage=Avg(
+                    Coalesce("result_summary__percentage", Value(Decimal("0")))
+                ),
+            )
+            .order_by("class_field__level")
+        )
 
-        return results
+        return [
+            {
+                "class_name": row["class_field__name"],
+                "class_id": str(row["class_field_id"]),
+                "student_count": row["student_count"],
+                "avg_percentage": round(float(row["avg_percentage"] or 0), 2),
+            }
+            for row in stats
+        ]
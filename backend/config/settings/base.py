@@ -170,6 +170,79 @@ CACHE_TTL_SHORT = 60
 CACHE_TTL_MEDIUM = 300
 CACHE_TTL_LONG = 900
 
+# Seconds between checks of the shared grade policy version by each process
+GRADE_TABLE_CHECK_INTERVAL = 30
+
+# SubjectResult aggregation: "raw" sums marks as entered; "weighted" applies
+# AssessmentWeightage where configured (raw elsewhere)
+RESULT_AGGREGATION_MODE = "raw"
+
+# Debounced SubjectResult recompute after marks writes
+RESULT_RECOMPUTE_DEBOUNCE = 10
+RESULT_RECOMPUTE_BATCH_SIZE = 500
+
+# Class rankings: "competition" (1, 2, 2, 4), "dense" (1, 2, 2, 3) or "subject"
+# (ties broken by the percentage in RANKING_TIE_BREAK_SUBJECT, a subject code)
+RANKING_TIE_POLICY = "competition"
+RANKING_TIE_BREAK_SUBJECT = None
+# Stored rankings older than this (seconds) are recomputed in the background
+RANKING_MAX_AGE = 24 * 60 * 60
+# Seconds to wait before recomputing a session's stale rankings
+RANKING_RECOMPUTE_DEBOUNCE = 10
+# Live section leaderboards ("local" per process, "redis" sorted sets)
+LEADERBOARD_BACKEND = "local"
+
+# Marks import: files above the sync limit are processed by a Celery job
+MARKS_IMPORT_CHUNK_SIZE = 500
+MARKS_IMPORT_SYNC_MAX_BYTES = 256 * 1024
+MARKS_IMPORT_MAX_ERRORS = 1000
+
+# Export jobs: Excel rows between progress updates; seconds after which a job
+# still running (its task is hard-killed after 1860) or never started is failed
+EXPORT_PROGRESS_EVERY = 500
+EXPORT_JOB_STALE_AFTER = 60 * 60
+
+# Session report generation: seconds without progress after which a pending or
+# running job counts as dead and may be resumed (the task's hard limit is 1860)
+REPORT_GENERATION_STALE_AFTER = 1860
+
+# Periodic tasks (celery beat)
+CELERY_BEAT_SCHEDULE = {
+    "fail-stale-export-jobs": {
+        "task": "tasks.report_tasks.fail_stale_export_jobs",
+        "schedule": 15 * 60,
+    },
+    "evict-export-cache": {
+        "task": "tasks.report_tasks.evict_export_cache",
+        "schedule": 24 * 60 * 60,
+    },
+    # Drains pending recomputes whose on-commit scheduling was lost
+    "sweep-dirty-results": {
+        "task": "tasks.ranking_tasks.recompute_dirty_results",
+        "schedule": 5 * 60,
+    },
+}
+
+# Export cache: bump when a PDF/Excel layout changes so cached artifacts are regenerated;
+# artifacts older than this many days are deleted unless an open or recent job uses them
+EXPORT_TEMPLATE_VERSION = 2
+EXPORT_CACHE_MAX_AGE_DAYS = 7
+
+# PDF report cards: students per render chunk (export jobs render each chunk
+# as its own task on the reports queue, then merge them)
+PDF_RENDER_CHUNK_SIZE = 25
+# Report card layout engine: "flowable" (platypus) or "canvas" (fixed layout, faster)
+PDF_RENDERER = "flowable"
+# Optional path to a logo image drawn on every report card
+REPORT_CARD_LOGO = None
+
+# Marks autosave: per-teacher write buffer ("redis" shared; "local" is per
+# process and never flushes idle buffers, so development only)
+MARKS_AUTOSAVE_BACKEND = "local"
+MARKS_AUTOSAVE_FLUSH_SECONDS = 5
+MARKS_AUTOSAVE_MAX_CELLS = 200
+MARKS_AUTOSAVE_BUFFER_TTL = 3600
+
 # Logging
 LOGGING = {
     "version": 1,
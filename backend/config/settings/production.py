@@ -36,6 +36,8 @@ CACHES = {
         "OPTIONS": {"MAX_ENTRIES": 2000},
     }
 }
+MARKS_AUTOSAVE_BACKEND = "redis"
+LEADERBOARD_BACKEND = "redis"
 
 # CORS
 CORS_ALLOWED_ORIGINS = os.environ.get("CORS_ALLOWED_ORIGINS", "").split(",")
@@ -163,8 +163,8 @@ class StudentDashboardView(APIView):
             current_enrollment = Enrollment.objects.filter(
                 student=student,
                 session=active_session,
-                is_active=True,
-            ).select_related("class_field", "section").first()
+                status="active",
+            ).select_related("class_field", "section", "result_summary").first()
 
         if current_enrollment:
             stats["current_class"] = current_enrollment.class_field.name
@@ -174,12 +174,13 @@ class StudentDashboardView(APIView):
         # Percentage and grade
         ranking_svc = RankingService()
         if current_enrollment and active_session:
+            summary = getattr(current_enrollment, "result_summary", None)
             rank_data = ranking_svc.get_student_rank(
                 student_id=student.id,
                 session_id=active_session.id,
             )
-            stats["percentage"] = rank_data.get("percentage")
-            stats["grade"] = rank_data.get("grade")
+            stats["percentage"] = float(summary.percentage) if summary else rank_data.get("percentage")
+            stats["grade"] = summary.overall_grade if summary else rank_data.get("grade")
             stats["rank"] = rank_data.get("rank")
             stats["total_students"] = rank_data.get("total_students")
         else:
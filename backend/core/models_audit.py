@@ -12,6 +12,7 @@ class AuditLog(models.Model):
         ("marks Entered", "Marks Entered"),
         ("marks_updated", "Marks Updated"),
         ("marks_bulk_updated", "Marks Bulk Updated"),
+        ("marks_autosaved", "Marks Autosaved"),
         ("result_published", "Result Published"),
         ("result_unpublished", "Result Unpublished"),
         ("student_created", "Student Created"),
@@ -75,6 +76,22 @@ class AuditLog(models.Model):
             user_agent=user_agent,
         )
 
+    @classmethod
+    def log_many(cls, records: list[dict]) -> list["AuditLog"]:
+        """Insert many audit rows in one statement; each record takes ``log()`` kwargs."""
+        return cls.objects.bulk_create([
+            cls(
+                action=r["action"],
+                user_id=r.get("user_id") or getattr(r.get("user"), "pk", None),
+                entity_type=r.get("entity_type", ""),
+                entity_id=str(r.get("entity_id", "")),
+                details=r.get("details") or {},
+                ip_address=r.get("ip_address"),
+                user_agent=r.get("user_agent", ""),
+            )
+            for r in records
+        ])
+
 
 class Notification(models.Model):
     """User notifications for system events."""
@@ -105,6 +105,10 @@ class EnrollmentViewSet(viewsets.ModelViewSet):
             return Response(status=status.HTTP_404_NOT_FOUND)
         return Response(EnrollmentSerializer(enrollment).data)
 
+    def perform_update(self, serializer):
+        enrollment = serializer.save()
+        self._service.sync_leaderboards([enrollment.id])
+
     @action(detail=True, methods=["post"], url_path="promote")
     def promote(self, request, *args, **kwargs):
         enrollment = self._service.repo.get_by_id(kwargs["pk"])
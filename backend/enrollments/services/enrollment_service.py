@@ -74,6 +74,7 @@ class EnrollmentService(BaseService):
         promoted = enrollment.promote_to_next_class(
             new_class_id, new_section_id, new_session_id, new_roll_no
         )
+        self.sync_leaderboards([enrollment_id])
         AuditLog.log(
             action="student_promoted",
             entity_type="Enrollment",
@@ -97,6 +98,7 @@ class EnrollmentService(BaseService):
         enrollment = self.repo.get_by_id_or_raise(enrollment_id, "Enrollment not found.")
         self.log.info("retaining_enrollment", enrollment_id=enrollment_id)
         retained = enrollment.retain_in_same_class(new_session_id, new_roll_no)
+        self.sync_leaderboards([enrollment_id])
         AuditLog.log(
             action="student_retained",
             entity_type="Enrollment",
@@ -113,6 +115,7 @@ class EnrollmentService(BaseService):
         enrollment = self.repo.get_by_id_or_raise(enrollment_id, "Enrollment not found.")
         self.log.info("transferring_enrollment", enrollment_id=enrollment_id)
         enrollment.transfer_out(remarks)
+        self.sync_leaderboards([enrollment_id])
         AuditLog.log(
             action="student_transferred",
             entity_type="Enrollment",
@@ -147,6 +150,12 @@ class EnrollmentService(BaseService):
         self.log.info("bulk_enroll_complete", count=len(enrollments))
         return enrollments
 
+    def sync_leaderboards(self, enrollment_ids: list[UUID]) -> None:
+        """Move enrollments whose section or status changed to the right leaderboard."""
+        from reporting.services.leaderboard_service import LeaderboardService
+
+        LeaderboardService().relocate(enrollment_ids)
+
     def get_active_enrollment(self, student_id: UUID, session_id: UUID) -> Enrollment | None:
         return self.repo.get_active(student_id, session_id)
 
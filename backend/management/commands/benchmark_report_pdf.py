@@ -0,0 +1,97 @@
+"""Management command to compare report card PDF renderers."""
+
+import io
+import time
+import uuid
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+
+from shared.types import ReportCardDTO, SubjectResultDTO
+
+
+class Command(BaseCommand):
+    help = "Benchmark the flowable and canvas report card renderers on synthetic data"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--students", type=int, default=200)
+        parser.add_argument("--subjects", type=int, default=8)
+        parser.add_argument("--repeat", type=int, default=3)
+
+    def handle(self, *args, **options):
+        from reporting.services.pdf_export_service import (
+            RENDERER_CANVAS,
+            RENDERER_FLOWABLE,
+            render_report_cards_pdf,
+        )
+
+        reports = self._reports(options["students"], options["subjects"])
+        self.stdout.write(
+            f"Rendering {len(reports)} report cards x {options['subjects']} subjects, "
+            f"best of {options['repeat']}..."
+        )
+
+        rates = {}
+        for renderer in (RENDERER_FLOWABLE, RENDERER_CANVAS):
+            best = None
+            for _ in range(options["repeat"]):
+                started = time.perf_counter()
+                pdf = render_report_cards_pdf(reports, renderer=renderer)
+                elapsed = time.perf_counter() - started
+                best = elapsed if best is None else min(best, elapsed)
+            pages = self._page_count(pdf, default=len(reports))
+            rates[renderer] = pages / best
+            self.stdout.write(
+                f"  {renderer:<9} {pages} pages in {best:.3f}s "
+                f"-> {rates[renderer]:.1f} pages/s, {len(pdf) / 1024:.0f} KiB"
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"canvas is {rates[RENDERER_CANVAS] / rates[RENDERER_FLOWABLE]:.1f}x "
+            f"the flowable renderer"
+        ))
+
+    @staticmethod
+    def _reports(students: int, subjects: int) -> list[ReportCardDTO]:
+        subject_ids = [uuid.uuid4() for _ in range(subjects)]
+        reports = []
+        for n in range(students):
+            enrollment_id = uuid.uuid4()
+            results = [
+                SubjectResultDTO(
+                    id=uuid.uuid4(),
+                    enrollment_id=enrollment_id,
+                    subject_id=subject_ids[s],
+                    subject_name=f"Subject {s + 1}",
+                    total_obtained=40 + (n + s) % 60,
+                    total_full=100,
+                    percentage=Decimal(40 + (n + s) % 60),
+                    grade="B",
+                    grade_point=Decimal("3.0"),
+                )
+                for s in range(subjects)
+            ]
+            total = sum(r.total_obtained for r in results)
+            reports.append(ReportCardDTO(
+                student_name=f"Student {n:04d}",
+                student_id=f"STU{n:06d}",
+                roll_no=str(n + 1),
+                class_name="Class 10",
+                section_name="A",
+                session_name="2025-2026",
+                results=results,
+                total_marks=total,
+                total_full=100 * subjects,
+                percentage=Decimal(total * 100 // (100 * subjects)),
+                overall_grade="B",
+                rank=n + 1,
+            ))
+        return reports
+
+    @staticmethod
+    def _page_count(pdf: bytes, default: int) -> int:
+        try:
+            from pypdf import PdfReader
+        except ImportError:
+            return default
+        return len(PdfReader(io.BytesIO(pdf)).pages)
@@ -8,8 +8,17 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework import status
 
 from core.permissions import IsAdmin
-from reporting.services.pdf_export_service import PDFExportService
-from reporting.services.excel_export_service import ExcelExportService
+from reporting.models import ExportJob, ReportGenerationJob
+from reporting.api.serializers import (
+    ExportJobCreateSerializer,
+    ExportJobSerializer,
+    ReportGenerationRequestSerializer,
+    ReportGenerationJobSerializer,
+    ReportGenerationJobDetailSerializer,
+)
+from reporting.services.export_job_service import ExportJobService
+from reporting.services.report_generation_service import ReportGenerationService
+from reporting.services.export_cache_service import ExportCacheService
 
 
 class PDFReportCardView(APIView):
@@ -17,13 +26,7 @@ class PDFReportCardView(APIView):
 
     def get(self, request, enrollment_id):
         try:
-            service = PDFExportService()
-            pdf_buffer = service.generate_student_report_card_pdf(UUID(enrollment_id))
-
-            from django.http import HttpResponse
-            response = HttpResponse(pdf_buffer.getvalue(), content_type="application/pdf")
-            response["Content-Disposition"] = f'attachment; filename="report_card_{enrollment_id}.pdf"'
-            return response
+            return _cached_export(request, "pdf_student", {"enrollment_id": UUID(str(enrollment_id))})
         except Exception as e:
             return Response(
                 {"error": str(e)},
@@ -46,15 +49,33 @@ class PDFClassReportCardsView(APIView):
             )
 
         try:
-            service = PDFExportService()
-            pdf_buffer = service.generate_class_report_cards_pdf(
-                UUID(class_id), UUID(section_id), UUID(session_id)
+            return _cached_export(request, "pdf_class", {
+                "class_id": UUID(class_id),
+                "section_id": UUID(section_id),
+                "session_id": UUID(session_id),
+            })
+        except Exception as e:
+            return Response(
+                {"error": str(e)},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
 
-            from django.http import HttpResponse
-            response = HttpResponse(pdf_buffer.getvalue(), content_type="application/pdf")
-            response["Content-Disposition"] = f'attachment; filename="class_report_cards.pdf"'
-            return response
+
+class PDFSessionReportCardsView(APIView):
+
+    permission_classes = [IsAuthenticated, IsAdmin]
+
+    def get(self, request):
+        session_id = request.query_params.get("session_id")
+
+        if not session_id:
+            return Response(
+                {"error": "session_id is required"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            return _cached_export(request, "pdf_session", {"session_id": UUID(session_id)})
         except Exception as e:
             return Response(
                 {"error": str(e)},
@@ -62,21 +83,64 @@ class PDFClassReportCardsView(APIView):
             )
 
 
-class ExcelMarksheetView(APIView):
+class PDFClassReportCardsZipView(APIView):
+    """One PDF per student in a class-section, bundled as a ZIP."""
+
     permission_classes = [IsAuthenticated, IsAdmin]
 
-    def get(self, request, enrollment_id):
+    def get(self, request):
+        class_id = request.query_params.get("class_id")
+        section_id = request.query_params.get("section_id")
+        session_id = request.query_params.get("session_id")
+
+        if not all([class_id, section_id, session_id]):
+            return Response(
+                {"error": "class_id, section_id, and session_id are required"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
         try:
-            service = ExcelExportService()
-            excel_buffer = service.generate_student_marksheet_excel(UUID(enrollment_id))
+            return _cached_export(request, "zip_class", {
+                "class_id": UUID(class_id),
+                "section_id": UUID(section_id),
+                "session_id": UUID(session_id),
+            })
+        except Exception as e:
+            return Response(
+                {"error": str(e)},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+
+class PDFSessionReportCardsZipView(APIView):
+    """One PDF per student in a session, a folder per class-section, bundled as a ZIP."""
+
+    permission_classes = [IsAuthenticated, IsAdmin]
+
+    def get(self, request):
+        session_id = request.query_params.get("session_id")
+
+        if not session_id:
+            return Response(
+                {"error": "session_id is required"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
-            from django.http import HttpResponse
-            response = HttpResponse(
-                excel_buffer.getvalue(),
-                content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        try:
+            return _cached_export(request, "zip_session", {"session_id": UUID(session_id)})
+        except Exception as e:
+            return Response(
+                {"error": str(e)},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
-            response["Content-Disposition"] = f'attachment; filename="marksheet_{enrollment_id}.xlsx"'
-            return response
+
+
+class ExcelMarksheetView(APIView):
+    permission_classes = [IsAuthenticated, IsAdmin]
+
+    def get(self, request, enrollment_id):
+        try:
+            return _cached_export(request, "excel_student", {"enrollment_id": UUID(str(enrollment_id))})
         except Exception as e:
             return Response(
                 {"error": str(e)},
@@ -99,20 +163,211 @@ class ExcelClassMarksheetView(APIView):
             )
 
         try:
-            service = ExcelExportService()
-            excel_buffer = service.generate_class_marksheet_excel(
-                UUID(class_id), UUID(section_id), UUID(session_id)
+            return _cached_export(request, "excel_class", {
+                "class_id": UUID(class_id),
+                "section_id": UUID(section_id),
+                "session_id": UUID(session_id),
+            })
+        except Exception as e:
+            return Response(
+                {"error": str(e)},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
 
-            from django.http import HttpResponse
-            response = HttpResponse(
-                excel_buffer.getvalue(),
-                content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+
+class ExcelSessionMarksheetView(APIView):
+    permission_classes = [IsAuthenticated, IsAdmin]
+
+    def get(self, request):
+        session_id = request.query_params.get("session_id")
+
+        if not session_id:
+            return Response(
+                {"error": "session_id is required"},
+                status=status.HTTP_400_BAD_REQUEST,
             )
-            response["Content-Disposition"] = f'attachment; filename="class_marksheet.xlsx"'
-            return response
+
+        try:
+            return _cached_export(request, "excel_session", {"session_id": UUID(session_id)})
         except Exception as e:
             return Response(
                 {"error": str(e)},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
+
+
+class ExportJobListView(APIView):
+    """Queue exports on the reports worker instead of rendering in the request."""
+
+    permission_classes = [IsAuthenticated, IsAdmin]
+
+    def get(self, request):
+        jobs = ExportJob.objects.filter(requested_by=request.user)[:50]
+        return Response(ExportJobSerializer(jobs, many=True).data)
+
+    def post(self, request):
+        serializer = ExportJobCreateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = dict(serializer.validated_data)
+
+        job = ExportJobService().create_job(data.pop("kind"), data, request.user)
+
+        from tasks.report_tasks import run_export_job
+
+        run_export_job.delay(str(job.id))
+        return Response(ExportJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+
+class ExportJobDetailView(APIView):
+    permission_classes = [IsAuthenticated, IsAdmin]
+
+    def get(self, request, pk):
+        job = ExportJob.objects.filter(id=pk).first()
+        if not job:
+            return Response(status=status.HTTP_404_NOT_FOUND)
+        return Response(ExportJobSerializer(job).data)
+
+
+class ExportJobDownloadView(APIView):
+    permission_classes = [IsAuthenticated, IsAdmin]
+
+    def get(self, request, pk):
+        job = ExportJob.objects.filter(id=pk).first()
+        if not job:
+            return Response(status=status.HTTP_404_NOT_FOUND)
+        if job.status != "completed":
+            return Response(
+                {"error": f"Export is {job.status}", **ExportJobSerializer(job).data},
+                status=status.HTTP_409_CONFLICT,
+            )
+
+        from django.core.files.storage import default_storage
+        from django.http import FileResponse
+
+        if not default_storage.exists(job.file.name):
+            return Response(
+                {"error": "Export file has expired; request the export again"},
+                status=status.HTTP_410_GONE,
+            )
+        return FileResponse(job.file.open("rb"), as_attachment=True, filename=job.filename)
+
+
+class ReportGenerationListView(APIView):
+    """Start term-end report card generation for a whole session."""
+
+    permission_classes = [IsAuthenticated, IsAdmin]
+
+    def get(self, request):
+        jobs = ReportGenerationJob.objects.all()
+        session_id = request.query_params.get("session_id")
+        if session_id:
+            jobs = jobs.filter(session_id=session_id)
+        return Response(ReportGenerationJobSerializer(jobs[:50], many=True).data)
+
+    def post(self, request):
+        serializer = ReportGenerationRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        job, created = ReportGenerationService().create_job(
+            serializer.validated_data["session_id"], request.user
+        )
+        if not created:
+            # The session already has a job in progress; hand that one back.
+            return Response(ReportGenerationJobSerializer(job).data, status=status.HTTP_200_OK)
+
+        from tasks.report_tasks import generate_session_report_cards
+
+        generate_session_report_cards.delay(str(job.id))
+        return Response(ReportGenerationJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+
+class ReportGenerationDetailView(APIView):
+    permission_classes = [IsAuthenticated, IsAdmin]
+
+    def get(self, request, pk):
+        job = (
+            ReportGenerationJob.objects.filter(id=pk)
+            .prefetch_related("checkpoints__class_ref", "checkpoints__section")
+            .first()
+        )
+        if not job:
+            return Response(status=status.HTTP_404_NOT_FOUND)
+        return Response(ReportGenerationJobDetailSerializer(job).data)
+
+
+class ReportGenerationResumeView(APIView):
+    """Re-queue a failed or stalled job; finished sections are skipped."""
+
+    permission_classes = [IsAuthenticated, IsAdmin]
+
+    def post(self, request, pk):
+        job = ReportGenerationJob.objects.filter(id=pk).first()
+        if not job:
+            return Response(status=status.HTTP_404_NOT_FOUND)
+        if not ReportGenerationService().claim_resume(job.id):
+            return Response(
+                {
+                    "error": f"Report generation is {job.status} and cannot be resumed",
+                    **ReportGenerationJobSerializer(job).data,
+                },
+                status=status.HTTP_409_CONFLICT,
+            )
+
+        from tasks.report_tasks import generate_session_report_cards
+
+        generate_session_report_cards.delay(str(job.id))
+        job.refresh_from_db()
+        return Response(ReportGenerationJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+
+def _queued_export(request, kind, params):
+    """Answer 202 with an export job for this export, queuing one unless it is already open."""
+    from django.urls import reverse
+
+    job, created = ExportJobService().get_or_create_job(kind, params, request.user)
+    if created:
+        from tasks.report_tasks import run_export_job
+
+        run_export_job.delay(str(job.id))
+    location = request.build_absolute_uri(reverse("export-job-detail", args=[job.id]))
+    return Response(
+        ExportJobSerializer(job).data,
+        status=status.HTTP_202_ACCEPTED,
+        headers={"Location": location},
+    )
+
+
+def _cached_export(request, kind, params):
+    """Serve an export from the export cache, answering 304 when the client's copy is current.
+
+    The ETag is the export's content fingerprint, so checking it costs a few
+    aggregate queries and no rendering. Only single-student exports are
+    rendered in the request; a class or session export that is not cached
+    yet is handed to an export job (see ``_queued_export``).
+    """
+    from django.core.files.storage import default_storage
+    from django.http import FileResponse, HttpResponseNotModified
+    from django.utils.cache import patch_cache_control
+
+    cache = ExportCacheService()
+    digest = cache.fingerprint(kind, params)
+    etag = f'"{digest}"'
+
+    if_none_match = request.headers.get("If-None-Match", "")
+    if etag in [tag.strip() for tag in if_none_match.split(",")]:
+        response = HttpResponseNotModified()
+    else:
+        path = cache.path(kind, digest)
+        if not default_storage.exists(path):
+            if not kind.endswith("_student"):
+                return _queued_export(request, kind, params)
+            path, _ = cache.get_or_render(kind, params, digest=digest)
+        response = FileResponse(
+            default_storage.open(path, "rb"),
+            as_attachment=True,
+            filename=cache.filename(kind, params),
+            content_type=cache.content_type(kind),
+        )
+    response["ETag"] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
@@ -2,6 +2,7 @@
 
 from rest_framework import serializers
 
+from reporting.models import ExportJob, ReportGenerationCheckpoint, ReportGenerationJob
 from shared.types import ReportCardDTO, MarksheetDTO, SubjectResultDTO
 
 
@@ -11,6 +12,8 @@ class SubjectResultDTOSerializer(serializers.Serializer):
     id = serializers.UUIDField()
     enrollment_id = serializers.UUIDField()
     subject_id = serializers.UUIDField()
+    subject_name = serializers.CharField()
+    subject_code = serializers.CharField()
     total_obtained = serializers.IntegerField()
     total_full = serializers.IntegerField()
     percentage = serializers.DecimalField(max_digits=5, decimal_places=2)
@@ -33,6 +36,8 @@ class ReportCardDTOSerializer(serializers.Serializer):
     percentage = serializers.DecimalField(max_digits=5, decimal_places=2)
     overall_grade = serializers.CharField()
     rank = serializers.IntegerField(allow_null=True, required=False)
+    class_rank = serializers.IntegerField(allow_null=True, required=False)
+    percentile = serializers.FloatField(allow_null=True, required=False)
 
 
 class MarksheetDTOSerializer(serializers.Serializer):
@@ -78,3 +83,131 @@ class RankingEntrySerializer(serializers.Serializer):
     total_obtained = serializers.IntegerField()
     total_full = serializers.IntegerField()
     percentage = serializers.FloatField()
+    total_students = serializers.IntegerField(required=False)
+    class_rank = serializers.IntegerField(required=False)
+    class_size = serializers.IntegerField(required=False)
+    percentile = serializers.FloatField(required=False)
+
+
+class LeaderboardQuerySerializer(serializers.Serializer):
+    """Query params for a section leaderboard lookup."""
+
+    session_id = serializers.UUIDField()
+    class_id = serializers.UUIDField()
+    section_id = serializers.UUIDField()
+    enrollment_id = serializers.UUIDField(required=False)
+    radius = serializers.IntegerField(min_value=0, max_value=50, default=2)
+    limit = serializers.IntegerField(min_value=1, max_value=500, default=10)
+
+
+class LeaderboardEntrySerializer(serializers.Serializer):
+    """Serializer for a live leaderboard entry."""
+
+    rank = serializers.IntegerField()
+    enrollment_id = serializers.UUIDField()
+    student_name = serializers.CharField()
+    student_id = serializers.CharField()
+    roll_no = serializers.CharField()
+    percentage = serializers.FloatField()
+
+
+class ExportJobCreateSerializer(serializers.Serializer):
+    """Request payload for an asynchronous export job."""
+
+    kind = serializers.ChoiceField(choices=ExportJob.KIND_CHOICES)
+    enrollment_id = serializers.UUIDField(required=False)
+    class_id = serializers.UUIDField(required=False)
+    section_id = serializers.UUIDField(required=False)
+    session_id = serializers.UUIDField(required=False)
+
+    def validate(self, attrs):
+        from reporting.services.export_job_service import REQUIRED_PARAMS
+
+        missing = [key for key in REQUIRED_PARAMS[attrs["kind"]] if key not in attrs]
+        if missing:
+            raise serializers.ValidationError(
+                f"{', '.join(missing)} required for a {attrs['kind']} export."
+            )
+        return attrs
+
+
+class ExportJobSerializer(serializers.ModelSerializer):
+    """Status and progress of an export job."""
+
+    progress = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = ExportJob
+        fields = [
+            "id",
+            "kind",
+            "params",
+            "status",
+            "items_total",
+            "items_done",
+            "progress",
+            "filename",
+            "error",
+            "started_at",
+            "finished_at",
+            "created_at",
+            "updated_at",
+        ]
+
+
+class ReportGenerationRequestSerializer(serializers.Serializer):
+    """Request payload for session-wide report card generation."""
+
+    session_id = serializers.UUIDField()
+
+
+class ReportGenerationCheckpointSerializer(serializers.ModelSerializer):
+    """A completed section of a report generation job."""
+
+    class_name = serializers.CharField(source="class_ref.name", read_only=True)
+    section_name = serializers.CharField(source="section.name", read_only=True)
+
+    class Meta:
+        model = ReportGenerationCheckpoint
+        fields = [
+            "class_ref",
+            "class_name",
+            "section",
+            "section_name",
+            "students",
+            "created_at",
+        ]
+
+
+class ReportGenerationJobSerializer(serializers.ModelSerializer):
+    """Status and progress of a session-wide report generation job."""
+
+    progress = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = ReportGenerationJob
+        fields = [
+            "id",
+            "session",
+            "status",
+            "sections_total",
+            "sections_done",
+            "students_total",
+            "students_done",
+            "progress",
+            "attempts",
+            "error",
+            "started_at",
+            "finished_at",
+            "created_at",
+            "updated_at",
+        ]
+
+
+class ReportGenerationJobDetailSerializer(ReportGenerationJobSerializer):
+    """Job status plus the sections completed so far."""
+
+    checkpoints = ReportGenerationCheckpointSerializer(many=True, read_only=True)
+
+    class Meta(ReportGenerationJobSerializer.Meta):
+        fields = [*ReportGenerationJobSerializer.Meta.fields, "checkpoints"]
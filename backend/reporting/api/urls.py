@@ -7,8 +7,18 @@ from reporting.api.views import ReportCardViewSet, MarksheetViewSet, RankingView
 from reporting.api.export_views import (
     PDFReportCardView,
     PDFClassReportCardsView,
+    PDFSessionReportCardsView,
+    PDFClassReportCardsZipView,
+    PDFSessionReportCardsZipView,
     ExcelMarksheetView,
     ExcelClassMarksheetView,
+    ExcelSessionMarksheetView,
+    ExportJobListView,
+    ExportJobDetailView,
+    ExportJobDownloadView,
+    ReportGenerationListView,
+    ReportGenerationDetailView,
+    ReportGenerationResumeView,
 )
 
 router = DefaultRouter()
@@ -21,6 +31,18 @@ urlpatterns = [
     # Export endpoints
     path("export/pdf/student/<uuid:enrollment_id>/", PDFReportCardView.as_view(), name="pdf-report-card"),
     path("export/pdf/class/", PDFClassReportCardsView.as_view(), name="pdf-class-report-cards"),
+    path("export/pdf/session/", PDFSessionReportCardsView.as_view(), name="pdf-session-report-cards"),
+    path("export/pdf/class/zip/", PDFClassReportCardsZipView.as_view(), name="pdf-class-report-cards-zip"),
+    path("export/pdf/session/zip/", PDFSessionReportCardsZipView.as_view(), name="pdf-session-report-cards-zip"),
     path("export/excel/student/<uuid:enrollment_id>/", ExcelMarksheetView.as_view(), name="excel-marksheet"),
     path("export/excel/class/", ExcelClassMarksheetView.as_view(), name="excel-class-marksheet"),
+    path("export/excel/session/", ExcelSessionMarksheetView.as_view(), name="excel-session-marksheet"),
+    # Asynchronous export jobs
+    path("export/jobs/", ExportJobListView.as_view(), name="export-job-list"),
+    path("export/jobs/<uuid:pk>/", ExportJobDetailView.as_view(), name="export-job-detail"),
+    path("export/jobs/<uuid:pk>/download/", ExportJobDownloadView.as_view(), name="export-job-download"),
+    # Session-wide report generation
+    path("generation/", ReportGenerationListView.as_view(), name="report-generation-list"),
+    path("generation/<uuid:pk>/", ReportGenerationDetailView.as_view(), name="report-generation-detail"),
+    path("generation/<uuid:pk>/resume/", ReportGenerationResumeView.as_view(), name="report-generation-resume"),
 ]
@@ -9,6 +9,7 @@ from rest_framework.response import Response
 from core.permissions import IsAdminOrTeacher
 from reporting.services.report_card_service import ReportCardService
 from reporting.services.marksheet_service import MarksheetService
+from reporting.services.leaderboard_service import LeaderboardService
 from reporting.services.ranking_service import RankingService
 from reporting.selectors.report_selector import ReportSelector
 from reporting.api.serializers import (
@@ -16,6 +17,8 @@ from reporting.api.serializers import (
     MarksheetDTOSerializer,
     ClassReportRequestSerializer,
     RankingEntrySerializer,
+    LeaderboardEntrySerializer,
+    LeaderboardQuerySerializer,
 )
 
 
@@ -113,9 +116,39 @@ class RankingViewSet(viewsets.ViewSet):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        rankings = self._service.compute_class_rankings(
+        rankings = self._service.get_class_rankings(
             UUID(class_id), UUID(section_id), UUID(session_id)
         )
         return Response(
             RankingEntrySerializer(rankings, many=True).data
         )
+
+    @action(detail=False, methods=["get"], url_path="leaderboard")
+    def leaderboard(self, request):
+        """Live top-N (or the students around ``enrollment_id``) from the section leaderboard."""
+        query = LeaderboardQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        params = query.validated_data
+        scope = (params["session_id"], params["class_id"], params["section_id"])
+        board = LeaderboardService()
+
+        enrollment_id = params.get("enrollment_id")
+        if enrollment_id:
+            entries = board.around(scope, enrollment_id, radius=params["radius"])
+        else:
+            entries = board.top(scope, limit=params["limit"])
+
+        from enrollments.models import Enrollment
+
+        students = {
+            str(e["id"]): e
+            for e in Enrollment.objects.filter(
+                id__in=[entry["enrollment_id"] for entry in entries]
+            ).values("id", "roll_no", "student__name", "student__student_id")
+        }
+        for entry in entries:
+            student = students.get(entry["enrollment_id"], {})
+            entry["student_name"] = student.get("student__name", "")
+            entry["student_id"] = student.get("student__student_id", "")
+            entry["roll_no"] = student.get("roll_no", "")
+        return Response(LeaderboardEntrySerializer(entries, many=True).data)
@@ -0,0 +1,201 @@
+"""Reporting module models: persisted class rankings, export and report generation jobs."""
+
+from django.db import models
+
+from shared.base_model import BaseModel
+
+
+class ClassRanking(BaseModel):
+    """A student's standing in a session: section rank, class rank and percentile.
+
+    Written by the compute_class_rankings task; flagged stale, and a
+    recompute scheduled, when any subject result in the session changes.
+    """
+
+    session = models.ForeignKey(
+        "academics.AcademicSession",
+        on_delete=models.CASCADE,
+        related_name="class_rankings",
+    )
+    class_ref = models.ForeignKey(
+        "academics.Class",
+        on_delete=models.CASCADE,
+        related_name="class_rankings",
+        db_column="class_id",
+    )
+    section = models.ForeignKey(
+        "academics.Section",
+        on_delete=models.CASCADE,
+        related_name="class_rankings",
+    )
+    enrollment = models.OneToOneField(
+        "enrollments.Enrollment",
+        on_delete=models.CASCADE,
+        related_name="class_ranking",
+    )
+    total_obtained = models.PositiveIntegerField(default=0)
+    total_full = models.PositiveIntegerField(default=0)
+    percentage = models.DecimalField(max_digits=5, decimal_places=2, default=0)
+    rank = models.PositiveIntegerField()
+    total_students = models.PositiveIntegerField()
+    class_rank = models.PositiveIntegerField()
+    class_size = models.PositiveIntegerField()
+    percentile = models.DecimalField(max_digits=5, decimal_places=2, default=0)
+    computed_at = models.DateTimeField()
+    stale = models.BooleanField(default=False)
+
+    class Meta:
+        db_table = "class_rankings"
+        ordering = ["session", "class_ref", "section", "rank"]
+        indexes = [
+            models.Index(
+                fields=["session", "class_ref", "section", "rank"],
+                name="idx_ranking_section_rank",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.enrollment_id}: rank {self.rank}/{self.total_students}"
+
+
+class ExportJob(BaseModel):
+    """A PDF or Excel export rendered on the reports queue into media storage."""
+
+    KIND_CHOICES = [
+        ("pdf_student", "Student Report Card (PDF)"),
+        ("pdf_class", "Class Report Cards (PDF)"),
+        ("pdf_session", "Session Report Cards (PDF)"),
+        ("excel_student", "Student Marksheet (Excel)"),
+        ("excel_class", "Class Marksheet (Excel)"),
+        ("excel_session", "Session Marksheet (Excel)"),
+        ("zip_class", "Class Report Cards (ZIP of PDFs)"),
+        ("zip_session", "Session Report Cards (ZIP of PDFs)"),
+    ]
+
+    STATUS_CHOICES = [
+        ("pending", "Pending"),
+        ("running", "Running"),
+        ("completed", "Completed"),
+        ("failed", "Failed"),
+    ]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    params = models.JSONField(default=dict, blank=True)
+    requested_by = models.ForeignKey(
+        "core.User",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="export_jobs",
+    )
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="pending")
+    items_total = models.PositiveIntegerField(default=0)
+    items_done = models.PositiveIntegerField(default=0)
+    file = models.FileField(upload_to="exports/%Y/%m/", blank=True)
+    filename = models.CharField(max_length=255, blank=True, default="")
+    error = models.TextField(blank=True, default="")
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = "export_jobs"
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["requested_by", "-created_at"], name="idx_export_job_user"),
+            models.Index(fields=["status"], name="idx_export_job_status"),
+        ]
+
+    @property
+    def progress(self) -> int:
+        """Percent complete, 0-100."""
+        if self.status == "completed":
+            return 100
+        if not self.items_total:
+            return 0
+        return min(99, self.items_done * 100 // self.items_total)
+
+    def __str__(self) -> str:
+        return f"{self.kind} ({self.status})"
+
+
+class ReportGenerationJob(BaseModel):
+    """Term-end report card generation for every section of a session, checkpointed per section."""
+
+    STATUS_CHOICES = [
+        ("pending", "Pending"),
+        ("running", "Running"),
+        ("completed", "Completed"),
+        ("failed", "Failed"),
+    ]
+
+    session = models.ForeignKey(
+        "academics.AcademicSession",
+        on_delete=models.CASCADE,
+        related_name="report_generation_jobs",
+    )
+    requested_by = models.ForeignKey(
+        "core.User",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="report_generation_jobs",
+    )
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="pending")
+    sections_total = models.PositiveIntegerField(default=0)
+    sections_done = models.PositiveIntegerField(default=0)
+    students_total = models.PositiveIntegerField(default=0)
+    students_done = models.PositiveIntegerField(default=0)
+    attempts = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True, default="")
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = "report_generation_jobs"
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["session", "-created_at"], name="idx_report_gen_session"),
+        ]
+
+    @property
+    def progress(self) -> int:
+        """Percent of students rendered, 0-100."""
+        if self.status == "completed":
+            return 100
+        if not self.students_total:
+            return 0
+        return min(99, self.students_done * 100 // self.students_total)
+
+    def __str__(self) -> str:
+        return f"{self.session_id}: {self.sections_done}/{self.sections_total} sections ({self.status})"
+
+
+class ReportGenerationCheckpoint(BaseModel):
+    """A section whose report cards a generation job has finished; skipped on resume."""
+
+    job = models.ForeignKey(
+        ReportGenerationJob,
+        on_delete=models.CASCADE,
+        related_name="checkpoints",
+    )
+    class_ref = models.ForeignKey(
+        "academics.Class",
+        on_delete=models.CASCADE,
+        related_name="report_generation_checkpoints",
+        db_column="class_id",
+    )
+    section = models.ForeignKey(
+        "academics.Section",
+        on_delete=models.CASCADE,
+        related_name="report_generation_checkpoints",
+    )
+    students = models.PositiveIntegerField(default=0)
+    file = models.FileField(max_length=255, blank=True)
+
+    class Meta:
+        db_table = "report_generation_checkpoints"
+        ordering = ["created_at"]
+        unique_together = [("job", "class_ref", "section")]
+
+    def __str__(self) -> str:
+        return f"{self.job_id}: {self.class_ref_id}/{self.section_id}"
@@ -52,7 +52,9 @@ class ReportSelector(BaseSelector):
                 session_id=session_id,
                 status="active",
             )
-            .select_related("student", "session", "class_field", "section")
+            .select_related(
+                "student", "session", "class_field", "section", "result_summary"
+            )
             .order_by("roll_no")
         )
 
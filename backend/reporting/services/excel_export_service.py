@@ -2,10 +2,13 @@
 
 from __future__ import annotations
 
+from collections.abc import Callable
 from uuid import UUID
 import io
 
 import structlog
+from django.conf import settings
+
 from shared.base_service import BaseService
 
 logger = structlog.get_logger(__name__)
@@ -116,80 +119,147 @@ class ExcelExportService(BaseService):
         session_id: UUID,
     ) -> io.BytesIO:
         """Generate an Excel marksheet for all students in a class."""
-        from reporting.services.marksheet_service import MarksheetService
-        from enrollments.models import Enrollment
+        buffer = io.BytesIO()
+        self.write_marksheet_excel(buffer, session_id, class_id, section_id)
+        buffer.seek(0)
+        return buffer
 
-        marksheet_svc = MarksheetService()
+    def write_marksheet_excel(
+        self,
+        fh,
+        session_id: UUID,
+        class_id: UUID | None = None,
+        section_id: UUID | None = None,
+        progress: Callable[[int], None] | None = None,
+    ) -> int:
+        """Write a class (or whole-session) marksheet summary to ``fh`` in write-only mode.
+
+        Rows are streamed from one enrollment query joined to the stored
+        EnrollmentResult totals and appended as they arrive, so memory does not
+        grow with the number of students. Column widths come from one aggregate
+        over the same rows, since write-only sheets need them before the first
+        row. ``progress`` is called with the running row count every
+        EXPORT_PROGRESS_EVERY rows. Returns the number of student rows written.
+        """
+        from django.db.models import Max
+        from django.db.models.functions import Length
+
+        from academics.models import AcademicSession
+        from academics.services.grading_service import get_grade_table
+        from enrollments.models import Enrollment
 
-        enrollments = Enrollment.objects.filter(
-            class_field_id=class_id,
-            section_id=section_id,
-            session_id=session_id,
-            status="active",
-        ).select_related("student").order_by("roll_no")
+        enrollments = Enrollment.objects.filter(session_id=session_id, status="active")
+        if class_id:
+            enrollments = enrollments.filter(class_field_id=class_id)
+        if section_id:
+            enrollments = enrollments.filter(section_id=section_id)
+        whole_session = class_id is None
+
+        headers = ["Roll No", "Student Name", "Student ID", "Total Marks", "Max Marks", "Percentage", "Grade"]
+        if whole_session:
+            headers = ["Class", "Section", *headers]
+
+        longest = enrollments.aggregate(
+            roll_no=Max(Length("roll_no")),
+            name=Max(Length("student__name")),
+            student_id=Max(Length("student__student_id")),
+            class_name=Max(Length("class_field__name")),
+            section_name=Max(Length("section__name")),
+        )
+        data_widths = [
+            longest["roll_no"],
+            longest["name"],
+            longest["student_id"],
+            6,
+            6,
+            len("100.00%"),
+            max((len(label) for label in get_grade_table().labels), default=3),
+        ]
+        if whole_session:
+            data_widths = [longest["class_name"], longest["section_name"], *data_widths]
+
+        session_name = (
+            AcademicSession.objects.filter(id=session_id).values_list("name", flat=True).first()
+            or ""
+        )
+        rows = (
+            enrollments.select_related("student", "class_field", "section", "result_summary")
+            .order_by("class_field__level", "section__name", "roll_no")
+            .iterator(chunk_size=1000)
+        )
 
-        buffer = io.BytesIO()
         try:
             import openpyxl
+            from openpyxl.cell import WriteOnlyCell
             from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-
-            wb = openpyxl.Workbook()
-            ws = wb.active
-            ws.title = "Class Marksheet"
-
-            header_fill = PatternFill(start_color="2563EB", end_color="2563EB", fill_type="solid")
-            header_font = Font(color="FFFFFF", bold=True)
-            border = Border(
-                left=Side(style="thin"),
-                right=Side(style="thin"),
-                top=Side(style="thin"),
-                bottom=Side(style="thin"),
-            )
-
-            # Header
-            ws.merge_cells("A1:G1")
-            ws["A1"] = f"Class Marksheet - {enrollments.first().session.name if enrollments.exists() else ''}"
-            ws["A1"].font = Font(bold=True, size=14)
-
-            # Column Headers
-            row = 3
-            headers = ["Roll No", "Student Name", "Student ID", "Total Marks", "Max Marks", "Percentage", "Grade"]
-            for col, header in enumerate(headers, 1):
-                cell = ws.cell(row=row, column=col, value=header)
-                cell.fill = header_fill
-                cell.font = header_font
-                cell.alignment = Alignment(horizontal="center")
-                cell.border = border
-
-            # Student Data
-            row = 4
-            for enrollment in enrollments:
-                marksheet = marksheet_svc.generate_student_marksheet(enrollment.id)
-                ws.cell(row=row, column=1, value=enrollment.roll_no).border = border
-                ws.cell(row=row, column=2, value=enrollment.student.name).border = border
-                ws.cell(row=row, column=3, value=enrollment.student.student_id).border = border
-                ws.cell(row=row, column=4, value=marksheet.total_marks).border = border
-                ws.cell(row=row, column=5, value=marksheet.total_full).border = border
-                ws.cell(row=row, column=6, value=f"{marksheet.percentage}%").border = border
-                ws.cell(row=row, column=7, value=marksheet.overall_grade).border = border
-                row += 1
-
-            # Auto-width columns
-            for col in ws.columns:
-                max_length = 0
-                column_letter = col[0].column_letter
-                for cell in col:
-                    try:
-                        if len(str(cell.value)) > max_length:
-                            max_length = len(str(cell.value))
-                    except:
-                        pass
-                ws.column_dimensions[column_letter].width = max_length + 2
-
-            wb.save(buffer)
-            buffer.seek(0)
-            return buffer
-
+            from openpyxl.utils import get_column_letter
         except ImportError:
             self.log.error("openpyxl_not_installed")
             raise RuntimeError("openpyxl is required for Excel generation")
+
+        wb = openpyxl.Workbook(write_only=True)
+        ws = wb.create_sheet("Session Marksheet" if whole_session else "Class Marksheet")
+
+        header_fill = PatternFill(start_color="2563EB", end_color="2563EB", fill_type="solid")
+        header_font = Font(color="FFFFFF", bold=True)
+        border = Border(
+            left=Side(style="thin"),
+            right=Side(style="thin"),
+            top=Side(style="thin"),
+            bottom=Side(style="thin"),
+        )
+
+        for col, (header, width) in enumerate(zip(headers, data_widths), 1):
+            ws.column_dimensions[get_column_letter(col)].width = max(len(header), width or 0) + 2
+
+        def styled(value, **style):
+            cell = WriteOnlyCell(ws, value=value)
+            for attr, val in style.items():
+                setattr(cell, attr, val)
+            return cell
+
+        title = "Session Marksheet" if whole_session else "Class Marksheet"
+        ws.append([styled(f"{title} - {session_name}", font=Font(bold=True, size=14))])
+        ws.append([])
+        ws.append([
+            styled(
+                header,
+                fill=header_fill,
+                font=header_font,
+                alignment=Alignment(horizontal="center"),
+                border=border,
+            )
+            for header in headers
+        ])
+
+        ungraded_label, _ = get_grade_table().lookup(0.0)
+        progress_every = settings.EXPORT_PROGRESS_EVERY
+        count = 0
+        for enrollment in rows:
+            summary = getattr(enrollment, "result_summary", None)
+            values = [
+                enrollment.roll_no,
+                enrollment.student.name,
+                enrollment.student.student_id,
+                summary.total_obtained if summary else 0,
+                summary.total_full if summary else 0,
+                f"{summary.percentage if summary else '0'}%",
+                summary.overall_grade if summary else ungraded_label,
+            ]
+            if whole_session:
+                values = [enrollment.class_field.name, enrollment.section.name, *values]
+            ws.append([styled(value, border=border) for value in values])
+            count += 1
+            if progress and count % progress_every == 0:
+                progress(count)
+
+        wb.save(fh)
+        if progress:
+            progress(count)
+        self.log.info(
+            "excel.marksheet_written",
+            session_id=str(session_id),
+            class_id=str(class_id) if class_id else None,
+            rows=count,
+        )
+        return count
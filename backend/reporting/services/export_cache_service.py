@@ -0,0 +1,241 @@
+"""Export cache service: content-addressed storage for generated PDF and Excel exports."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import shutil
+import tempfile
+from collections.abc import Callable, Iterator
+from datetime import timedelta
+from uuid import UUID
+
+import structlog
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db.models import Count, Max, Q
+from django.utils import timezone
+
+from shared.base_service import BaseService
+
+logger = structlog.get_logger(__name__)
+
+CONTENT_TYPES = {
+    "pdf": "application/pdf",
+    "excel": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "zip": "application/zip",
+}
+EXTENSIONS = {"pdf": ".pdf", "excel": ".xlsx", "zip": ".zip"}
+CACHE_ROOT = "exports/cache"
+
+
+class ExportCacheService(BaseService):
+    """Renders exports once per distinct input and serves repeats from storage.
+
+    An export's key is a SHA-256 over everything its content depends on: the
+    export kind and parameters, the latest ``updated_at`` and row counts of the
+    enrollments, marks entries and subject results in scope, the grade policy
+    version, EXPORT_TEMPLATE_VERSION and the PDF renderer settings. Report
+    cards print ranks that span the whole session, so their key also covers
+    the session's enrollment totals and its stored rankings (row count, last
+    computation and how many rows are stale). Counts are included so that deletions
+    move the key as well. The key doubles as the HTTP ETag.
+
+    Every input change leaves the previous artifact behind, so ``evict``
+    (run daily by celery beat) deletes artifacts older than
+    EXPORT_CACHE_MAX_AGE_DAYS that no open or recent job still points at.
+    """
+
+    def fingerprint(self, kind: str, params: dict) -> str:
+        from academics.services.grading_service import get_grade_table
+        from enrollments.models import Enrollment
+        from results.models import EnrollmentResult, MarksEntry, SubjectResult
+
+        scope = self._enrollment_scope(params)
+        enrollments = Enrollment.objects.filter(**scope)
+        inputs = {
+            "kind": kind,
+            "params": {key: str(value) for key, value in sorted(params.items())},
+            "template": settings.EXPORT_TEMPLATE_VERSION,
+            "renderer": settings.PDF_RENDERER,
+            "logo": settings.REPORT_CARD_LOGO,
+            "grades": get_grade_table().version,
+            "enrollments": enrollments.aggregate(
+                count=Count("id"),
+                updated=Max("updated_at"),
+                students=Max("student__updated_at"),
+                classes=Max("class_field__updated_at"),
+                sections=Max("section__updated_at"),
+                sessions=Max("session__updated_at"),
+            ),
+            "marks": MarksEntry.objects.filter(enrollment__in=enrollments).aggregate(
+                count=Count("id"), updated=Max("updated_at")
+            ),
+            "results": SubjectResult.objects.filter(enrollment__in=enrollments).aggregate(
+                count=Count("id"), updated=Max("updated_at")
+            ),
+        }
+        if kind.startswith(("pdf", "zip")):
+            from reporting.models import ClassRanking
+
+            session_ids = enrollments.values("session_id")
+            inputs["totals"] = EnrollmentResult.objects.filter(
+                enrollment__session_id__in=session_ids,
+                enrollment__status="active",
+            ).aggregate(count=Count("id"), updated=Max("updated_at"))
+            inputs["rankings"] = ClassRanking.objects.filter(
+                session_id__in=session_ids
+            ).aggregate(
+                count=Count("id"),
+                computed=Max("computed_at"),
+                stale=Count("id", filter=Q(stale=True)),
+            )
+
+        payload = json.dumps(inputs, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    @staticmethod
+    def _enrollment_scope(params: dict) -> dict:
+        if "enrollment_id" in params:
+            return {"id": params["enrollment_id"]}
+        scope = {"session_id": params["session_id"], "status": "active"}
+        if "class_id" in params:
+            scope.update(class_field_id=params["class_id"], section_id=params["section_id"])
+        return scope
+
+    @staticmethod
+    def path(kind: str, digest: str) -> str:
+        return f"{CACHE_ROOT}/{kind}/{digest}{EXTENSIONS[kind.split('_')[0]]}"
+
+    @staticmethod
+    def content_type(kind: str) -> str:
+        return CONTENT_TYPES[kind.split("_")[0]]
+
+    @staticmethod
+    def filename(kind: str, params: dict) -> str:
+        return {
+            "pdf_student": f"report_card_{params.get('enrollment_id')}.pdf",
+            "pdf_class": "class_report_cards.pdf",
+            "pdf_session": "session_report_cards.pdf",
+            "excel_student": f"marksheet_{params.get('enrollment_id')}.xlsx",
+            "excel_class": "class_marksheet.xlsx",
+            "excel_session": "session_marksheet.xlsx",
+            "zip_class": "class_report_cards.zip",
+            "zip_session": "session_report_cards.zip",
+        }[kind]
+
+    def get_or_render(
+        self,
+        kind: str,
+        params: dict,
+        digest: str | None = None,
+        progress: Callable[[int], None] | None = None,
+    ) -> tuple[str, bool]:
+        """Return (storage path, cache hit) for the export, rendering it on a miss."""
+        digest = digest or self.fingerprint(kind, params)
+        path = self.path(kind, digest)
+        if default_storage.exists(path):
+            self.log.info("export_cache.hit", kind=kind, digest=digest)
+            return path, True
+
+        with tempfile.TemporaryFile() as fh:
+            self.render(kind, params, fh, progress)
+            fh.seek(0)
+            path = default_storage.save(path, File(fh))
+        self.log.info("export_cache.stored", kind=kind, digest=digest, path=path)
+        return path, False
+
+    def evict(self) -> int:
+        """Delete stale cached artifacts; returns how many were removed."""
+        from reporting.models import ExportJob, ReportGenerationCheckpoint
+
+        cutoff = timezone.now() - timedelta(days=settings.EXPORT_CACHE_MAX_AGE_DAYS)
+        pinned = set(
+            ExportJob.objects.filter(
+                Q(status__in=["pending", "running"]) | Q(finished_at__gte=cutoff)
+            ).values_list("file", flat=True)
+        )
+        # Unfinished generation jobs can be resumed and need their section files.
+        pinned.update(
+            ReportGenerationCheckpoint.objects.filter(
+                ~Q(job__status="completed") | Q(job__finished_at__gte=cutoff)
+            ).values_list("file", flat=True)
+        )
+
+        deleted = 0
+        try:
+            kinds, _ = default_storage.listdir(CACHE_ROOT)
+        except FileNotFoundError:
+            kinds = []
+        for kind in kinds:
+            _, names = default_storage.listdir(f"{CACHE_ROOT}/{kind}")
+            for name in names:
+                path = f"{CACHE_ROOT}/{kind}/{name}"
+                if path in pinned or default_storage.get_modified_time(path) >= cutoff:
+                    continue
+                default_storage.delete(path)
+                deleted += 1
+        self.log.info("export_cache.evicted", count=deleted, pinned=len(pinned))
+        return deleted
+
+    @staticmethod
+    def iter_chunks(
+        kind: str,
+        params: dict,
+        progress: Callable[[int], None] | None = None,
+    ) -> Iterator[bytes]:
+        """Byte chunks of a streamable (ZIP) export."""
+        from reporting.services.pdf_export_service import PDFExportService
+
+        ids = {key: UUID(str(value)) for key, value in params.items()}
+        if kind == "zip_class":
+            return PDFExportService().generate_class_report_cards_zip(
+                ids["class_id"], ids["section_id"], ids["session_id"], progress
+            )
+        if kind == "zip_session":
+            return PDFExportService().generate_session_report_cards_zip(ids["session_id"], progress)
+        raise ValueError(f"Export kind '{kind}' cannot be streamed.")
+
+    @classmethod
+    def render(
+        cls,
+        kind: str,
+        params: dict,
+        fh,
+        progress: Callable[[int], None] | None = None,
+    ) -> None:
+        """Write the export to ``fh``."""
+        from reporting.services.excel_export_service import ExcelExportService
+        from reporting.services.pdf_export_service import PDFExportService
+
+        if kind.startswith("zip"):
+            for chunk in cls.iter_chunks(kind, params, progress):
+                fh.write(chunk)
+            return
+
+        ids = {key: UUID(str(value)) for key, value in params.items()}
+
+        if kind == "pdf_student":
+            buffer = PDFExportService().generate_student_report_card_pdf(ids["enrollment_id"])
+        elif kind == "pdf_class":
+            buffer = PDFExportService().generate_class_report_cards_pdf(
+                ids["class_id"], ids["section_id"], ids["session_id"], progress
+            )
+        elif kind == "pdf_session":
+            buffer = PDFExportService().generate_session_report_cards_pdf(
+                ids["session_id"], progress
+            )
+        elif kind == "excel_student":
+            buffer = ExcelExportService().generate_student_marksheet_excel(ids["enrollment_id"])
+        else:
+            ExcelExportService().write_marksheet_excel(
+                fh,
+                ids["session_id"],
+                ids.get("class_id"),
+                ids.get("section_id"),
+                progress,
+            )
+            return
+
+        shutil.copyfileobj(buffer, fh)
@@ -0,0 +1,249 @@
+"""Export job service: renders PDF/Excel exports off the request path into media storage."""
+
+from __future__ import annotations
+
+import tempfile
+from datetime import timedelta
+from uuid import UUID
+
+import structlog
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db.models import F, Q
+from django.utils import timezone
+
+from shared.base_service import BaseService
+from reporting.models import ExportJob
+from reporting.services.export_cache_service import ExportCacheService
+
+logger = structlog.get_logger(__name__)
+
+# Parameters each export kind needs, all UUIDs.
+REQUIRED_PARAMS = {
+    "pdf_student": ("enrollment_id",),
+    "pdf_class": ("class_id", "section_id", "session_id"),
+    "pdf_session": ("session_id",),
+    "excel_student": ("enrollment_id",),
+    "excel_class": ("class_id", "section_id", "session_id"),
+    "excel_session": ("session_id",),
+    "zip_class": ("class_id", "section_id", "session_id"),
+    "zip_session": ("session_id",),
+}
+
+# PDF kinds whose chunks are rendered as parallel tasks and merged afterwards.
+FAN_OUT_KINDS = ("pdf_class", "pdf_session")
+CHUNK_ROOT = "exports/chunks"
+
+
+class ExportJobService(BaseService):
+    """Creates export jobs and runs them on the reports queue.
+
+    A job records how many students it covers up front and advances
+    ``items_done`` as the renderer reports progress, so clients can poll the
+    job instead of holding a web worker for the whole render. Artifacts live
+    in the export cache, so a job whose inputs are unchanged since an earlier
+    export completes without rendering.
+
+    Class and session PDFs that span more than one render chunk fan out as a
+    chord on the reports queue: each chunk task renders its students to a
+    part file, and the callback merges the parts into the cached artifact
+    and completes the job.
+    """
+
+    def __init__(self) -> None:
+        self._cache = ExportCacheService()
+
+    def create_job(self, kind: str, params: dict, user) -> ExportJob:
+        job = ExportJob.objects.create(
+            kind=kind,
+            params={key: str(params[key]) for key in REQUIRED_PARAMS[kind]},
+            requested_by=user,
+        )
+        self.log.info("export_job.created", job_id=str(job.id), kind=kind)
+        return job
+
+    def get_or_create_job(self, kind: str, params: dict, user) -> tuple[ExportJob, bool]:
+        """Return an open job for the same export if there is one, else a new job."""
+        job_params = {key: str(params[key]) for key in REQUIRED_PARAMS[kind]}
+        job = ExportJob.objects.filter(
+            kind=kind, params=job_params, status__in=["pending", "running"]
+        ).first()
+        if job is not None:
+            self.log.info("export_job.reused", job_id=str(job.id), kind=kind)
+            return job, False
+        return self.create_job(kind, params, user), True
+
+    def run(self, job_id: UUID) -> ExportJob:
+        """Render a pending job to completion and attach the artifact.
+
+        A fanned-out PDF job is left running; the chord callback completes it.
+        """
+        job = ExportJob.objects.get(id=job_id)
+        job.status = "running"
+        job.started_at = timezone.now()
+        job.items_total = self._count_items(job)
+        job.save(update_fields=["status", "started_at", "items_total", "updated_at"])
+
+        def progress(done: int) -> None:
+            job.items_done = done
+            job.save(update_fields=["items_done", "updated_at"])
+
+        try:
+            digest = self._cache.fingerprint(job.kind, job.params)
+            if job.kind in FAN_OUT_KINDS and self._fan_out(job, digest):
+                return job
+            path, _ = self._cache.get_or_render(
+                job.kind, job.params, digest=digest, progress=progress
+            )
+        except Exception as exc:
+            self._fail(job, str(exc))
+            raise
+        return self._complete(job, path)
+
+    def _fan_out(self, job: ExportJob, digest: str) -> bool:
+        """Dispatch one render task per chunk plus a merge callback; False to render inline."""
+        from celery import chord
+        from reporting.services.pdf_export_service import PDFExportService
+        from tasks.report_tasks import merge_export_chunks, render_export_chunk
+
+        if default_storage.exists(self._cache.path(job.kind, digest)):
+            return False
+        params = {key: UUID(value) for key, value in job.params.items()}
+        chunks = PDFExportService().plan_chunks(
+            params["session_id"], params.get("class_id"), params.get("section_id")
+        )
+        if len(chunks) < 2:
+            return False
+
+        chord(
+            render_export_chunk.s(str(job.id), index, chunk)
+            for index, chunk in enumerate(chunks)
+        )(merge_export_chunks.s(str(job.id), digest))
+        self.log.info("export_job.fanned_out", job_id=str(job.id), chunks=len(chunks))
+        return True
+
+    def render_chunk(self, job_id: UUID, index: int, chunk: dict) -> str:
+        """Render one chunk of a fanned-out job to a part file; returns its storage path."""
+        from reporting.services.pdf_export_service import PDFExportService
+
+        pdf = PDFExportService().render_chunk(chunk)
+        with tempfile.TemporaryFile() as fh:
+            fh.write(pdf)
+            fh.seek(0)
+            path = default_storage.save(f"{CHUNK_ROOT}/{job_id}/{index:05d}.pdf", File(fh))
+        ExportJob.objects.filter(id=job_id).update(
+            items_done=F("items_done") + len(chunk["enrollment_ids"]),
+            updated_at=timezone.now(),
+        )
+        return path
+
+    def merge_chunks(self, job_id: UUID, paths: list[str], digest: str) -> ExportJob:
+        """Chord callback: merge the rendered parts in order into the cache and complete the job."""
+        from reporting.services.pdf_export_service import PDFExportService
+
+        job = ExportJob.objects.get(id=job_id)
+        try:
+            parts = [default_storage.open(path, "rb") for path in paths]
+            try:
+                with tempfile.TemporaryFile() as fh:
+                    PDFExportService().merge(parts, fh)
+                    fh.seek(0)
+                    path = default_storage.save(self._cache.path(job.kind, digest), File(fh))
+            finally:
+                for part in parts:
+                    part.close()
+        except Exception as exc:
+            self._fail(job, str(exc))
+            raise
+        self._discard_chunks(job.id)
+        self.log.info("export_cache.stored", kind=job.kind, digest=digest, path=path)
+        return self._complete(job, path)
+
+    def fail(self, job_id: UUID, message: str) -> None:
+        """Fail a job from outside ``run``, e.g. when one of its chunk tasks gives up."""
+        job = ExportJob.objects.filter(id=job_id, status__in=["pending", "running"]).first()
+        if job is not None:
+            self._fail(job, message)
+
+    def _complete(self, job: ExportJob, path: str) -> ExportJob:
+        job.file.name = path
+        job.filename = self._cache.filename(job.kind, job.params)
+        job.status = "completed"
+        job.items_done = job.items_total
+        job.finished_at = timezone.now()
+        job.save(update_fields=[
+            "status",
+            "items_done",
+            "file",
+            "filename",
+            "finished_at",
+            "updated_at",
+        ])
+        self.log.info(
+            "export_job.completed",
+            job_id=str(job.id),
+            kind=job.kind,
+            items=job.items_total,
+        )
+        return job
+
+    def fail_stale(self) -> int:
+        """Fail jobs whose task can no longer be alive.
+
+        Covers running jobs killed mid-render (e.g. by the hard time limit) and
+        pending jobs whose task was lost before a worker picked it up, which
+        would otherwise be handed back to every request for the same export.
+        """
+        now = timezone.now()
+        cutoff = now - timedelta(seconds=settings.EXPORT_JOB_STALE_AFTER)
+        stale = ExportJob.objects.filter(
+            Q(status="running", started_at__lt=cutoff)
+            | Q(status="pending", created_at__lt=cutoff)
+        )
+        job_ids = list(stale.values_list("id", flat=True))
+        failed = stale.update(
+            status="failed",
+            error="Export did not finish within its time limit.",
+            finished_at=now,
+            updated_at=now,
+        )
+        for job_id in job_ids:
+            self._discard_chunks(job_id)
+        if failed:
+            self.log.warning("export_job.stale_failed", count=failed)
+        return failed
+
+    def _fail(self, job: ExportJob, message: str) -> None:
+        job.status = "failed"
+        job.error = message
+        job.finished_at = timezone.now()
+        job.save(update_fields=["status", "error", "finished_at", "updated_at"])
+        self._discard_chunks(job.id)
+        self.log.error("export_job.failed", job_id=str(job.id), error=message)
+
+    @staticmethod
+    def _discard_chunks(job_id: UUID) -> None:
+        """Delete a fanned-out job's part files, if it has any."""
+        folder = f"{CHUNK_ROOT}/{job_id}"
+        try:
+            _, names = default_storage.listdir(folder)
+        except FileNotFoundError:
+            return
+        for name in names:
+            default_storage.delete(f"{folder}/{name}")
+
+    @staticmethod
+    def _count_items(job: ExportJob) -> int:
+        """Number of students the export covers, for progress reporting."""
+        from enrollments.models import Enrollment
+
+        params = job.params
+        if "enrollment_id" in params:
+            return 1
+        enrollments = Enrollment.objects.filter(session_id=params["session_id"], status="active")
+        if "class_id" in params:
+            enrollments = enrollments.filter(
+                class_field_id=params["class_id"], section_id=params["section_id"]
+            )
+        return enrollments.count()
@@ -0,0 +1,319 @@
+"""Leaderboard service: per-section sorted-set index for live rank lookups."""
+
+from __future__ import annotations
+
+import threading
+from bisect import bisect_left, insort
+from collections.abc import Iterable
+from functools import lru_cache
+from uuid import UUID
+
+import structlog
+from django.conf import settings
+from django.db import transaction
+
+from shared.base_service import BaseService
+from shared.exceptions import ConflictException
+from reporting.services.ranking_service import TIE_POLICY_COMPETITION, TIE_POLICY_DENSE
+
+logger = structlog.get_logger(__name__)
+
+# (session_id, class_id, section_id)
+SectionScope = tuple[UUID, UUID, UUID]
+
+
+class LocalMemoryLeaderboardBackend:
+    """Per-process sorted sets. Suitable for tests and single-process development."""
+
+    def __init__(self) -> None:
+        self._scores: dict[str, dict[str, float]] = {}
+        self._order: dict[str, list[tuple[float, str]]] = {}
+        self._lock = threading.Lock()
+
+    def exists(self, key: str) -> bool:
+        return key in self._scores
+
+    def replace(self, key: str, scores: dict[str, float]) -> None:
+        with self._lock:
+            self._scores[key] = dict(scores)
+            self._order[key] = sorted((-score, member) for member, score in scores.items())
+
+    def add(self, key: str, member: str, score: float) -> None:
+        with self._lock:
+            scores = self._scores.setdefault(key, {})
+            order = self._order.setdefault(key, [])
+            if member in scores:
+                order.pop(bisect_left(order, (-scores[member], member)))
+            scores[member] = score
+            insort(order, (-score, member))
+
+    def remove(self, key: str, member: str) -> None:
+        with self._lock:
+            scores = self._scores.get(key, {})
+            if member in scores:
+                order = self._order[key]
+                order.pop(bisect_left(order, (-scores.pop(member), member)))
+
+    def discard(self, prefix: str, member: str, keep: str) -> None:
+        for key in [k for k in self._scores if k.startswith(prefix) and k != keep]:
+            self.remove(key, member)
+
+    def score(self, key: str, member: str) -> float | None:
+        return self._scores.get(key, {}).get(member)
+
+    def size(self, key: str) -> int:
+        return len(self._scores.get(key, {}))
+
+    def count_above(self, key: str, score: float) -> int:
+        return bisect_left(self._order.get(key, []), (-score, ""))
+
+    def distinct_above(self, key: str, score: float) -> int:
+        order = self._order.get(key, [])
+        return len({s for s, _ in order[: bisect_left(order, (-score, ""))]})
+
+    def position(self, key: str, member: str) -> int | None:
+        score = self.score(key, member)
+        if score is None:
+            return None
+        return bisect_left(self._order[key], (-score, member))
+
+    def range(self, key: str, start: int, stop: int) -> list[tuple[str, float]]:
+        return [(m, -s) for s, m in self._order.get(key, [])[start : stop + 1]]
+
+
+@lru_cache(maxsize=None)
+def _redis_client(url: str):
+    """One client, and so one connection pool, per process and URL."""
+    import redis
+
+    return redis.Redis.from_url(url, decode_responses=True)
+
+
+class RedisLeaderboardBackend:
+    """Redis sorted set per section; member is the enrollment id, score the percentage."""
+
+    def __init__(self, url: str | None = None) -> None:
+        self._redis = _redis_client(
+            url or getattr(settings, "REDIS_URL", "redis://localhost:6379/0")
+        )
+
+    def exists(self, key: str) -> bool:
+        return bool(self._redis.exists(key))
+
+    def replace(self, key: str, scores: dict[str, float]) -> None:
+        pipe = self._redis.pipeline(transaction=True)
+        pipe.delete(key)
+        if scores:
+            pipe.zadd(key, scores)
+        pipe.execute()
+
+    def add(self, key: str, member: str, score: float) -> None:
+        self._redis.zadd(key, {member: score})
+
+    def remove(self, key: str, member: str) -> None:
+        self._redis.zrem(key, member)
+
+    def discard(self, prefix: str, member: str, keep: str) -> None:
+        pipe = self._redis.pipeline(transaction=False)
+        for key in self._redis.scan_iter(match=f"{prefix}*"):
+            if key != keep:
+                pipe.zrem(key, member)
+        pipe.execute()
+
+    def score(self, key: str, member: str) -> float | None:
+        return self._redis.zscore(key, member)
+
+    def size(self, key: str) -> int:
+        return self._redis.zcard(key)
+
+    def count_above(self, key: str, score: float) -> int:
+        return self._redis.zcount(key, f"({score}", "+inf")
+
+    def distinct_above(self, key: str, score: float) -> int:
+        above = self._redis.zrangebyscore(key, f"({score}", "+inf", withscores=True)
+        return len({s for _, s in above})
+
+    def position(self, key: str, member: str) -> int | None:
+        return self._redis.zrevrank(key, member)
+
+    def range(self, key: str, start: int, stop: int) -> list[tuple[str, float]]:
+        return self._redis.zrevrange(key, start, stop, withscores=True)
+
+
+_local_backend = LocalMemoryLeaderboardBackend()
+
+
+def get_leaderboard_backend():
+    if settings.LEADERBOARD_BACKEND == "redis":
+        return RedisLeaderboardBackend()
+    return _local_backend
+
+
+class LeaderboardService(BaseService):
+    """Live section leaderboards over EnrollmentResult percentages.
+
+    Every lookup is O(log n) on the sorted set, plus a scan of the members
+    above the slice for dense ranks. Ranks follow RANKING_TIE_POLICY for
+    ``competition`` (1, 2, 2, 4) and ``dense`` (1, 2, 2, 3); the board holds
+    only percentages, so it cannot be read under the ``subject`` policy.
+    Sections are indexed lazily from EnrollmentResult on first read and then
+    kept current by ResultService as enrollment totals change, and by
+    EnrollmentService when an enrollment changes section or status.
+    Enrollments without any subject result are not on the board. Board
+    updates are best effort: a failure is logged and never fails the write
+    that triggered it.
+    """
+
+    def __init__(self, backend=None, tie_policy: str | None = None) -> None:
+        self.backend = backend or get_leaderboard_backend()
+        self.tie_policy = tie_policy or getattr(
+            settings, "RANKING_TIE_POLICY", TIE_POLICY_COMPETITION
+        )
+
+    @staticmethod
+    def _key(scope: SectionScope) -> str:
+        session_id, class_id, section_id = scope
+        return f"leaderboard:{session_id}:{class_id}:{section_id}"
+
+    def rebuild(self, scope: SectionScope) -> int:
+        """(Re)index one section from its EnrollmentResult rows in one query."""
+        from results.models import EnrollmentResult
+
+        session_id, class_id, section_id = scope
+        scores = {
+            str(enrollment_id): float(percentage)
+            for enrollment_id, percentage in EnrollmentResult.objects.filter(
+                enrollment__session_id=session_id,
+                enrollment__class_field_id=class_id,
+                enrollment__section_id=section_id,
+                enrollment__status="active",
+            ).values_list("enrollment_id", "percentage")
+        }
+        self.backend.replace(self._key(scope), scores)
+        self.log.info("leaderboard.rebuilt", key=self._key(scope), size=len(scores))
+        return len(scores)
+
+    def _ensure(self, scope: SectionScope) -> str:
+        if self.tie_policy not in (TIE_POLICY_COMPETITION, TIE_POLICY_DENSE):
+            raise ConflictException(
+                f"Live leaderboards do not support the '{self.tie_policy}' tie policy."
+            )
+        key = self._key(scope)
+        if not self.backend.exists(key):
+            self.rebuild(scope)
+        return key
+
+    def record(
+        self,
+        scores: dict[UUID, float],
+        removed: Iterable[UUID] = (),
+    ) -> None:
+        """Apply changed enrollment percentages after the current transaction commits.
+
+        Only sections already indexed are touched; the rest are built on first read.
+        """
+        removed = set(removed)
+        if not scores and not removed:
+            return
+        scores = dict(scores)
+        transaction.on_commit(lambda: self._apply_logged(scores, removed))
+
+    def relocate(self, enrollment_ids: Iterable[UUID]) -> None:
+        """Re-place enrollments whose section or status changed, after the transaction commits.
+
+        Each one is taken off every other board of its session, then put on
+        its current board if it is active and has totals.
+        """
+        from results.models import EnrollmentResult
+
+        moved = set(enrollment_ids)
+        if not moved:
+            return
+
+        def apply() -> None:
+            scores = {
+                enrollment_id: float(percentage)
+                for enrollment_id, percentage in EnrollmentResult.objects.filter(
+                    enrollment_id__in=moved
+                ).values_list("enrollment_id", "percentage")
+            }
+            self._apply_logged(scores, moved - set(scores), moved)
+
+        transaction.on_commit(apply)
+
+    def _apply_logged(
+        self,
+        scores: dict[UUID, float],
+        removed: set[UUID],
+        moved: set[UUID] = frozenset(),
+    ) -> None:
+        """Run after commit, so a backend outage must not surface as a failed request."""
+        try:
+            self._apply(scores, removed, moved)
+        except Exception as exc:
+            self.log.warning(
+                "leaderboard.update_failed",
+                enrollments=len(set(scores) | removed | moved),
+                error=str(exc),
+            )
+
+    def _apply(
+        self,
+        scores: dict[UUID, float],
+        removed: set[UUID],
+        moved: set[UUID] = frozenset(),
+    ) -> None:
+        from enrollments.models import Enrollment
+
+        placements = Enrollment.objects.filter(
+            id__in=set(scores) | removed | moved
+        ).values_list("id", "session_id", "class_field_id", "section_id", "status")
+        for enrollment_id, session_id, class_id, section_id, status in placements:
+            key = self._key((session_id, class_id, section_id))
+            member = str(enrollment_id)
+            if enrollment_id in moved:
+                self.backend.discard(f"leaderboard:{session_id}:", member, keep=key)
+            if not self.backend.exists(key):
+                continue
+            if enrollment_id in removed or status != "active":
+                self.backend.remove(key, member)
+            else:
+                self.backend.add(key, member, scores[enrollment_id])
+
+    def top(self, scope: SectionScope, limit: int = 10) -> list[dict]:
+        key = self._ensure(scope)
+        return self._ranked(key, 0, self.backend.range(key, 0, limit - 1))
+
+    def around(self, scope: SectionScope, enrollment_id: UUID, radius: int = 2) -> list[dict]:
+        """The enrollment plus up to ``radius`` neighbours on either side."""
+        key = self._ensure(scope)
+        position = self.backend.position(key, str(enrollment_id))
+        if position is None:
+            return []
+        start = max(position - radius, 0)
+        return self._ranked(key, start, self.backend.range(key, start, position + radius))
+
+    def _ranked(self, key: str, start: int, members: list[tuple[str, float]]) -> list[dict]:
+        """Attach tie-policy ranks to the descending slice of the board beginning at ``start``.
+
+        Only the first member's rank depends on members outside the slice, so
+        it is the only one that needs a count query.
+        """
+        dense = self.tie_policy == TIE_POLICY_DENSE
+        entries = []
+        rank = None
+        previous = None
+        for offset, (member, score) in enumerate(members):
+            if score != previous:
+                if previous is None:
+                    above = (
+                        self.backend.distinct_above(key, score)
+                        if dense
+                        else self.backend.count_above(key, score)
+                    )
+                    rank = above + 1
+                else:
+                    rank = rank + 1 if dense else start + offset + 1
+                previous = score
+            entries.append({"enrollment_id": member, "percentage": score, "rank": rank})
+        return entries
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+from collections import defaultdict
 from uuid import UUID
 from decimal import Decimal
 
@@ -10,8 +11,9 @@ from django.db.models import Sum
 
 from shared.base_service import BaseService
 from shared.types import MarksheetDTO
-from results.models import MarksEntry, SubjectResult
+from results.models import EnrollmentResult, MarksEntry
 from results.services.result_service import ResultService
+from reporting.selectors.report_selector import ReportSelector
 
 logger = structlog.get_logger(__name__)
 
@@ -31,7 +33,7 @@ class MarksheetService(BaseService):
 
         enrollment = (
             Enrollment.objects.select_related(
-                "student", "session", "class_field", "section"
+                "student", "session", "class_field", "section", "result_summary"
             )
             .get(id=enrollment_id)
         )
@@ -42,6 +44,66 @@ class MarksheetService(BaseService):
             .order_by("subject__code", "assessment_type__display_order")
         )
 
+        marksheet = self._build_marksheet(
+            enrollment,
+            marks_entries,
+            self._result_service.get_enrollment_totals(enrollment),
+        )
+
+        self.log.info(
+            "marksheet.generated",
+            enrollment_id=str(enrollment_id),
+            percentage=marksheet.percentage,
+        )
+        return marksheet
+
+    def generate_class_marksheet(
+        self,
+        class_id: UUID,
+        section_id: UUID,
+        session_id: UUID,
+    ) -> list[MarksheetDTO]:
+        """Generate marksheets for all students in a class-section-session.
+
+        Batched: one query for the enrollments (with their stored totals) and
+        one for every marks entry of the section, grouped in memory. Each
+        marksheet matches generate_student_marksheet for the same student.
+        """
+        enrollments = list(
+            ReportSelector().get_class_enrollments(class_id, section_id, session_id)
+        )
+
+        entries_by_enrollment: dict[UUID, list[MarksEntry]] = defaultdict(list)
+        for entry in (
+            MarksEntry.objects.filter(enrollment_id__in=[e.id for e in enrollments])
+            .select_related("subject", "assessment_type")
+            .order_by("subject__code", "assessment_type__display_order")
+        ):
+            entries_by_enrollment[entry.enrollment_id].append(entry)
+
+        totals = self._result_service.get_totals_for_enrollments(enrollments)
+        marksheets = [
+            self._build_marksheet(
+                enrollment, entries_by_enrollment[enrollment.id], totals[enrollment.id]
+            )
+            for enrollment in enrollments
+        ]
+
+        self.log.info(
+            "marksheets.class_generated",
+            class_id=str(class_id),
+            section_id=str(section_id),
+            count=len(marksheets),
+        )
+        return marksheets
+
+    def _build_marksheet(
+        self,
+        enrollment,
+        marks_entries: list[MarksEntry],
+        totals: EnrollmentResult,
+    ) -> MarksheetDTO:
+        """Assemble a MarksheetDTO from an enrollment, its ordered marks entries and totals."""
         subjects_map: dict[UUID, dict] = {}
         for entry in marks_entries:
             sub_id = entry.subject_id
@@ -58,24 +120,6 @@ class MarksheetService(BaseService):
                 "obtained_marks": entry.obtained_marks,
             })
 
-        results = list(
-            SubjectResult.objects.filter(enrollment=enrollment)
-            .select_related("subject")
-        )
-
-        total_marks = sum(r.total_obtained for r in results)
-        total_full = sum(r.total_full for r in results)
-        percentage = (
-            Decimal(str(round((total_marks / total_full) * 100, 2)))
-            if total_full > 0
-            else Decimal("0")
-        )
-
-        from academics.services.grading_service import GradingService
-
-        grading = GradingService()
-        overall_grade, _ = grading.calculate_grade(float(percentage))
-
         subjects_list = list(subjects_map.values())
         cocurricular = [
             {
@@ -88,7 +132,7 @@ class MarksheetService(BaseService):
             if entry.subject.subject_type == "cocurricular"
         ]
 
-        marksheet = MarksheetDTO(
+        return MarksheetDTO(
             student_name=enrollment.student.name,
             student_id=enrollment.student.student_id,
             roll_no=enrollment.roll_no,
@@ -97,48 +141,8 @@ class MarksheetService(BaseService):
             session_name=enrollment.session.name,
             subjects=subjects_list,
             cocurricular=cocurricular,
-            total_marks=total_marks,
-            total_full=total_full,
-            percentage=percentage,
-            overall_grade=overall_grade,
-        )
-
-        self.log.info(
-            "marksheet.generated",
-            enrollment_id=str(enrollment_id),
-            percentage=percentage,
-        )
-        return marksheet
-
-    def generate_class_marksheet(
-        self,
-        class_id: UUID,
-        section_id: UUID,
-        session_id: UUID,
-    ) -> list[MarksheetDTO]:
-        """Generate marksheets for all students in a class-section-session."""
-        from enrollments.models import Enrollment
-
-        enrollments = (
-            Enrollment.objects.filter(
-                class_field_id=class_id,
-                section_id=section_id,
-                session_id=session_id,
-                status="active",
-            )
-            .select_related("student")
-            .order_by("roll_no")
-        )
-
-        marksheets = []
-        for enrollment in enrollments:
-            marksheet = self.generate_student_marksheet(enrollment.id)
-            marksheets.append(marksheet)
-
-        self.log.info(
-            "marksheets.class_generated",
-            class_id=str(class_id),
-            section_id=str(section_id),
-            count=len(marksheets),
+            total_marks=totals.total_obtained,
+            total_full=totals.total_full,
+            percentage=Decimal(totals.percentage),
+            overall_grade=totals.overall_grade,
         )
-        return marksheets
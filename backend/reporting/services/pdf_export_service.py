@@ -2,17 +2,188 @@
 
 from __future__ import annotations
 
+from collections.abc import Callable, Iterable, Iterator
+from functools import lru_cache, partial
+from itertools import groupby, islice
 from uuid import UUID
 import io
+import re
+import zipfile
 
 import structlog
+from django.conf import settings
+
 from shared.base_service import BaseService
+from shared.types import ReportCardDTO
 
 logger = structlog.get_logger(__name__)
 
 
+RENDERER_FLOWABLE = "flowable"
+RENDERER_CANVAS = "canvas"
+
+
+@lru_cache(maxsize=1)
+def _table_styles() -> tuple:
+    """The info and results TableStyles, built once per process and shared by every card."""
+    from reportlab.lib import colors
+    from reportlab.platypus import TableStyle
+
+    info_style = TableStyle([
+        ("BACKGROUND", (0, 0), (0, -1), colors.grey),
+        ("TEXTCOLOR", (0, 0), (0, -1), colors.whitesmoke),
+        ("ALIGN", (0, 0), (-1, -1), "LEFT"),
+        ("FONTNAME", (0, 0), (0, -1), "Helvetica-Bold"),
+        ("BOTTOMPADDING", (0, 0), (-1, -1), 8),
+        ("TOPPADDING", (0, 0), (-1, -1), 8),
+    ])
+    results_style = TableStyle([
+        ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#2563eb")),
+        ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
+        ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+        ("FONTNAME", (0, -1), (-1, -1), "Helvetica-Bold"),
+        ("BACKGROUND", (0, -1), (-1, -1), colors.HexColor("#e0e7ff")),
+        ("GRID", (0, 0), (-1, -1), 1, colors.black),
+        ("BOTTOMPADDING", (0, 0), (-1, -1), 8),
+        ("TOPPADDING", (0, 0), (-1, -1), 8),
+    ])
+    return info_style, results_style
+
+
+def _report_card_flowables(report: ReportCardDTO, styles, logo: str | None = None) -> list:
+    """Platypus flowables for one report card page."""
+    from reportlab.platypus import Image, Table, Paragraph, Spacer
+
+    info_style, results_style = _table_styles()
+    elements = []
+
+    if logo:
+        elements.append(Image(logo, width=48, height=48, kind="proportional"))
+
+    # Header
+    elements.append(Paragraph(
+        f"Report Card - {report.session_name}",
+        styles["Title"],
+    ))
+    elements.append(Spacer(1, 12))
+
+    # Student Info
+    info_data = [
+        ["Student Name", report.student_name],
+        ["Student ID", report.student_id],
+        ["Roll No", report.roll_no],
+        ["Class", f"{report.class_name} - {report.section_name}"],
+    ]
+    info_table = Table(info_data, colWidths=[120, 300])
+    info_table.setStyle(info_style)
+    elements.append(info_table)
+    elements.append(Spacer(1, 20))
+
+    # Results Table
+    results_data = [["Subject", "Marks", "Max", "Percentage", "Grade"]]
+    for result in report.results:
+        results_data.append([
+            result.subject_name,
+            str(result.total_obtained),
+            str(result.total_full),
+            f"{result.percentage}%",
+            result.grade,
+        ])
+
+    # Totals row
+    results_data.append([
+        "TOTAL",
+        str(report.total_marks),
+        str(report.total_full),
+        f"{report.percentage}%",
+        report.overall_grade,
+    ])
+
+    results_table = Table(results_data, colWidths=[150, 80, 80, 100, 80])
+    results_table.setStyle(results_style)
+    elements.append(results_table)
+    return elements
+
+
+def render_report_cards_pdf(
+    reports: Iterable[ReportCardDTO],
+    renderer: str = RENDERER_FLOWABLE,
+    logo: str | None = None,
+) -> bytes:
+    """Render report cards into one PDF, a page break between students.
+
+    ``renderer`` picks the platypus flowable layout or the fixed-layout canvas
+    renderer. Works on DTOs only, so it is safe to run in a worker process.
+    """
+    if renderer == RENDERER_CANVAS:
+        from reporting.services.report_card_canvas import render_report_cards_canvas
+
+        return render_report_cards_canvas(reports, logo)
+
+    from reportlab.lib.pagesizes import A4
+    from reportlab.platypus import SimpleDocTemplate, PageBreak
+    from reportlab.lib.styles import getSampleStyleSheet
+
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4)
+    styles = getSampleStyleSheet()
+    elements = []
+    for i, report in enumerate(reports):
+        if i > 0:
+            elements.append(PageBreak())
+        elements.extend(_report_card_flowables(report, styles, logo))
+    doc.build(elements)
+    return buffer.getvalue()
+
+
+class _ChunkSink:
+    """Write-only, unseekable file object that hands back what was written since the last drain.
+
+    ZipFile falls back to data descriptors on unseekable output, so an archive
+    can be streamed member by member.
+    """
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _zip_member_name(report: ReportCardDTO) -> str:
+    def clean(value) -> str:
+        return re.sub(r"[^\w.-]+", "_", str(value)).strip("_") or "_"
+
+    folder = f"{clean(report.class_name)}-{clean(report.section_name)}"
+    return f"{folder}/{clean(report.roll_no)}_{clean(report.student_id)}.pdf"
+
+
 class PDFExportService(BaseService):
-    """Generates PDF files for report cards and marksheets."""
+    """Generates PDF files for report cards and marksheets.
+
+    The layout engine is chosen by PDF_RENDERER: ``flowable`` (platypus) or
+    ``canvas`` (fixed layout, drawn directly).
+    """
+
+    def __init__(self, renderer: str | None = None) -> None:
+        self.renderer = renderer or settings.PDF_RENDERER
+        if self.renderer not in (RENDERER_FLOWABLE, RENDERER_CANVAS):
+            raise ValueError(f"Unknown PDF renderer '{self.renderer}'.")
+        self._render = partial(
+            render_report_cards_pdf,
+            renderer=self.renderer,
+            logo=settings.REPORT_CARD_LOGO,
+        )
 
     def generate_student_report_card_pdf(self, enrollment_id: UUID) -> io.BytesIO:
         """Generate a PDF report card for a single student."""
@@ -21,174 +192,226 @@ class PDFExportService(BaseService):
         report_svc = ReportCardService()
         report = report_svc.generate_student_report_card(enrollment_id)
 
-        buffer = io.BytesIO()
         try:
-            from reportlab.lib.pagesizes import A4
-            from reportlab.lib import colors
-            from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-            from reportlab.lib.styles import getSampleStyleSheet
-
-            doc = SimpleDocTemplate(buffer, pagesize=A4)
-            styles = getSampleStyleSheet()
-            elements = []
-
-            # Header
-            elements.append(Paragraph(
-                f"Report Card - {report.session_name}",
-                styles["Title"],
-            ))
-            elements.append(Spacer(1, 12))
-
-            # Student Info
-            info_data = [
-                ["Student Name", report.student_name],
-                ["Student ID", report.student_id],
-                ["Roll No", report.roll_no],
-                ["Class", f"{report.class_name} - {report.section_name}"],
-            ]
-            info_table = Table(info_data, colWidths=[120, 300])
-            info_table.setStyle(TableStyle([
-                ("BACKGROUND", (0, 0), (0, -1), colors.grey),
-                ("TEXTCOLOR", (0, 0), (0, -1), colors.whitesmoke),
-                ("ALIGN", (0, 0), (-1, -1), "LEFT"),
-                ("FONTNAME", (0, 0), (0, -1), "Helvetica-Bold"),
-                ("BOTTOMPADDING", (0, 0), (-1, -1), 8),
-                ("TOPPADDING", (0, 0), (-1, -1), 8),
-            ]))
-            elements.append(info_table)
-            elements.append(Spacer(1, 20))
-
-            # Results Table
-            results_data = [["Subject", "Marks", "Max", "Percentage", "Grade"]]
-            for result in report.results:
-                results_data.append([
-                    result.subject_id,
-                    str(result.total_obtained),
-                    str(result.total_full),
-                    f"{result.percentage}%",
-                    result.grade,
-                ])
-
-            # Totals row
-            results_data.append([
-                "TOTAL",
-                str(report.total_marks),
-                str(report.total_full),
-                f"{report.percentage}%",
-                report.overall_grade,
-            ])
-
-            results_table = Table(results_data, colWidths=[150, 80, 80, 100, 80])
-            results_table.setStyle(TableStyle([
-                ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#2563eb")),
-                ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
-                ("ALIGN", (0, 0), (-1, -1), "CENTER"),
-                ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-                ("FONTNAME", (0, -1), (-1, -1), "Helvetica-Bold"),
-                ("BACKGROUND", (0, -1), (-1, -1), colors.HexColor("#e0e7ff")),
-                ("GRID", (0, 0), (-1, -1), 1, colors.black),
-                ("BOTTOMPADDING", (0, 0), (-1, -1), 8),
-                ("TOPPADDING", (0, 0), (-1, -1), 8),
-            ]))
-            elements.append(results_table)
-
-            doc.build(elements)
-            buffer.seek(0)
-            return buffer
-
+            return io.BytesIO(self._render([report]))
         except ImportError:
             self.log.error("reportlab_not_installed")
             raise RuntimeError("reportlab is required for PDF generation")
 
-
     def generate_class_report_cards_pdf(
         self,
         class_id: UUID,
         section_id: UUID,
         session_id: UUID,
+        progress: Callable[[int], None] | None = None,
     ) -> io.BytesIO:
         """Generate a multi-page PDF with all student report cards in a class."""
         from reporting.services.report_card_service import ReportCardService
 
-        report_svc = ReportCardService()
-        reports = report_svc.generate_class_report_cards(class_id, section_id, session_id)
+        reports = ReportCardService().iter_class_report_cards(class_id, section_id, session_id)
+        return self._render_chunked(reports, progress)
+
+    def generate_session_report_cards_pdf(
+        self,
+        session_id: UUID,
+        progress: Callable[[int], None] | None = None,
+    ) -> io.BytesIO:
+        """Generate one PDF with the report cards of every class-section in a session."""
+        return self._render_chunked(self._iter_session_report_cards(session_id), progress)
 
-        buffer = io.BytesIO()
+    def generate_class_report_cards_zip(
+        self,
+        class_id: UUID,
+        section_id: UUID,
+        session_id: UUID,
+        progress: Callable[[int], None] | None = None,
+    ) -> Iterator[bytes]:
+        """Stream a ZIP with one report card PDF per student in a class-section."""
+        from reporting.services.report_card_service import ReportCardService
+
+        reports = ReportCardService().iter_class_report_cards(class_id, section_id, session_id)
+        return self._iter_zip(reports, progress)
+
+    def generate_session_report_cards_zip(
+        self,
+        session_id: UUID,
+        progress: Callable[[int], None] | None = None,
+    ) -> Iterator[bytes]:
+        """Stream a ZIP with one report card PDF per student in a session, a folder per section."""
+        return self._iter_zip(self._iter_session_report_cards(session_id), progress)
+
+    def _iter_zip(
+        self,
+        reports: Iterable[ReportCardDTO],
+        progress: Callable[[int], None] | None = None,
+    ) -> Iterator[bytes]:
+        """Render each report card on its own and yield the archive bytes as members are added.
+
+        Report data comes from the batched report card iterators; only one
+        rendered PDF is held in memory at a time.
+        """
         try:
-            from reportlab.lib.pagesizes import A4
-            from reportlab.lib import colors
-            from reportlab.platypus import (
-                SimpleDocTemplate, Table, TableStyle,
-                Paragraph, Spacer, PageBreak,
+            import reportlab  # noqa: F401
+        except ImportError:
+            self.log.error("reportlab_not_installed")
+            raise RuntimeError("reportlab is required for PDF generation")
+
+        progress_every = settings.PDF_RENDER_CHUNK_SIZE
+        sink = _ChunkSink()
+        count = 0
+        with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            for report in reports:
+                archive.writestr(_zip_member_name(report), self._render([report]))
+                count += 1
+                if progress and count % progress_every == 0:
+                    progress(count)
+                yield sink.drain()
+        yield sink.drain()
+
+        if progress:
+            progress(count)
+        self.log.info("pdf.zip_streamed", count=count)
+
+    @staticmethod
+    def _iter_session_report_cards(session_id: UUID) -> Iterator[ReportCardDTO]:
+        from enrollments.models import Enrollment
+        from reporting.services.report_card_service import ReportCardService
+
+        report_svc = ReportCardService()
+        sections = (
+            Enrollment.objects.filter(session_id=session_id, status="active")
+            .values_list("class_field_id", "section_id")
+            .order_by("class_field__level", "section__name")
+            .distinct()
+        )
+        for class_id, section_id in sections:
+            yield from report_svc.iter_class_report_cards(class_id, section_id, session_id)
+
+    def plan_chunks(
+        self,
+        session_id: UUID,
+        class_id: UUID | None = None,
+        section_id: UUID | None = None,
+    ) -> list[dict]:
+        """Split a class or session PDF into render chunks, in page order.
+
+        Each chunk is a JSON-safe dict naming one class-section and up to
+        PDF_RENDER_CHUNK_SIZE of its enrollments, so chunks can be rendered
+        by separate tasks (see ``render_chunk``) and merged afterwards.
+        """
+        from enrollments.models import Enrollment
+
+        enrollments = Enrollment.objects.filter(session_id=session_id, status="active")
+        if class_id is not None:
+            enrollments = enrollments.filter(class_field_id=class_id, section_id=section_id)
+        rows = enrollments.values_list("class_field_id", "section_id", "id").order_by(
+            "class_field__level", "section__name", "class_field_id", "section_id", "roll_no", "id"
+        )
+
+        chunk_size = settings.PDF_RENDER_CHUNK_SIZE
+        chunks = []
+        for (cls_id, sec_id), members in groupby(rows, key=lambda r: (r[0], r[1])):
+            ids = [str(r[2]) for r in members]
+            for start in range(0, len(ids), chunk_size):
+                chunks.append({
+                    "session_id": str(session_id),
+                    "class_id": str(cls_id),
+                    "section_id": str(sec_id),
+                    "enrollment_ids": ids[start : start + chunk_size],
+                })
+        return chunks
+
+    def render_chunk(self, chunk: dict) -> bytes:
+        """Render one chunk from ``plan_chunks`` to PDF bytes."""
+        from reporting.services.report_card_service import ReportCardService
+
+        reports = list(
+            ReportCardService().iter_class_report_cards(
+                UUID(chunk["class_id"]),
+                UUID(chunk["section_id"]),
+                UUID(chunk["session_id"]),
+                enrollment_ids=[UUID(e) for e in chunk["enrollment_ids"]],
             )
-            from reportlab.lib.styles import getSampleStyleSheet
-
-            doc = SimpleDocTemplate(buffer, pagesize=A4)
-            styles = getSampleStyleSheet()
-            elements = []
-
-            for i, report in enumerate(reports):
-                if i > 0:
-                    elements.append(PageBreak())
-
-                elements.append(Paragraph(
-                    f"Report Card - {report.session_name}",
-                    styles["Title"],
-                ))
-                elements.append(Spacer(1, 12))
-
-                info_data = [
-                    ["Student Name", report.student_name],
-                    ["Student ID", report.student_id],
-                    ["Roll No", report.roll_no],
-                    ["Class", f"{report.class_name} - {report.section_name}"],
-                ]
-                info_table = Table(info_data, colWidths=[120, 300])
-                info_table.setStyle(TableStyle([
-                    ("BACKGROUND", (0, 0), (0, -1), colors.grey),
-                    ("TEXTCOLOR", (0, 0), (0, -1), colors.whitesmoke),
-                    ("FONTNAME", (0, 0), (0, -1), "Helvetica-Bold"),
-                    ("BOTTOMPADDING", (0, 0), (-1, -1), 8),
-                    ("TOPPADDING", (0, 0), (-1, -1), 8),
-                ]))
-                elements.append(info_table)
-                elements.append(Spacer(1, 20))
-
-                results_data = [["Subject", "Marks", "Max", "Percentage", "Grade"]]
-                for result in report.results:
-                    results_data.append([
-                        result.subject_id,
-                        str(result.total_obtained),
-                        str(result.total_full),
-                        f"{result.percentage}%",
-                        result.grade,
-                    ])
-                results_data.append([
-                    "TOTAL",
-                    str(report.total_marks),
-                    str(report.total_full),
-                    f"{report.percentage}%",
-                    report.overall_grade,
-                ])
-
-                results_table = Table(results_data, colWidths=[150, 80, 80, 100, 80])
-                results_table.setStyle(TableStyle([
-                    ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#2563eb")),
-                    ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
-                    ("ALIGN", (0, 0), (-1, -1), "CENTER"),
-                    ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-                    ("FONTNAME", (0, -1), (-1, -1), "Helvetica-Bold"),
-                    ("BACKGROUND", (0, -1), (-1, -1), colors.HexColor("#e0e7ff")),
-                    ("GRID", (0, 0), (-1, -1), 1, colors.black),
-                    ("BOTTOMPADDING", (0, 0), (-1, -1), 8),
-                    ("TOPPADDING", (0, 0), (-1, -1), 8),
-                ]))
-                elements.append(results_table)
-
-            doc.build(elements)
+        )
+        try:
+            return self._render(reports)
+        except ImportError:
+            self.log.error("reportlab_not_installed")
+            raise RuntimeError("reportlab is required for PDF generation")
+
+    def merge(self, parts: Iterable, fh) -> None:
+        """Append PDF ``parts`` (bytes or binary file objects) in order and write them to ``fh``."""
+        try:
+            from pypdf import PdfWriter
+        except ImportError:
+            self.log.error("pypdf_not_installed")
+            raise RuntimeError("pypdf is required to merge PDF report cards")
+
+        writer = PdfWriter()
+        for part in parts:
+            writer.append(io.BytesIO(part) if isinstance(part, bytes) else part)
+        writer.write(fh)
+
+    def _render_chunked(
+        self,
+        reports: Iterable[ReportCardDTO],
+        progress: Callable[[int], None] | None = None,
+    ) -> io.BytesIO:
+        """Render report cards chunk by chunk in this process and merge the pages.
+
+        Only one chunk of report data and its rendered PDF are held at a time
+        before being appended to the output. ``progress`` is called with the
+        number of report cards rendered so far, once per chunk. Export jobs
+        render large class and session PDFs as parallel chunk tasks instead
+        (see ExportJobService).
+        """
+        chunk_size = settings.PDF_RENDER_CHUNK_SIZE
+        reports = iter(reports)
+        first = list(islice(reports, chunk_size))
+        second = list(islice(reports, chunk_size))
+
+        try:
+            if not second:
+                return self._render_serial(first, progress)
+
+            rendered = 0
+
+            def rendered_chunks() -> Iterator[bytes]:
+                nonlocal rendered
+                for chunk in self._chunks(reports, chunk_size, first, second):
+                    pdf = self._render(chunk)
+                    rendered += len(chunk)
+                    if progress:
+                        progress(rendered)
+                    yield pdf
+
+            buffer = io.BytesIO()
+            self.merge(rendered_chunks(), buffer)
             buffer.seek(0)
+            self.log.info("pdf.rendered_chunked", rendered=rendered)
             return buffer
 
         except ImportError:
             self.log.error("reportlab_not_installed")
             raise RuntimeError("reportlab is required for PDF generation")
+
+    @staticmethod
+    def _chunks(
+        reports: Iterator[ReportCardDTO],
+        chunk_size: int,
+        *head: list[ReportCardDTO],
+    ) -> Iterator[list[ReportCardDTO]]:
+        """The already-read ``head`` chunks, then the rest of ``reports`` in chunks."""
+        yield from head
+        while chunk := list(islice(reports, chunk_size)):
+            yield chunk
+
+    def _render_serial(
+        self,
+        reports: list[ReportCardDTO],
+        progress: Callable[[int], None] | None = None,
+    ) -> io.BytesIO:
+        buffer = io.BytesIO(self._render(reports))
+        if progress:
+            progress(len(reports))
+        return buffer
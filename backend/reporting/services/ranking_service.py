@@ -1,21 +1,86 @@
-"""Ranking service: computes student rankings within a class."""
+"""Ranking service: computes student rankings within a section, class and session."""
 
 from __future__ import annotations
 
+from collections import Counter
+from collections.abc import Iterable
+from datetime import timedelta
 from uuid import UUID
 from decimal import Decimal
 
 import structlog
-from django.db.models import Sum
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import DecimalField, F, Max, Q, Value, Window
+from django.db.models.functions import Coalesce, DenseRank, PercentRank, Rank
+from django.utils import timezone
 
 from shared.base_service import BaseService
-from results.models import SubjectResult
+from reporting.models import ClassRanking
 
 logger = structlog.get_logger(__name__)
 
+TIE_POLICY_COMPETITION = "competition"
+TIE_POLICY_DENSE = "dense"
+TIE_POLICY_SUBJECT = "subject"
+TIE_POLICIES = (TIE_POLICY_COMPETITION, TIE_POLICY_DENSE, TIE_POLICY_SUBJECT)
+
+_PERCENT_FIELD = DecimalField(max_digits=12, decimal_places=4)
+
+RECOMPUTE_SCHEDULED_KEY = "rankings:recompute_scheduled:{session_id}"
+
+_STORED_FIELDS = [
+    "session",
+    "class_ref",
+    "section",
+    "total_obtained",
+    "total_full",
+    "percentage",
+    "rank",
+    "total_students",
+    "class_rank",
+    "class_size",
+    "percentile",
+    "computed_at",
+    "stale",
+    "updated_at",
+]
+
 
 class RankingService(BaseService):
-    """Computes class rankings based on total percentage."""
+    """Computes class rankings based on total percentage.
+
+    Ranks are assigned by the database with window functions. The tie policy
+    decides what equal percentages get:
+
+    * ``competition`` - shared rank, next rank skipped (1, 2, 2, 4)
+    * ``dense`` - shared rank, no gap (1, 2, 2, 3)
+    * ``subject`` - ties broken by the percentage in the subject whose code is
+      RANKING_TIE_BREAK_SUBJECT; students still level share a competition rank
+
+    Session rankings add the rank across all sections of the class and the
+    percentile across the whole session, all from the same query, and
+    are stored in ClassRanking for reads. Reads never write: stale or expired
+    rows are served as they are while a debounced task on the compute queue
+    recomputes the session.
+    """
+
+    def __init__(
+        self,
+        tie_policy: str | None = None,
+        tie_break_subject: str | None = None,
+    ) -> None:
+        self.tie_policy = tie_policy or getattr(
+            settings, "RANKING_TIE_POLICY", TIE_POLICY_COMPETITION
+        )
+        if self.tie_policy not in TIE_POLICIES:
+            raise ValueError(f"Unknown ranking tie policy '{self.tie_policy}'.")
+        self.tie_break_subject = tie_break_subject or getattr(
+            settings, "RANKING_TIE_BREAK_SUBJECT", None
+        )
+        if self.tie_policy == TIE_POLICY_SUBJECT and not self.tie_break_subject:
+            raise ValueError("The 'subject' tie policy needs RANKING_TIE_BREAK_SUBJECT.")
 
     def compute_class_rankings(
         self,
@@ -25,106 +90,339 @@ class RankingService(BaseService):
     ) -> list[dict]:
         """Rank students by total obtained marks percentage.
 
-        Returns a list of dicts ordered by rank (descending percentage).
+        Returns a list of dicts ordered by rank (descending percentage), then
+        roll number. Runs a single query over the stored enrollment totals.
         """
-        from enrollments.models import Enrollment
-
-        enrollments = (
-            Enrollment.objects.filter(
+        rows = (
+            self._totals(
                 class_field_id=class_id,
                 section_id=section_id,
                 session_id=session_id,
-                status="active",
             )
-            .select_related("student")
-            .order_by("roll_no")
+            .annotate(rank=self._rank_window())
+            .order_by("rank", "roll_no")
         )
+        rankings = [self._to_entry(row) for row in rows]
 
-        student_totals = []
-        for enrollment in enrollments:
-            agg = (
-                SubjectResult.objects.filter(enrollment=enrollment)
-                .aggregate(
-                    total_obtained=Sum("total_obtained"),
-                    total_full=Sum("total_full"),
-                )
+        self.log.info(
+            "rankings.computed",
+            class_id=str(class_id),
+            section_id=str(section_id),
+            count=len(rankings),
+            tie_policy=self.tie_policy,
+        )
+        return rankings
+
+    def compute_session_rankings(self, session_id: UUID) -> list[dict]:
+        """Section rank, class rank and session percentile for every active enrollment.
+
+        One query with three window functions. The percentile is the
+        share of the session's students with a lower percentage.
+        """
+        rankings = self._rank(session_id)
+        self.log.info(
+            "rankings.session_computed",
+            session_id=str(session_id),
+            count=len(rankings),
+            tie_policy=self.tie_policy,
+        )
+        return rankings
+
+    def _rank(self, session_id: UUID, class_id: UUID | None = None) -> list[dict]:
+        """Session rankings, or one class's section and class ranks.
+
+        A single class cannot place its students in the session, so entries
+        ranked with ``class_id`` carry no percentile.
+        """
+        filters = {"session_id": session_id}
+        if class_id is not None:
+            filters["class_field_id"] = class_id
+        rows = list(
+            self._totals(**filters)
+            .annotate(
+                class_key=F("class_field_id"),
+                section_key=F("section_id"),
+                rank=self._rank_window(partition_by=[F("class_field_id"), F("section_id")]),
+                class_rank=self._rank_window(partition_by=[F("class_field_id")]),
+                percent_rank=Window(
+                    expression=PercentRank(), order_by=F("percentage").asc()
+                ),
             )
-            total_obtained = agg["total_obtained"] or 0
-            total_full = agg["total_full"] or 0
-            percentage = (
-                round((total_obtained / total_full) * 100, 2)
-                if total_full > 0
-                else 0.0
+            .order_by("class_field_id", "section_id", "rank", "roll_no")
+        )
+        section_sizes = Counter((r["class_key"], r["section_key"]) for r in rows)
+        class_sizes = Counter(r["class_key"] for r in rows)
+
+        rankings = []
+        for row in rows:
+            entry = self._to_entry(row)
+            entry.update(
+                class_id=str(row["class_key"]),
+                section_id=str(row["section_key"]),
+                total_students=section_sizes[(row["class_key"], row["section_key"])],
+                class_rank=row["class_rank"],
+                class_size=class_sizes[row["class_key"]],
             )
+            if class_id is None:
+                entry["percentile"] = round(float(row["percent_rank"]) * 100, 2)
+            rankings.append(entry)
+        return rankings
 
-            student_totals.append({
-                "enrollment_id": str(enrollment.id),
-                "student_name": enrollment.student.name,
-                "student_id": enrollment.student.student_id,
-                "roll_no": enrollment.roll_no,
-                "total_obtained": total_obtained,
-                "total_full": total_full,
-                "percentage": percentage,
-            })
+    def _totals(self, **enrollment_filters):
+        """Active enrollments with their EnrollmentResult totals, one row each."""
+        from enrollments.models import Enrollment
 
-        student_totals.sort(key=lambda x: x["percentage"], reverse=True)
+        rows = (
+            Enrollment.objects.filter(status="active", **enrollment_filters)
+            .values("id")
+            .annotate(
+                student_name=F("student__name"),
+                student_code=F("student__student_id"),
+                roll=F("roll_no"),
+                total_obtained=Coalesce(F("result_summary__total_obtained"), 0),
+                total_full=Coalesce(F("result_summary__total_full"), 0),
+                percentage=Coalesce(
+                    F("result_summary__percentage"),
+                    Value(Decimal("0")),
+                    output_field=_PERCENT_FIELD,
+                ),
+            )
+        )
+        if self.tie_policy == TIE_POLICY_SUBJECT:
+            rows = rows.annotate(
+                tie_break=Max(
+                    "subject_results__percentage",
+                    filter=Q(subject_results__subject__code=self.tie_break_subject),
+                )
+            )
+        return rows
 
-        rankings = []
-        for rank_pos, student in enumerate(student_totals, start=1):
-            student["rank"] = rank_pos
-            rankings.append(student)
+    def _rank_window(self, partition_by: list | None = None) -> Window:
+        order_by = [F("percentage").desc()]
+        if self.tie_policy == TIE_POLICY_SUBJECT:
+            order_by.append(F("tie_break").desc(nulls_last=True))
+        rank_function = DenseRank() if self.tie_policy == TIE_POLICY_DENSE else Rank()
+        return Window(expression=rank_function, partition_by=partition_by, order_by=order_by)
 
-        self.log.info(
-            "rankings.computed",
-            class_id=str(class_id),
-            section_id=str(section_id),
-            count=len(rankings),
+    @staticmethod
+    def _to_entry(row: dict) -> dict:
+        return {
+            "enrollment_id": str(row["id"]),
+            "student_name": row["student_name"],
+            "student_id": row["student_code"],
+            "roll_no": row["roll"],
+            "total_obtained": row["total_obtained"],
+            "total_full": row["total_full"],
+            "percentage": float(row["percentage"]),
+            "rank": row["rank"],
+        }
+
+    @transaction.atomic
+    def persist_session_rankings(self, session_id: UUID) -> list[dict]:
+        """Compute a session's rankings and upsert its stored rows.
+
+        Runs under a row lock on the session, so concurrent recomputes of the
+        same session queue up instead of racing. Rows of enrollments that no
+        longer rank are removed.
+        """
+        from academics.models import AcademicSession
+
+        AcademicSession.objects.select_for_update().filter(id=session_id).first()
+        rankings = self.compute_session_rankings(session_id)
+        computed_at = timezone.now()
+        ClassRanking.objects.bulk_create(
+            [
+                ClassRanking(
+                    session_id=session_id,
+                    class_ref_id=r["class_id"],
+                    section_id=r["section_id"],
+                    enrollment_id=r["enrollment_id"],
+                    total_obtained=r["total_obtained"],
+                    total_full=r["total_full"],
+                    percentage=Decimal(str(r["percentage"])),
+                    rank=r["rank"],
+                    total_students=r["total_students"],
+                    class_rank=r["class_rank"],
+                    class_size=r["class_size"],
+                    percentile=Decimal(str(r["percentile"])),
+                    computed_at=computed_at,
+                    stale=False,
+                )
+                for r in rankings
+            ],
+            update_conflicts=True,
+            unique_fields=["enrollment"],
+            update_fields=_STORED_FIELDS,
         )
+        ClassRanking.objects.filter(session_id=session_id).exclude(
+            enrollment_id__in=[r["enrollment_id"] for r in rankings]
+        ).delete()
         return rankings
 
-    def get_student_rank(
+    @staticmethod
+    def schedule_recompute(session_id: UUID) -> None:
+        """Enqueue one session recompute per debounce window, however many reads ask for it."""
+        debounce = settings.RANKING_RECOMPUTE_DEBOUNCE
+        if not cache.add(RECOMPUTE_SCHEDULED_KEY.format(session_id=session_id), 1, timeout=debounce):
+            return
+        from tasks.ranking_tasks import compute_class_rankings
+
+        compute_class_rankings.apply_async(args=[str(session_id)], countdown=debounce)
+
+    def get_class_rankings(
         self,
-        student_id: UUID,
+        class_id: UUID,
+        section_id: UUID,
         session_id: UUID,
-    ) -> dict:
-        """Get a specific student's rank, percentage, and grade within their current class."""
+    ) -> list[dict]:
+        """Stored rankings for a class-section.
+
+        Stale rows are served while a recompute is scheduled; a session with
+        nothing stored yet has just this class ranked on the fly, without
+        writing and without percentiles.
+        """
+        rows = list(
+            ClassRanking.objects.filter(
+                session_id=session_id, class_ref_id=class_id, section_id=section_id
+            )
+            .select_related("enrollment__student")
+            .order_by("rank", "enrollment__roll_no")
+        )
+        if not rows or any(not self._is_fresh(r) for r in rows):
+            self.schedule_recompute(session_id)
+        if not rows:
+            return [
+                r
+                for r in self._rank(session_id, class_id=class_id)
+                if r["section_id"] == str(section_id)
+            ]
+        return [
+            {
+                "enrollment_id": str(r.enrollment_id),
+                "student_name": r.enrollment.student.name,
+                "student_id": r.enrollment.student.student_id,
+                "roll_no": r.enrollment.roll_no,
+                **self._stored_entry(r),
+            }
+            for r in rows
+        ]
+
+    def get_enrollment_ranking(self, enrollment_id: UUID) -> dict | None:
+        """Section rank, class rank and percentile for one enrollment, or None if unranked."""
+        stored = ClassRanking.objects.filter(enrollment_id=enrollment_id).first()
+        if stored is not None:
+            if not self._is_fresh(stored):
+                self.schedule_recompute(stored.session_id)
+            return self._stored_entry(stored)
+
         from enrollments.models import Enrollment
-        from academics.models import GradePolicy
-        from academics.services.grading_service import GradingService
 
-        enrollment = Enrollment.objects.filter(
-            student_id=student_id,
-            session_id=session_id,
-            is_active=True,
-        ).select_related("class_field", "section").first()
+        placement = (
+            Enrollment.objects.filter(id=enrollment_id, status="active")
+            .values_list("session_id", "class_field_id")
+            .first()
+        )
+        if placement is None:
+            return None
+        session_id, class_id = placement
+        self.schedule_recompute(session_id)
+        return next(
+            (
+                r
+                for r in self._rank(session_id, class_id=class_id)
+                if r["enrollment_id"] == str(enrollment_id)
+            ),
+            None,
+        )
+
+    @staticmethod
+    def _stored_entry(ranking: ClassRanking) -> dict:
+        return {
+            "total_obtained": ranking.total_obtained,
+            "total_full": ranking.total_full,
+            "percentage": float(ranking.percentage),
+            "rank": ranking.rank,
+            "total_students": ranking.total_students,
+            "class_rank": ranking.class_rank,
+            "class_size": ranking.class_size,
+            "percentile": float(ranking.percentile),
+        }
 
-        if not enrollment:
-            return {"percentage": None, "grade": None, "rank": None, "total_students": None}
+    @staticmethod
+    def invalidate_for_enrollments(enrollment_ids: Iterable[UUID]) -> int:
+        """Flag the stored rankings of every session containing these enrollments.
 
-        # Get rankings for this student's class/section
-        rankings = self.compute_class_rankings(
-            class_id=enrollment.class_field_id,
-            section_id=enrollment.section_id,
-            session_id=session_id,
+        Class ranks and percentiles span sections, so the whole session goes
+        stale, and a recompute is scheduled once the transaction commits.
+        """
+        from enrollments.models import Enrollment
+
+        ids = set(enrollment_ids)
+        if not ids:
+            return 0
+        session_ids = set(
+            Enrollment.objects.filter(id__in=ids).values_list("session_id", flat=True)
         )
+        for session_id in session_ids:
+            transaction.on_commit(
+                lambda session_id=session_id: RankingService.schedule_recompute(session_id)
+            )
+        return ClassRanking.objects.filter(
+            session_id__in=session_ids,
+            stale=False,
+        ).update(stale=True)
+
+    @staticmethod
+    def _is_fresh(ranking: ClassRanking) -> bool:
+        max_age = timedelta(seconds=settings.RANKING_MAX_AGE)
+        return not ranking.stale and timezone.now() - ranking.computed_at < max_age
+
+    def get_student_rank(
+        self,
+        student_id: UUID,
+        session_id: UUID,
+    ) -> dict:
+        """Get a specific student's rank, percentage, and grade within their current class.
 
-        # Find this student's ranking
-        student_ranking = None
-        for r in rankings:
-            if r["enrollment_id"] == str(enrollment.id):
-                student_ranking = r
-                break
+        Served from the stored rankings with one lookup; stale rows are
+        served while the session is recomputed in the background.
+        """
+        from enrollments.models import Enrollment
+        from academics.services.grading_service import GradingService
+
+        stored = ClassRanking.objects.filter(
+            session_id=session_id, enrollment__student_id=student_id
+        ).first()
 
-        if not student_ranking:
-            return {"percentage": None, "grade": None, "rank": None, "total_students": len(rankings)}
+        if stored is not None:
+            if not self._is_fresh(stored):
+                self.schedule_recompute(session_id)
+            ranking = self._stored_entry(stored)
+        else:
+            enrollment_id = (
+                Enrollment.objects.filter(
+                    student_id=student_id,
+                    session_id=session_id,
+                    status="active",
+                )
+                .values_list("id", flat=True)
+                .first()
+            )
+            if not enrollment_id:
+                return {"percentage": None, "grade": None, "rank": None, "total_students": None}
+            ranking = self.get_enrollment_ranking(enrollment_id)
+            if not ranking:
+                return {"percentage": None, "grade": None, "rank": None, "total_students": None}
 
         # Determine grade from percentage using GradingService
-        grading_svc = GradingService()
-        grade, _ = grading_svc.calculate_grade(student_ranking["percentage"])
+        grade, _ = GradingService().calculate_grade(ranking["percentage"])
 
         return {
-            "percentage": student_ranking["percentage"],
+            "percentage": ranking["percentage"],
             "grade": grade,
-            "rank": student_ranking["rank"],
-            "total_students": len(rankings),
+            "rank": ranking["rank"],
+            "total_students": ranking["total_students"],
+            "class_rank": ranking["class_rank"],
+            "class_size": ranking["class_size"],
+            "percentile": ranking["percentile"],
         }
@@ -0,0 +1,240 @@
+"""Fixed-layout report card renderer that draws straight onto the reportlab canvas.
+
+Same content as the flowable layout in pdf_export_service, without platypus:
+coordinates, colours and column offsets are computed once per process and
+every card is a fixed sequence of canvas calls. Like the flowable renderer it
+works on DTOs only, so it is safe to run in a worker process.
+"""
+
+from __future__ import annotations
+
+import io
+from collections.abc import Iterable
+from dataclasses import dataclass
+from functools import lru_cache, partial
+
+from shared.types import ReportCardDTO
+
+MARGIN = 72
+ROW_HEIGHT = 28
+TITLE_SIZE = 18
+BODY_SIZE = 10
+LOGO_SIZE = 48
+CELL_PADDING = 6
+INFO_COLUMNS = (120, 300)
+RESULT_COLUMNS = (150, 80, 80, 100, 80)
+RESULT_HEADERS = ("Subject", "Marks", "Max", "Percentage", "Grade")
+FONT = "Helvetica"
+FONT_BOLD = "Helvetica-Bold"
+
+
+@dataclass(frozen=True)
+class _Layout:
+    width: float
+    height: float
+    info_x: tuple[float, ...]
+    results_x: tuple[float, ...]
+    grey: object
+    white: object
+    black: object
+    header_fill: object
+    total_fill: object
+
+
+@lru_cache(maxsize=1)
+def _layout() -> _Layout:
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+
+    width, height = A4
+
+    def edges(columns: tuple[int, ...]) -> tuple[float, ...]:
+        x = (width - sum(columns)) / 2
+        result = [x]
+        for column in columns:
+            x += column
+            result.append(x)
+        return tuple(result)
+
+    return _Layout(
+        width=width,
+        height=height,
+        info_x=edges(INFO_COLUMNS),
+        results_x=edges(RESULT_COLUMNS),
+        grey=colors.grey,
+        white=colors.whitesmoke,
+        black=colors.black,
+        header_fill=colors.HexColor("#2563eb"),
+        total_fill=colors.HexColor("#e0e7ff"),
+    )
+
+
+@lru_cache(maxsize=8192)
+def _text_width(text: str, font: str) -> float:
+    """Rendered width of ``text``; subject names, marks and grades repeat across a class."""
+    from reportlab.pdfbase.pdfmetrics import stringWidth
+
+    return stringWidth(text, font, BODY_SIZE)
+
+
+def _fit(text: str, font: str, width: float) -> str:
+    """Truncate ``text`` so it fits in a cell ``width`` points wide."""
+    room = width - 2 * CELL_PADDING
+    # No Helvetica glyph is wider than 1em, so short strings need no measuring.
+    if len(text) * BODY_SIZE <= room or _text_width(text, font) <= room:
+        return text
+    while text and _text_width(text + "...", font) > room:
+        text = text[:-1]
+    return text + "..."
+
+
+@lru_cache(maxsize=4)
+def _logo(path: str):
+    from reportlab.lib.utils import ImageReader
+
+    return ImageReader(path)
+
+
+def render_report_cards_canvas(reports: Iterable[ReportCardDTO], logo: str | None = None) -> bytes:
+    """Render report cards into one PDF, one or more pages per student.
+
+    Page streams are written as binary zlib rather than ASCII85-wrapped, which
+    skips reportlab's pure-Python base-85 pass and makes the file smaller.
+    """
+    from reportlab.pdfgen.canvas import Canvas
+
+    layout = _layout()
+    buffer = io.BytesIO()
+    canvas = Canvas(buffer, pagesize=(layout.width, layout.height), pageCompression=1)
+    canvas.setPageCallBack(partial(_use_binary_page_stream, canvas))
+    for report in reports:
+        _draw_report_card(canvas, layout, report, logo)
+    canvas.save()
+    return buffer.getvalue()
+
+
+def _use_binary_page_stream(canvas, page_number: int) -> None:
+    """Give the page just finished a zlib-only content stream.
+
+    reportlab chooses page stream filters from the process-wide
+    ``rl_config.useA85`` when the document is written; a page that already
+    has its Contents keeps them, so this document opts out on its own.
+    """
+    from reportlab.pdfbase.pdfdoc import PDFStream, PDFZCompress
+
+    page = canvas._doc.Pages.pages[-1]
+    stream = PDFStream(content=page.stream, filters=[PDFZCompress])
+    stream.__Comment__ = "page stream"
+    page.Contents = stream
+
+
+def _draw_report_card(canvas, layout: _Layout, report: ReportCardDTO, logo: str | None) -> None:
+    top = layout.height - MARGIN
+
+    if logo:
+        canvas.drawImage(
+            _logo(logo),
+            MARGIN,
+            top - LOGO_SIZE,
+            width=LOGO_SIZE,
+            height=LOGO_SIZE,
+            preserveAspectRatio=True,
+            mask="auto",
+        )
+    canvas.setFillColor(layout.black)
+    canvas.setFont(FONT_BOLD, TITLE_SIZE)
+    canvas.drawCentredString(
+        layout.width / 2, top - TITLE_SIZE, f"Report Card - {report.session_name}"
+    )
+    top -= max(TITLE_SIZE, LOGO_SIZE if logo else 0) + 18
+
+    # Student info: grey label column, no grid
+    info = (
+        ("Student Name", report.student_name),
+        ("Student ID", report.student_id),
+        ("Roll No", report.roll_no),
+        ("Class", f"{report.class_name} - {report.section_name}"),
+    )
+    x0, x1, x2 = layout.info_x
+    canvas.setFillColor(layout.grey)
+    canvas.rect(x0, top - len(info) * ROW_HEIGHT, x1 - x0, len(info) * ROW_HEIGHT, stroke=0, fill=1)
+    for label, value in info:
+        baseline = top - ROW_HEIGHT / 2 - BODY_SIZE / 3
+        canvas.setFillColor(layout.white)
+        canvas.setFont(FONT_BOLD, BODY_SIZE)
+        canvas.drawString(x0 + CELL_PADDING, baseline, label)
+        canvas.setFillColor(layout.black)
+        canvas.setFont(FONT, BODY_SIZE)
+        canvas.drawString(x1 + CELL_PADDING, baseline, _fit(str(value), FONT, x2 - x1))
+        top -= ROW_HEIGHT
+    top -= 20
+
+    rows = [
+        (
+            result.subject_name,
+            str(result.total_obtained),
+            str(result.total_full),
+            f"{result.percentage}%",
+            result.grade,
+        )
+        for result in report.results
+    ]
+    total = (
+        "TOTAL",
+        str(report.total_marks),
+        str(report.total_full),
+        f"{report.percentage}%",
+        report.overall_grade,
+    )
+    _draw_results(canvas, layout, rows, total, top)
+    canvas.showPage()
+
+
+def _draw_results(canvas, layout: _Layout, rows: list[tuple], total: tuple, top: float) -> None:
+    """Draw the results grid, continuing on a new page (header repeated) when it runs out of room."""
+    xs = layout.results_x
+    pending = [*rows, total]
+
+    while pending:
+        fit = max(1, int((top - MARGIN) // ROW_HEIGHT) - 1)
+        page_rows, pending = pending[:fit], pending[fit:]
+        bottom = top - (len(page_rows) + 1) * ROW_HEIGHT
+
+        canvas.setFillColor(layout.header_fill)
+        canvas.rect(xs[0], top - ROW_HEIGHT, xs[-1] - xs[0], ROW_HEIGHT, stroke=0, fill=1)
+        if not pending:
+            canvas.setFillColor(layout.total_fill)
+            canvas.rect(xs[0], bottom, xs[-1] - xs[0], ROW_HEIGHT, stroke=0, fill=1)
+
+        canvas.setStrokeColor(layout.black)
+        canvas.setLineWidth(1)
+        canvas.grid(list(xs), [top - i * ROW_HEIGHT for i in range(len(page_rows) + 2)])
+
+        _draw_row(canvas, xs, top, RESULT_HEADERS, FONT_BOLD, layout.white)
+        for i, row in enumerate(page_rows, 1):
+            is_total = not pending and i == len(page_rows)
+            _draw_row(
+                canvas,
+                xs,
+                top - i * ROW_HEIGHT,
+                row,
+                FONT_BOLD if is_total else FONT,
+                layout.black,
+            )
+
+        if pending:
+            canvas.showPage()
+            top = layout.height - MARGIN
+
+
+def _draw_row(canvas, xs: tuple[float, ...], top: float, cells: tuple, font: str, color) -> None:
+    """Centre each cell's text in its column, all in one text object."""
+    baseline = top - ROW_HEIGHT / 2 - BODY_SIZE / 3
+    text = canvas.beginText()
+    text.setFont(font, BODY_SIZE)
+    text.setFillColor(color)
+    for left, right, value in zip(xs, xs[1:], cells):
+        value = _fit(str(value), font, right - left)
+        text.setTextOrigin((left + right - _text_width(value, font)) / 2, baseline)
+        text.textOut(value)
+    canvas.drawText(text)
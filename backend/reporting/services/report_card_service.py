@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+from collections.abc import Iterable, Iterator
+from itertools import groupby
 from uuid import UUID
 from decimal import Decimal
 
@@ -31,7 +33,7 @@ class ReportCardService(BaseService):
 
         enrollment = (
             Enrollment.objects.select_related(
-                "student", "session", "class_field", "section"
+                "student", "session", "class_field", "section", "result_summary"
             )
             .get(id=enrollment_id)
         )
@@ -42,32 +44,13 @@ class ReportCardService(BaseService):
             .order_by("subject__code")
         )
 
-        total_marks = sum(r.total_obtained for r in results)
-        total_full = sum(r.total_full for r in results)
-        percentage = (
-            Decimal(str(round((total_marks / total_full) * 100, 2)))
-            if total_full > 0
-            else Decimal("0")
-        )
+        totals = self._result_service.get_enrollment_totals(enrollment)
 
-        from academics.services.grading_service import GradingService
-
-        grading = GradingService()
-        overall_grade, _ = grading.calculate_grade(float(percentage))
-
-        subject_results = [
-            SubjectResultDTO(
-                id=r.id,
-                enrollment_id=r.enrollment_id,
-                subject_id=r.subject_id,
-                total_obtained=r.total_obtained,
-                total_full=r.total_full,
-                percentage=r.percentage,
-                grade=r.grade,
-                grade_point=r.grade_point,
-            )
-            for r in results
-        ]
+        subject_results = [self._to_result_dto(r) for r in results]
+
+        from reporting.services.ranking_service import RankingService
+
+        ranking = RankingService().get_enrollment_ranking(enrollment_id) or {}
 
         report = ReportCardDTO(
             student_name=enrollment.student.name,
@@ -77,16 +60,19 @@ class ReportCardService(BaseService):
             section_name=enrollment.section.name,
             session_name=enrollment.session.name,
             results=subject_results,
-            total_marks=total_marks,
-            total_full=total_full,
-            percentage=percentage,
-            overall_grade=overall_grade,
+            total_marks=totals.total_obtained,
+            total_full=totals.total_full,
+            percentage=Decimal(totals.percentage),
+            overall_grade=totals.overall_grade,
+            rank=ranking.get("rank"),
+            class_rank=ranking.get("class_rank"),
+            percentile=ranking.get("percentile"),
         )
 
         self.log.info(
             "report_card.generated",
             enrollment_id=str(enrollment_id),
-            percentage=percentage,
+            percentage=totals.percentage,
         )
         return report
 
@@ -97,23 +83,7 @@ class ReportCardService(BaseService):
         session_id: UUID,
     ) -> list[ReportCardDTO]:
         """Generate report cards for all students in a class-section-session."""
-        from enrollments.models import Enrollment
-
-        enrollments = (
-            Enrollment.objects.filter(
-                class_field_id=class_id,
-                section_id=section_id,
-                session_id=session_id,
-                status="active",
-            )
-            .select_related("student")
-            .order_by("roll_no")
-        )
-
-        reports = []
-        for enrollment in enrollments:
-            report = self.generate_student_report_card(enrollment.id)
-            reports.append(report)
+        reports = list(self.iter_class_report_cards(class_id, section_id, session_id))
 
         self.log.info(
             "report_cards.class_generated",
@@ -122,3 +92,92 @@ class ReportCardService(BaseService):
             count=len(reports),
         )
         return reports
+
+    def iter_class_report_cards(
+        self,
+        class_id: UUID,
+        section_id: UUID,
+        session_id: UUID,
+        enrollment_ids: Iterable[UUID] | None = None,
+    ) -> Iterator[ReportCardDTO]:
+        """Yield a class-section's report cards in roll order, one at a time.
+
+        Batched: ranks come from one ranking read, enrollments from one query,
+        and every subject result of the section is streamed from one
+        ``select_related("subject")`` query and grouped per enrollment as it
+        arrives. Totals come from the stored EnrollmentResult, loaded with the
+        enrollments, so each card matches generate_student_report_card for
+        the same student. ``enrollment_ids`` limits the cards to those students.
+        """
+        from enrollments.models import Enrollment
+        from reporting.services.ranking_service import RankingService
+
+        rankings = {
+            r["enrollment_id"]: r
+            for r in RankingService().get_class_rankings(class_id, section_id, session_id)
+        }
+        scope = {
+            "class_field_id": class_id,
+            "section_id": section_id,
+            "session_id": session_id,
+            "status": "active",
+        }
+        if enrollment_ids is not None:
+            scope["id__in"] = list(enrollment_ids)
+        enrollments = list(
+            Enrollment.objects.filter(**scope)
+            .select_related("student", "session", "class_field", "section", "result_summary")
+            .order_by("roll_no", "id")
+        )
+        totals_by_enrollment = self._result_service.get_totals_for_enrollments(enrollments)
+        results = (
+            SubjectResult.objects.filter(
+                **{f"enrollment__{k}": v for k, v in scope.items()}
+            )
+            .select_related("subject")
+            .order_by("enrollment__roll_no", "enrollment_id", "subject__code")
+            .iterator(chunk_size=2000)
+        )
+        grouped = groupby(results, key=lambda r: r.enrollment_id)
+
+        pending = next(grouped, None)
+        for enrollment in enrollments:
+            rows: list[SubjectResult] = []
+            if pending is not None and pending[0] == enrollment.id:
+                rows = list(pending[1])
+                pending = next(grouped, None)
+
+            totals = totals_by_enrollment[enrollment.id]
+            ranking = rankings.get(str(enrollment.id), {})
+
+            yield ReportCardDTO(
+                student_name=enrollment.student.name,
+                student_id=enrollment.student.student_id,
+                roll_no=enrollment.roll_no,
+                class_name=enrollment.class_field.name,
+                section_name=enrollment.section.name,
+                session_name=enrollment.session.name,
+                results=[self._to_result_dto(r) for r in rows],
+                total_marks=totals.total_obtained,
+                total_full=totals.total_full,
+                percentage=Decimal(totals.percentage),
+                overall_grade=totals.overall_grade,
+                rank=ranking.get("rank"),
+                class_rank=ranking.get("class_rank"),
+                percentile=ranking.get("percentile"),
+            )
+
+    @staticmethod
+    def _to_result_dto(result: SubjectResult) -> SubjectResultDTO:
+        return SubjectResultDTO(
+            id=result.id,
+            enrollment_id=result.enrollment_id,
+            subject_id=result.subject_id,
+            total_obtained=result.total_obtained,
+            total_full=result.total_full,
+            percentage=result.percentage,
+            grade=result.grade,
+            grade_point=result.grade_point,
+            subject_name=result.subject.name,
+            subject_code=result.subject.code,
+        )
@@ -0,0 +1,176 @@
+"""Report generation service: resumable session-wide report card generation."""
+
+from __future__ import annotations
+
+from datetime import timedelta
+from uuid import UUID
+
+import structlog
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+from shared.base_service import BaseService
+from reporting.models import ReportGenerationCheckpoint, ReportGenerationJob
+from reporting.services.export_cache_service import ExportCacheService
+
+logger = structlog.get_logger(__name__)
+
+
+class ReportGenerationService(BaseService):
+    """Generates the report card PDF of every section in a session, one section at a time.
+
+    Each finished section is recorded as a checkpoint in the same transaction
+    that advances the job's counters. A rerun of the job (task retry after a
+    crash or time-limit kill, or an explicit resume) skips checkpointed
+    sections and continues with the rest. Section PDFs go through the export
+    cache, so they are also what the class PDF export serves afterwards.
+
+    A session has at most one active (pending or running) job. A job can be
+    resumed once it has failed, or once it has made no progress for
+    REPORT_GENERATION_STALE_AFTER seconds, i.e. its task is no longer alive.
+    """
+
+    def __init__(self) -> None:
+        self._cache = ExportCacheService()
+
+    @transaction.atomic
+    def create_job(self, session_id: UUID, user) -> tuple[ReportGenerationJob, bool]:
+        """Create a job for the session, or return its active one; (job, created)."""
+        from academics.models import AcademicSession
+
+        # Serializes concurrent requests for the same session.
+        AcademicSession.objects.select_for_update().filter(id=session_id).first()
+        active = ReportGenerationJob.objects.filter(
+            session_id=session_id, status__in=["pending", "running"]
+        ).first()
+        if active is not None:
+            return active, False
+
+        sections = self._sections(session_id)
+        job = ReportGenerationJob.objects.create(
+            session_id=session_id,
+            requested_by=user,
+            sections_total=len(sections),
+            students_total=sum(s["students"] for s in sections),
+        )
+        self.log.info(
+            "report_generation.created",
+            job_id=str(job.id),
+            sections=job.sections_total,
+        )
+        return job, True
+
+    def claim_resume(self, job_id: UUID) -> bool:
+        """Atomically move a failed or stalled job back to pending; False if it is not resumable."""
+        stalled_before = timezone.now() - timedelta(seconds=settings.REPORT_GENERATION_STALE_AFTER)
+        claimed = ReportGenerationJob.objects.filter(
+            Q(status="failed")
+            | Q(status__in=["pending", "running"], updated_at__lt=stalled_before),
+            id=job_id,
+        ).update(status="pending", updated_at=timezone.now())
+        if claimed:
+            self.log.info("report_generation.resume_claimed", job_id=str(job_id))
+        return bool(claimed)
+
+    def run(self, job_id: UUID) -> ReportGenerationJob:
+        """Generate every section not yet checkpointed, then mark the job completed."""
+        job = ReportGenerationJob.objects.get(id=job_id)
+        if job.status == "completed":
+            return job
+
+        sections = self._sections(job.session_id)
+        done = set(job.checkpoints.values_list("class_ref_id", "section_id"))
+        job.status = "running"
+        job.error = ""
+        job.attempts += 1
+        job.started_at = job.started_at or timezone.now()
+        job.sections_total = len(sections)
+        job.students_total = sum(s["students"] for s in sections)
+        # Drop partial progress from an interrupted section; counts restart at the checkpoints.
+        self._count_checkpoints(job)
+        job.save(update_fields=[
+            "status",
+            "error",
+            "attempts",
+            "started_at",
+            "sections_total",
+            "students_total",
+            "sections_done",
+            "students_done",
+            "updated_at",
+        ])
+        if done:
+            self.log.info("report_generation.resumed", job_id=str(job.id), skipped=len(done))
+
+        for section in sections:
+            if (section["class_field_id"], section["section_id"]) not in done:
+                self._generate_section(job, section)
+
+        job.status = "completed"
+        job.finished_at = timezone.now()
+        job.save(update_fields=["status", "finished_at", "updated_at"])
+        self.log.info(
+            "report_generation.completed",
+            job_id=str(job.id),
+            sections=job.sections_done,
+            students=job.students_done,
+        )
+        return job
+
+    def fail(self, job_id: UUID, message: str) -> None:
+        ReportGenerationJob.objects.filter(id=job_id).update(
+            status="failed",
+            error=message,
+            finished_at=timezone.now(),
+            updated_at=timezone.now(),
+        )
+        self.log.error("report_generation.failed", job_id=str(job_id), error=message)
+
+    def _generate_section(self, job: ReportGenerationJob, section: dict) -> None:
+        class_id, section_id = section["class_field_id"], section["section_id"]
+        checkpointed = job.students_done
+
+        def progress(rendered: int) -> None:
+            job.students_done = checkpointed + rendered
+            job.save(update_fields=["students_done", "updated_at"])
+
+        params = {"class_id": class_id, "section_id": section_id, "session_id": job.session_id}
+        path, _ = self._cache.get_or_render("pdf_class", params, progress=progress)
+
+        with transaction.atomic():
+            ReportGenerationCheckpoint.objects.get_or_create(
+                job=job,
+                class_ref_id=class_id,
+                section_id=section_id,
+                defaults={"students": section["students"], "file": path},
+            )
+            self._count_checkpoints(job)
+            job.save(update_fields=["sections_done", "students_done", "updated_at"])
+
+        self.log.info(
+            "report_generation.section_done",
+            job_id=str(job.id),
+            class_id=str(class_id),
+            section_id=str(section_id),
+            students=section["students"],
+        )
+
+    @staticmethod
+    def _count_checkpoints(job: ReportGenerationJob) -> None:
+        totals = job.checkpoints.aggregate(sections=Count("id"), students=Sum("students"))
+        job.sections_done = totals["sections"]
+        job.students_done = totals["students"] or 0
+
+    @staticmethod
+    def _sections(session_id: UUID) -> list[dict]:
+        """Class-sections with active enrollments in the session, with their student counts."""
+        from enrollments.models import Enrollment
+
+        return list(
+            Enrollment.objects.filter(session_id=session_id, status="active")
+            .values("class_field_id", "section_id")
+            .annotate(students=Count("id"))
+            .order_by("class_field__level", "section__name")
+        )
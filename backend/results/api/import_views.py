@@ -0,0 +1,55 @@
+"""DRF views for spreadsheet/CSV marks imports."""
+
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework.parsers import MultiPartParser, FormParser
+from rest_framework import status
+
+from core.permissions import IsAdminOrTeacher
+from results.models import MarksImportJob
+from results.services.marks_import_service import MarksImportService
+from results.api.serializers import MarksImportJobSerializer, MarksImportUploadSerializer
+
+
+class MarksImportListView(APIView):
+    permission_classes = [IsAdminOrTeacher]
+    parser_classes = [MultiPartParser, FormParser]
+
+    def post(self, request):
+        serializer = MarksImportUploadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        service = MarksImportService()
+        job = service.create_job(
+            session_id=serializer.validated_data["session_id"],
+            uploaded_file=serializer.validated_data["file"],
+            user=request.user,
+        )
+
+        if service.should_run_async(job):
+            from tasks.import_tasks import run_marks_import
+
+            run_marks_import.delay(str(job.id))
+            return Response(
+                MarksImportJobSerializer(job).data,
+                status=status.HTTP_202_ACCEPTED,
+            )
+
+        job = service.run(job.id)
+        return Response(
+            MarksImportJobSerializer(job).data,
+            status=status.HTTP_201_CREATED,
+        )
+
+
+class MarksImportDetailView(APIView):
+    permission_classes = [IsAdminOrTeacher]
+
+    def get(self, request, pk):
+        jobs = MarksImportJob.objects.filter(id=pk)
+        if request.user.role != "admin":
+            jobs = jobs.filter(uploaded_by=request.user)
+        job = jobs.first()
+        if not job:
+            return Response(status=status.HTTP_404_NOT_FOUND)
+        return Response(MarksImportJobSerializer(job).data)
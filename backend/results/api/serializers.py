@@ -2,7 +2,7 @@
 
 from rest_framework import serializers
 
-from results.models import MarksEntry, SubjectResult, ResultPublication
+from results.models import MarksEntry, MarksImportJob, SubjectResult, ResultPublication
 
 
 class MarksEntrySerializer(serializers.ModelSerializer):
@@ -73,6 +73,113 @@ class BulkMarksPayloadSerializer(serializers.Serializer):
     entries = BulkMarksEntrySerializer(many=True)
 
 
+class MarksAutosaveCellSerializer(BulkMarksEntrySerializer):
+    """One edited grid cell; remarks are left untouched unless sent."""
+
+    remarks = serializers.CharField(required=False, allow_blank=True)
+
+    def validate(self, data):
+        if data["obtained_marks"] > data["full_marks"]:
+            raise serializers.ValidationError(
+                f"Obtained marks ({data['obtained_marks']}) cannot exceed "
+                f"full marks ({data['full_marks']})."
+            )
+        return data
+
+
+class MarksAutosavePayloadSerializer(serializers.Serializer):
+    """Cell deltas sent by the marks grid while a teacher types."""
+
+    cells = MarksAutosaveCellSerializer(many=True, allow_empty=False)
+
+
+class MarksGridStudentSerializer(serializers.Serializer):
+    """Student axis of a marks grid."""
+
+    enrollment_id = serializers.UUIDField()
+    roll_no = serializers.CharField(required=False, allow_blank=True)
+    name = serializers.CharField(required=False, allow_blank=True)
+    student_id = serializers.CharField(required=False, allow_blank=True)
+
+
+class MarksGridAssessmentSerializer(serializers.Serializer):
+    """Assessment axis of a marks grid."""
+
+    id = serializers.UUIDField()
+    code = serializers.CharField(required=False, allow_blank=True)
+    name = serializers.CharField(required=False, allow_blank=True)
+    full_marks = serializers.IntegerField(min_value=1)
+
+
+class MarksGridQuerySerializer(serializers.Serializer):
+    """Query params selecting one class-section-subject marks grid."""
+
+    session_id = serializers.UUIDField()
+    class_id = serializers.UUIDField()
+    section_id = serializers.UUIDField()
+    subject_id = serializers.UUIDField()
+
+
+class MarksGridSerializer(serializers.Serializer):
+    """Columnar marks for one class-section-subject: students x assessments."""
+
+    session_id = serializers.UUIDField()
+    class_id = serializers.UUIDField()
+    section_id = serializers.UUIDField()
+    subject_id = serializers.UUIDField()
+    students = MarksGridStudentSerializer(many=True)
+    assessments = MarksGridAssessmentSerializer(many=True)
+    marks = serializers.ListField(
+        child=serializers.ListField(
+            child=serializers.IntegerField(min_value=0, allow_null=True)
+        )
+    )
+
+    def validate(self, attrs):
+        rows, cols = len(attrs["students"]), len(attrs["assessments"])
+        if len(attrs["marks"]) != rows or any(len(r) != cols for r in attrs["marks"]):
+            raise serializers.ValidationError(
+                f"marks must be a {rows} x {cols} matrix matching students x assessments."
+            )
+        return attrs
+
+
+class MarksImportUploadSerializer(serializers.Serializer):
+    """Upload payload for a CSV/XLSX marks import."""
+
+    session_id = serializers.UUIDField()
+    file = serializers.FileField()
+
+    def validate_file(self, value):
+        if not value.name.lower().endswith((".csv", ".xlsx")):
+            raise serializers.ValidationError("Only .csv and .xlsx files are supported.")
+        return value
+
+
+class MarksImportJobSerializer(serializers.ModelSerializer):
+    """Progress and outcome of a marks import job."""
+
+    class Meta:
+        model = MarksImportJob
+        fields = [
+            "id",
+            "session",
+            "original_filename",
+            "status",
+            "rows_processed",
+            "rows_failed",
+            "created_count",
+            "updated_count",
+            "unchanged_count",
+            "errors",
+            "started_at",
+            "finished_at",
+            "created_at",
+            "updated_at",
+        ]
+        read_only_fields = fields
+
+
 class SubjectResultSerializer(serializers.ModelSerializer):
     """Serializer for SubjectResult model."""
 
@@ -4,6 +4,7 @@ from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 
 from results.api.views import MarksEntryViewSet, SubjectResultViewSet
+from results.api.import_views import MarksImportListView, MarksImportDetailView
 from results.api.publication_views import (
     ResultPublicationListView,
     ResultPublicationDetailView,
@@ -19,6 +20,9 @@ router.register(r"subject-results", SubjectResultViewSet, basename="subject-resu
 
 urlpatterns = [
     path("", include(router.urls)),
+    # Marks import endpoints
+    path("marks-imports/", MarksImportListView.as_view(), name="marks-import-list"),
+    path("marks-imports/<uuid:pk>/", MarksImportDetailView.as_view(), name="marks-import-detail"),
     # Publication endpoints
     path("publications/", ResultPublicationListView.as_view(), name="publication-list"),
     path("publications/summary/", ResultPublicationSummaryView.as_view(), name="publication-summary"),
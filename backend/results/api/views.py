@@ -13,8 +13,12 @@ from results.api.serializers import (
     MarksEntryCreateSerializer,
     MarksEntryUpdateSerializer,
     BulkMarksPayloadSerializer,
+    MarksAutosavePayloadSerializer,
+    MarksGridQuerySerializer,
+    MarksGridSerializer,
     SubjectResultSerializer,
 )
+from results.services.autosave_service import MarksAutosaveService
 from results.services.marks_entry_service import MarksEntryService
 from results.services.result_service import ResultService
 from results.selectors.marks_entry_selector import MarksEntrySelector
@@ -40,11 +44,7 @@ class MarksEntryViewSet(viewsets.ModelViewSet):
         serializer.is_valid(raise_exception=True)
         data = serializer.validated_data
 
-        authorized, error = self._service.authorize_entry(
-            user_id=request.user.id,
-            enrollment_id=data["enrollment_id"],
-            subject_id=data["subject_id"],
-        )
+        authorized, error = self._service.authorize_entries(request.user, [data])
         if not authorized:
             return Response(
                 {"detail": error}, status=status.HTTP_403_FORBIDDEN
@@ -75,21 +75,91 @@ class MarksEntryViewSet(viewsets.ModelViewSet):
         )
         return Response(MarksEntrySerializer(updated).data)
 
+    def perform_destroy(self, instance):
+        self._service.delete_marks(instance)
+
     @action(detail=False, methods=["post"], url_path="bulk-upsert")
     def bulk_upsert(self, request):
         """Bulk create or update marks entries."""
         serializer = BulkMarksPayloadSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
-        entries = self._service.bulk_upsert(
+        authorized, error = self._service.authorize_entries(
+            request.user, serializer.validated_data["entries"]
+        )
+        if not authorized:
+            return Response(
+                {"detail": error}, status=status.HTTP_403_FORBIDDEN
+            )
+
+        result = self._service.bulk_upsert(
             entries=serializer.validated_data["entries"],
             entered_by_id=request.user.id,
         )
         return Response(
-            MarksEntrySerializer(entries, many=True).data,
+            {
+                **result.counts(),
+                "entries": MarksEntrySerializer(result.entries, many=True).data,
+            },
             status=status.HTTP_201_CREATED,
         )
 
+    @action(detail=False, methods=["post"], url_path="autosave")
+    def autosave(self, request):
+        """Buffer edited cells; repeated edits to a cell collapse into one write."""
+        serializer = MarksAutosavePayloadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        cells = serializer.validated_data["cells"]
+
+        authorized, error = self._service.authorize_entries(request.user, cells)
+        if not authorized:
+            return Response(
+                {"detail": error}, status=status.HTTP_403_FORBIDDEN
+            )
+        outcome = MarksAutosaveService().buffer(request.user.id, cells)
+        return Response(outcome, status=status.HTTP_202_ACCEPTED)
+
+    @action(detail=False, methods=["post"], url_path="autosave/flush")
+    def autosave_flush(self, request):
+        """Write out the caller's buffered cells now (e.g. when leaving the grid)."""
+        counts = MarksAutosaveService().flush(request.user.id)
+        return Response(counts)
+
+    @action(detail=False, methods=["get", "put"], url_path="grid")
+    def grid(self, request):
+        """Read or save a class-section-subject marks grid in columnar form."""
+        if request.method == "PUT":
+            serializer = MarksGridSerializer(data=request.data)
+            serializer.is_valid(raise_exception=True)
+            grid = serializer.validated_data
+
+            authorized, error = self._service.authorize_grid(request.user, grid)
+            if not authorized:
+                return Response(
+                    {"detail": error}, status=status.HTTP_403_FORBIDDEN
+                )
+            error = self._service.validate_grid_enrollments(grid)
+            if error is not None:
+                return Response({"detail": error}, status=status.HTTP_400_BAD_REQUEST)
+            entries = self._service.grid_to_entries(grid)
+            # Buffered autosave cells are older than this save; write them first.
+            MarksAutosaveService().flush(request.user.id)
+            result = self._service.bulk_upsert(
+                entries=entries, entered_by_id=request.user.id
+            )
+            return Response(result.counts())
+
+        query = MarksGridQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        params = query.validated_data
+        authorized, error = self._service.authorize_grid(request.user, params)
+        if not authorized:
+            return Response({"detail": error}, status=status.HTTP_403_FORBIDDEN)
+        grid = self._selector.get_class_subject_grid(
+            params["session_id"], params["class_id"], params["section_id"], params["subject_id"]
+        )
+        return Response(MarksGridSerializer(grid).data)
+
     @action(detail=False, methods=["get"], url_path="by-enrollment/(?P<enrollment_id>[^/.]+)")
     def by_enrollment(self, request, enrollment_id=None):
         """List marks entries for a specific enrollment."""
@@ -161,5 +231,5 @@ class SubjectResultViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=["post"], url_path="refresh-session/(?P<session_id>[^/.]+)")
     def refresh_session(self, request, session_id=None):
         """Recompute all results for a session."""
-        count = self._result_service.refresh_all_results(UUID(session_id))
-        return Response({"refreshed_enrollments": count})
+        summary = self._result_service.refresh_all_results(UUID(session_id))
+        return Response(summary)
@@ -1,5 +1,6 @@
-"""Results module models: MarksEntry and SubjectResult."""
+"""Results module models: MarksEntry, SubjectResult and EnrollmentResult."""
 
+from django.core.serializers.json import DjangoJSONEncoder
 from django.core.validators import MinValueValidator
 from django.db import models
 
@@ -90,6 +91,108 @@ class SubjectResult(BaseModel):
         )
 
 
+class EnrollmentResult(BaseModel):
+    """Overall result of an enrollment, summed from its SubjectResult rows.
+
+    Maintained by ResultService whenever subject results are recomputed.
+    """
+
+    enrollment = models.OneToOneField(
+        "enrollments.Enrollment",
+        on_delete=models.CASCADE,
+        related_name="result_summary",
+    )
+    total_obtained = models.PositiveIntegerField(default=0)
+    total_full = models.PositiveIntegerField(default=0)
+    percentage = models.DecimalField(max_digits=5, decimal_places=2, default=0)
+    overall_grade = models.CharField(max_length=10, blank=True, default="")
+    overall_grade_point = models.DecimalField(max_digits=3, decimal_places=1, default=0)
+    subject_count = models.PositiveSmallIntegerField(default=0)
+
+    class Meta:
+        db_table = "enrollment_results"
+        ordering = ["-percentage"]
+        indexes = [
+            models.Index(fields=["-percentage"], name="idx_enrollment_result_pct"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.enrollment_id}: {self.total_obtained}/{self.total_full} ({self.overall_grade})"
+
+
+class PendingResultRecompute(models.Model):
+    """(enrollment, subject) pair whose SubjectResult is stale after a marks write."""
+
+    id = models.BigAutoField(primary_key=True)
+    enrollment = models.ForeignKey(
+        "enrollments.Enrollment",
+        on_delete=models.CASCADE,
+        related_name="pending_result_recomputes",
+    )
+    subject = models.ForeignKey(
+        "academics.Subject",
+        on_delete=models.CASCADE,
+        related_name="pending_result_recomputes",
+    )
+    marked_at = models.DateTimeField()
+
+    class Meta:
+        db_table = "pending_result_recomputes"
+        ordering = ["marked_at"]
+        unique_together = [("enrollment", "subject")]
+        indexes = [
+            models.Index(fields=["marked_at"], name="idx_pending_recompute_marked"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.enrollment_id}/{self.subject_id} @ {self.marked_at}"
+
+
+class MarksImportJob(BaseModel):
+    """Spreadsheet/CSV marks import, processed in chunks with progress tracking."""
+
+    STATUS_CHOICES = [
+        ("pending", "Pending"),
+        ("running", "Running"),
+        ("completed", "Completed"),
+        ("failed", "Failed"),
+    ]
+
+    session = models.ForeignKey(
+        "academics.AcademicSession",
+        on_delete=models.CASCADE,
+        related_name="marks_import_jobs",
+    )
+    uploaded_by = models.ForeignKey(
+        "core.User",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="marks_import_jobs",
+    )
+    file = models.FileField(upload_to="imports/marks/")
+    original_filename = models.CharField(max_length=255, blank=True, default="")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="pending")
+    rows_processed = models.PositiveIntegerField(default=0)
+    rows_failed = models.PositiveIntegerField(default=0)
+    created_count = models.PositiveIntegerField(default=0)
+    updated_count = models.PositiveIntegerField(default=0)
+    unchanged_count = models.PositiveIntegerField(default=0)
+    errors = models.JSONField(default=list, blank=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = "marks_import_jobs"
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["status"], name="idx_marks_import_status"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.original_filename} ({self.status})"
+
+
 class ResultPublication(BaseModel):
     """Tracks result publication status for a class in a session."""
 
@@ -154,3 +257,37 @@ class ResultPublication(BaseModel):
     def submit_for_review(self):
         self.status = "under_review"
         self.save(update_fields=["status"])
+
+
+class ResultSnapshot(BaseModel):
+    """Frozen per-enrollment result materialized when a publication goes live."""
+
+    publication = models.ForeignKey(
+        ResultPublication,
+        on_delete=models.CASCADE,
+        related_name="snapshots",
+    )
+    enrollment = models.ForeignKey(
+        "enrollments.Enrollment",
+        on_delete=models.CASCADE,
+        related_name="result_snapshots",
+    )
+    report_card = models.JSONField(encoder=DjangoJSONEncoder)
+    marksheet = models.JSONField(encoder=DjangoJSONEncoder)
+    rank = models.PositiveIntegerField(null=True, blank=True)
+    total_students = models.PositiveIntegerField(default=0)
+    total_obtained = models.PositiveIntegerField(default=0)
+    total_full = models.PositiveIntegerField(default=0)
+    percentage = models.DecimalField(max_digits=5, decimal_places=2, default=0)
+    overall_grade = models.CharField(max_length=10, blank=True, default="")
+
+    class Meta:
+        db_table = "result_snapshots"
+        ordering = ["publication", "rank"]
+        unique_together = [("publication", "enrollment")]
+        indexes = [
+            models.Index(fields=["enrollment"], name="idx_snapshot_enrollment"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.enrollment_id} @ {self.publication_id} (rank {self.rank})"
@@ -0,0 +1,49 @@
+"""EnrollmentResult repository: data access for EnrollmentResult model."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from uuid import UUID
+
+from django.db import transaction
+
+from shared.base_repository import BaseRepository
+from results.models import EnrollmentResult
+
+
+class EnrollmentResultRepository(BaseRepository[EnrollmentResult]):
+    """Repository for EnrollmentResult data access."""
+
+    model = EnrollmentResult
+
+    @transaction.atomic
+    def bulk_upsert(
+        self, totals: list[EnrollmentResult], batch_size: int = 1000
+    ) -> None:
+        """Insert or update totals in one statement per batch, keyed on enrollment."""
+        if not totals:
+            return
+        self.model.objects.bulk_create(
+            totals,
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=["enrollment"],
+            update_fields=[
+                "total_obtained",
+                "total_full",
+                "percentage",
+                "overall_grade",
+                "overall_grade_point",
+                "subject_count",
+                "updated_at",
+            ],
+        )
+
+    def delete_except(self, enrollment_ids: Iterable[UUID], keep: Iterable[UUID]) -> int:
+        """Delete totals of enrollment_ids that are not in keep (no subject results left)."""
+        deleted, _ = (
+            self.model.objects.filter(enrollment_id__in=set(enrollment_ids))
+            .exclude(enrollment_id__in=set(keep))
+            .delete()
+        )
+        return deleted
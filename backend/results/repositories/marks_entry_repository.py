@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+from dataclasses import dataclass, field
 from uuid import UUID
 
 from django.db import transaction
@@ -11,6 +12,31 @@ from shared.base_repository import BaseRepository
 from results.models import MarksEntry
 
 
+@dataclass
+class MarksUpsertResult:
+    """Outcome of a bulk upsert: rows created, updated and left unchanged."""
+
+    created: list[MarksEntry] = field(default_factory=list)
+    updated: list[MarksEntry] = field(default_factory=list)
+    unchanged: list[MarksEntry] = field(default_factory=list)
+    previous: dict[tuple[UUID, UUID, UUID], int] = field(default_factory=dict)
+
+    @property
+    def entries(self) -> list[MarksEntry]:
+        return self.created + self.updated + self.unchanged
+
+    @property
+    def changed(self) -> list[MarksEntry]:
+        return self.created + self.updated
+
+    def counts(self) -> dict[str, int]:
+        return {
+            "created": len(self.created),
+            "updated": len(self.updated),
+            "unchanged": len(self.unchanged),
+        }
+
+
 class MarksEntryRepository(BaseRepository[MarksEntry]):
     """Repository for MarksEntry data access."""
 
@@ -48,33 +74,73 @@ class MarksEntryRepository(BaseRepository[MarksEntry]):
             return None
 
     @transaction.atomic
-    def bulk_create_or_update(self, entries: list[dict]) -> list[MarksEntry]:
-        """Upsert marks entries: update if exists, create otherwise."""
-        results = []
-        for entry in entries:
-            existing = self.get_entry(
-                enrollment_id=entry["enrollment_id"],
-                subject_id=entry["subject_id"],
-                assessment_type_id=entry["assessment_type_id"],
+    def bulk_create_or_update(self, entries: list[dict]) -> MarksUpsertResult:
+        """Upsert marks entries keyed on (enrollment, subject, assessment_type).
+
+        Existing rows are fetched in one query and all inserts/updates go out as
+        a single ``INSERT ... ON CONFLICT DO UPDATE``; rows whose values did not
+        change are not written at all.
+        """
+        result = MarksUpsertResult()
+        # Last write wins for repeated cells within one payload.
+        payload = {
+            (e["enrollment_id"], e["subject_id"], e["assessment_type_id"]): e for e in entries
+        }
+        if not payload:
+            return result
+
+        existing = {
+            (e.enrollment_id, e.subject_id, e.assessment_type_id): e
+            for e in self.model.objects.filter(
+                enrollment_id__in={k[0] for k in payload},
+                subject_id__in={k[1] for k in payload},
+                assessment_type_id__in={k[2] for k in payload},
             )
-            if existing:
-                existing.full_marks = entry["full_marks"]
-                existing.obtained_marks = entry["obtained_marks"]
-                if entry.get("remarks"):
-                    existing.remarks = entry["remarks"]
-                if entry.get("entered_by_id"):
-                    existing.entered_by_id = entry["entered_by_id"]
-                existing.save()
-                results.append(existing)
-            else:
-                obj = self.model.objects.create(
-                    enrollment_id=entry["enrollment_id"],
-                    subject_id=entry["subject_id"],
-                    assessment_type_id=entry["assessment_type_id"],
+        }
+
+        for key, entry in payload.items():
+            current = existing.get(key)
+            if current is None:
+                obj = self.model(
+                    enrollment_id=key[0],
+                    subject_id=key[1],
+                    assessment_type_id=key[2],
                     full_marks=entry["full_marks"],
                     obtained_marks=entry["obtained_marks"],
                     remarks=entry.get("remarks", ""),
                     entered_by_id=entry.get("entered_by_id"),
                 )
-                results.append(obj)
-        return results
+                result.created.append(obj)
+                continue
+
+            remarks = entry.get("remarks") or current.remarks
+            if (
+                current.full_marks == entry["full_marks"]
+                and current.obtained_marks == entry["obtained_marks"]
+                and current.remarks == remarks
+            ):
+                result.unchanged.append(current)
+                continue
+
+            result.previous[key] = current.obtained_marks
+            current.full_marks = entry["full_marks"]
+            current.obtained_marks = entry["obtained_marks"]
+            current.remarks = remarks
+            if entry.get("entered_by_id"):
+                current.entered_by_id = entry["entered_by_id"]
+            result.updated.append(current)
+
+        if result.changed:
+            self.model.objects.bulk_create(
+                result.changed,
+                update_conflicts=True,
+                unique_fields=["enrollment", "subject", "assessment_type"],
+                update_fields=[
+                    "full_marks",
+                    "obtained_marks",
+                    "remarks",
+                    "entered_by",
+                    "updated_at",
+                ],
+            )
+        return result
@@ -4,6 +4,7 @@ from __future__ import annotations
 
 from uuid import UUID
 
+from django.db import transaction
 from django.db.models import QuerySet
 
 from shared.base_repository import BaseRepository
@@ -41,3 +42,25 @@ class ResultRepository(BaseRepository[SubjectResult]):
             )
         except self.model.DoesNotExist:
             return None
+
+    @transaction.atomic
+    def bulk_upsert(
+        self, results: list[SubjectResult], batch_size: int = 1000
+    ) -> None:
+        """Insert or update results in one statement per batch, keyed on (enrollment, subject)."""
+        if not results:
+            return
+        self.model.objects.bulk_create(
+            results,
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=["enrollment", "subject"],
+            update_fields=[
+                "total_obtained",
+                "total_full",
+                "percentage",
+                "grade",
+                "grade_point",
+                "updated_at",
+            ],
+        )
@@ -47,3 +47,97 @@ class MarksEntrySelector(BaseSelector):
             .select_related("subject", "assessment_type", "entered_by")
             .order_by("subject__code", "assessment_type__display_order")
         )
+
+    def get_class_subject_grid(
+        self,
+        session_id: UUID,
+        class_id: UUID,
+        section_id: UUID,
+        subject_id: UUID,
+    ) -> dict:
+        """Columnar marks for one class-section-subject.
+
+        Returns a student axis, an assessment axis and a students x assessments
+        matrix of obtained marks (None where nothing is entered). Query count is
+        fixed: enrollments, assessment columns and one marks query.
+        """
+        from academics.models import AssessmentType, AssessmentWeightage, Subject
+        from enrollments.selectors.enrollment_selector import EnrollmentSelector
+
+        enrollments = list(
+            EnrollmentSelector()
+            .list_by_class_section(session_id, class_id, section_id)
+            .order_by("roll_no")
+            .values_list("id", "roll_no", "student__name", "student__student_id")
+        )
+
+        columns = [
+            {
+                "id": w["assessment_type_id"],
+                "code": w["assessment_type__code"],
+                "name": w["assessment_type__name"],
+                "full_marks": w["full_marks"],
+            }
+            for w in AssessmentWeightage.objects.filter(
+                class_ref_id=class_id, subject_id=subject_id
+            )
+            .order_by("assessment_type__display_order")
+            .values(
+                "assessment_type_id",
+                "assessment_type__code",
+                "assessment_type__name",
+                "full_marks",
+            )
+        ]
+        if not columns:
+            default_full = (
+                Subject.objects.filter(id=subject_id)
+                .values_list("default_full_marks", flat=True)
+                .first()
+            )
+            columns = [
+                {"id": a_id, "code": code, "name": name, "full_marks": default_full}
+                for a_id, code, name in AssessmentType.objects.filter(is_active=True)
+                .order_by("display_order")
+                .values_list("id", "code", "name")
+            ]
+
+        row_of = {e[0]: i for i, e in enumerate(enrollments)}
+        col_of = {c["id"]: i for i, c in enumerate(columns)}
+        marks: list[list[int | None]] = [[None] * len(columns) for _ in enrollments]
+
+        cells = self.list_by_class_subject(list(row_of), subject_id).values_list(
+            "enrollment_id",
+            "assessment_type_id",
+            "assessment_type__code",
+            "assessment_type__name",
+            "obtained_marks",
+            "full_marks",
+        )
+        for enrollment_id, a_id, code, name, obtained, full in cells:
+            col = col_of.get(a_id)
+            if col is None:
+                # Entered under an assessment outside the configured structure.
+                col = col_of[a_id] = len(columns)
+                columns.append({"id": a_id, "code": code, "name": name, "full_marks": full})
+                for row in marks:
+                    row.append(None)
+            marks[row_of[enrollment_id]][col] = obtained
+
+        return {
+            "session_id": session_id,
+            "class_id": class_id,
+            "section_id": section_id,
+            "subject_id": subject_id,
+            "students": [
+                {
+                    "enrollment_id": eid,
+                    "roll_no": roll_no,
+                    "name": name,
+                    "student_id": student_id,
+                }
+                for eid, roll_no, name, student_id in enrollments
+            ],
+            "assessments": columns,
+            "marks": marks,
+        }
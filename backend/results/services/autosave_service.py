@@ -0,0 +1,203 @@
+"""Marks autosave service: coalesces cell edits per teacher and flushes them in bulk."""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from uuid import UUID
+
+import structlog
+from django.conf import settings
+from django.db import transaction
+
+from shared.base_service import BaseService
+from results.services.marks_entry_service import MarksEntryService
+
+logger = structlog.get_logger(__name__)
+
+
+CELL_ID_FIELDS = ("enrollment_id", "subject_id", "assessment_type_id")
+
+
+def _cell_key(cell: dict) -> str:
+    return ":".join(str(cell[f]) for f in CELL_ID_FIELDS)
+
+
+class LocalMemoryAutosaveBackend:
+    """Per-process buffer for tests and single-process development only.
+
+    Each process sees only its own buffers, and nothing flushes an idle
+    buffer: cells are written on the next edit past the flush threshold or
+    an explicit flush. Deployments must use the Redis backend.
+    """
+
+    def __init__(self) -> None:
+        self._buffers: dict[str, tuple[float, dict[str, dict]]] = {}
+        self._processing: dict[str, dict[str, dict]] = {}
+        self._lock = threading.Lock()
+
+    def put(self, user_id: str, cells: list[dict]) -> tuple[int, float]:
+        with self._lock:
+            since, buffered = self._buffers.get(user_id, (time.time(), {}))
+            for cell in cells:
+                buffered[_cell_key(cell)] = cell
+            self._buffers[user_id] = (since, buffered)
+            return len(buffered), since
+
+    def claim(self, user_id: str) -> dict[str, dict]:
+        with self._lock:
+            _, buffered = self._buffers.pop(user_id, (0.0, {}))
+            processing = self._processing.setdefault(user_id, {})
+            processing.update(buffered)
+            return dict(processing)
+
+    def ack(self, user_id: str, claimed: dict[str, dict]) -> None:
+        with self._lock:
+            processing = self._processing.get(user_id, {})
+            for key, cell in claimed.items():
+                if processing.get(key) == cell:
+                    del processing[key]
+            if not processing:
+                self._processing.pop(user_id, None)
+
+    @staticmethod
+    def load(raw: dict) -> dict:
+        return dict(raw)
+
+
+# Move the buffer into the processing hash (newer cells win) and return it.
+_CLAIM_SCRIPT = """
+local cells = redis.call('HGETALL', KEYS[1])
+for i = 1, #cells, 2 do
+    redis.call('HSET', KEYS[3], cells[i], cells[i + 1])
+end
+redis.call('DEL', KEYS[1], KEYS[2])
+redis.call('EXPIRE', KEYS[3], ARGV[1])
+return redis.call('HGETALL', KEYS[3])
+"""
+
+# Drop claimed cells from the processing hash unless re-claimed with a newer value.
+_ACK_SCRIPT = """
+for i = 1, #ARGV, 2 do
+    if redis.call('HGET', KEYS[1], ARGV[i]) == ARGV[i + 1] then
+        redis.call('HDEL', KEYS[1], ARGV[i])
+    end
+end
+"""
+
+
+class RedisAutosaveBackend:
+    """Shared buffer in a Redis hash per teacher; one field per cell.
+
+    A flush first moves the buffer into a processing hash and only removes
+    cells from it once they are committed, so a failed or killed flush
+    leaves them for the next flush or task retry.
+    """
+
+    def __init__(self, url: str | None = None) -> None:
+        import redis
+
+        self._redis = redis.Redis.from_url(
+            url or getattr(settings, "REDIS_URL", "redis://localhost:6379/0")
+        )
+        self._ttl = settings.MARKS_AUTOSAVE_BUFFER_TTL
+
+    @staticmethod
+    def _keys(user_id: str) -> tuple[str, str]:
+        base = f"marks:autosave:{user_id}"
+        return base, f"{base}:since"
+
+    @staticmethod
+    def _processing_key(user_id: str) -> str:
+        return f"marks:autosave:{user_id}:processing"
+
+    def put(self, user_id: str, cells: list[dict]) -> tuple[int, float]:
+        cells_key, since_key = self._keys(user_id)
+        pipe = self._redis.pipeline(transaction=True)
+        pipe.hset(
+            cells_key,
+            mapping={_cell_key(c): json.dumps(c, default=str) for c in cells},
+        )
+        pipe.set(since_key, time.time(), nx=True)
+        pipe.expire(cells_key, self._ttl)
+        pipe.expire(since_key, self._ttl)
+        pipe.hlen(cells_key)
+        pipe.get(since_key)
+        *_, size, since = pipe.execute()
+        return int(size), float(since)
+
+    def claim(self, user_id: str) -> dict[bytes, bytes]:
+        cells_key, since_key = self._keys(user_id)
+        flat = self._redis.eval(
+            _CLAIM_SCRIPT, 3, cells_key, since_key, self._processing_key(user_id), self._ttl
+        )
+        return dict(zip(flat[::2], flat[1::2]))
+
+    def ack(self, user_id: str, claimed: dict[bytes, bytes]) -> None:
+        args = [part for item in claimed.items() for part in item]
+        self._redis.eval(_ACK_SCRIPT, 1, self._processing_key(user_id), *args)
+
+    @staticmethod
+    def load(raw: bytes) -> dict:
+        return json.loads(raw)
+
+
+_local_backend = LocalMemoryAutosaveBackend()
+
+
+def get_autosave_backend():
+    if settings.MARKS_AUTOSAVE_BACKEND == "redis":
+        return RedisAutosaveBackend()
+    return _local_backend
+
+
+class MarksAutosaveService(BaseService):
+    """Buffers autosaved marks cells and writes them with one bulk upsert per flush.
+
+    Repeated edits to the same (enrollment, subject, assessment) overwrite each
+    other in the buffer, so only the last value is written. A flush happens when
+    the buffer is older than MARKS_AUTOSAVE_FLUSH_SECONDS or holds
+    MARKS_AUTOSAVE_MAX_CELLS cells, when the client asks for one, or (with the
+    Redis backend) from a delayed Celery task. Cells leave the buffer only
+    after the write that contains them commits.
+    """
+
+    def __init__(self, backend=None) -> None:
+        self.backend = backend or get_autosave_backend()
+        self._marks_service = MarksEntryService()
+
+    def buffer(self, user_id: UUID, cells: list[dict]) -> dict:
+        size, since = self.backend.put(str(user_id), cells)
+        if (
+            size >= settings.MARKS_AUTOSAVE_MAX_CELLS
+            or time.time() - since >= settings.MARKS_AUTOSAVE_FLUSH_SECONDS
+        ):
+            return {"buffered": 0, "flushed": self.flush(user_id)}
+
+        if size == len(cells) and isinstance(self.backend, RedisAutosaveBackend):
+            # First edits of a new buffer: make sure it is flushed even if the
+            # teacher stops typing.
+            from tasks.autosave_tasks import flush_marks_autosave
+
+            flush_marks_autosave.apply_async(
+                args=[str(user_id)], countdown=settings.MARKS_AUTOSAVE_FLUSH_SECONDS
+            )
+        return {"buffered": size, "flushed": None}
+
+    def flush(self, user_id: UUID) -> dict:
+        claimed = self.backend.claim(str(user_id))
+        if not claimed:
+            return {"created": 0, "updated": 0, "unchanged": 0}
+        cells = [self.backend.load(raw) for raw in claimed.values()]
+        for cell in cells:
+            for f in CELL_ID_FIELDS:
+                cell[f] = UUID(str(cell[f]))
+        result = self._marks_service.bulk_upsert(
+            entries=cells,
+            entered_by_id=user_id,
+            summarize_audit=True,
+        )
+        transaction.on_commit(lambda: self.backend.ack(str(user_id), claimed))
+        self.log.info("marks_autosave.flushed", user_id=str(user_id), **result.counts())
+        return result.counts()
@@ -0,0 +1,77 @@
+"""In-memory authorization index for marks entry payloads."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from dataclasses import dataclass
+from uuid import UUID
+
+from academics.models import TeacherAssignment
+from enrollments.models import Enrollment
+
+# (session_id, class_id, section_id, subject_id)
+AssignmentKey = tuple[UUID, UUID, UUID, UUID]
+
+
+@dataclass(frozen=True)
+class MarksAuthorizationIndex:
+    """A user's marks-entry rights plus the enrollments referenced by a payload.
+
+    Built with two queries regardless of payload size: one for the enrollments'
+    class/section/session and one for the teacher's active assignments in those
+    sessions. Every entry is then checked in memory.
+    """
+
+    role: str
+    assignments: frozenset[AssignmentKey]
+    enrollments: dict[UUID, tuple[UUID, UUID, UUID]]
+
+    @classmethod
+    def build(
+        cls,
+        user,
+        enrollment_ids: Iterable[UUID],
+        session_ids: Iterable[UUID] = (),
+    ) -> MarksAuthorizationIndex:
+        """Index the payload's enrollments; ``session_ids`` adds assignments
+        for scopes checked directly with ``check_scope``."""
+        if user.role != "teacher":
+            return cls(role=user.role, assignments=frozenset(), enrollments={})
+
+        enrollments = {
+            eid: (session_id, class_id, section_id)
+            for eid, session_id, class_id, section_id in Enrollment.objects.filter(
+                id__in=set(enrollment_ids)
+            ).values_list("id", "session_id", "class_field_id", "section_id")
+        }
+        assignments = frozenset(
+            TeacherAssignment.objects.filter(
+                teacher__user_id=user.id,
+                session_id__in={e[0] for e in enrollments.values()} | set(session_ids),
+                is_active=True,
+            ).values_list("session_id", "class_ref_id", "section_id", "subject_id")
+        )
+        return cls(role=user.role, assignments=assignments, enrollments=enrollments)
+
+    def check(self, enrollment_id: UUID, subject_id: UUID) -> str | None:
+        """Return None if the entry is allowed, otherwise the reason it is not."""
+        if self.role == "admin":
+            return None
+        if self.role != "teacher":
+            return "Only admins and teachers can enter marks."
+        placement = self.enrollments.get(enrollment_id)
+        if placement is None:
+            return "Enrollment not found."
+        return self.check_scope(*placement, subject_id)
+
+    def check_scope(
+        self, session_id: UUID, class_id: UUID, section_id: UUID, subject_id: UUID
+    ) -> str | None:
+        """Return None if marks for this class-section-subject are allowed."""
+        if self.role == "admin":
+            return None
+        if self.role != "teacher":
+            return "Only admins and teachers can enter marks."
+        if (session_id, class_id, section_id, subject_id) not in self.assignments:
+            return "You are not assigned to teach this subject for this class."
+        return None
@@ -18,7 +18,12 @@ from shared.exceptions import (
 )
 from core.models_audit import AuditLog
 from results.models import MarksEntry
-from results.repositories.marks_entry_repository import MarksEntryRepository
+from results.repositories.marks_entry_repository import (
+    MarksEntryRepository,
+    MarksUpsertResult,
+)
+from results.services.marks_authorization import MarksAuthorizationIndex
+from results.services.result_service import ResultService
 
 logger = structlog.get_logger(__name__)
 
@@ -28,6 +33,7 @@ class MarksEntryService(BaseService):
 
     def __init__(self) -> None:
         self.repo = MarksEntryRepository()
+        self._result_service = ResultService()
 
     def enter_marks(
         self,
@@ -81,6 +87,7 @@ class MarksEntryService(BaseService):
                 "obtained_marks": obtained_marks,
             },
         )
+        self._result_service.mark_dirty([(enrollment_id, subject_id)])
         return entry
 
     def update_marks(
@@ -114,21 +121,127 @@ class MarksEntryService(BaseService):
                 "full_marks": entry.full_marks,
             },
         )
+        self._result_service.mark_dirty([(entry.enrollment_id, entry.subject_id)])
         return updated  # type: ignore[return-value]
 
+    @transaction.atomic
+    def delete_marks(self, entry: MarksEntry) -> None:
+        """Delete a marks entry and queue its subject result for recompute."""
+        self.log.info("marks_entry.deleting", entry_id=str(entry.id))
+        pair = (entry.enrollment_id, entry.subject_id)
+        entry.delete()
+        self._result_service.mark_dirty([pair])
+
     @transaction.atomic
     def bulk_upsert(
         self,
         entries: list[dict],
         entered_by_id: UUID,
-    ) -> list[MarksEntry]:
-        """Bulk create or update marks entries."""
+        summarize_audit: bool = False,
+    ) -> MarksUpsertResult:
+        """Bulk create or update marks entries.
+
+        Writes and audit rows are both issued in bulk; unchanged cells produce
+        neither. With ``summarize_audit`` the whole call is recorded as a single
+        audit row listing the changed cells.
+        """
         for entry in entries:
             self._validate_marks(entry["full_marks"], entry["obtained_marks"])
             entry["entered_by_id"] = entered_by_id
 
-        self.log.info("marks_entry.bulk_upsert", count=len(entries))
-        return self.repo.bulk_create_or_update(entries)
+        result = self.repo.bulk_create_or_update(entries)
+        self.log.info("marks_entry.bulk_upsert", count=len(entries), **result.counts())
+
+        if summarize_audit:
+            self._audit_summary(result, entered_by_id)
+        else:
+            self._audit_entries(result, entered_by_id)
+
+        self._result_service.mark_dirty(
+            (e.enrollment_id, e.subject_id) for e in result.changed
+        )
+        return result
+
+    @staticmethod
+    def _audit_entries(result: MarksUpsertResult, entered_by_id: UUID) -> None:
+        audit_rows = [
+            {
+                "action": "marks_bulk_updated",
+                "user_id": entered_by_id,
+                "entity_type": "MarksEntry",
+                "entity_id": str(e.id),
+                "details": {
+                    "enrollment_id": str(e.enrollment_id),
+                    "subject_id": str(e.subject_id),
+                    "full_marks": e.full_marks,
+                    "obtained_marks": e.obtained_marks,
+                },
+            }
+            for e in result.created
+        ]
+        for e in result.updated:
+            key = (e.enrollment_id, e.subject_id, e.assessment_type_id)
+            audit_rows.append({
+                "action": "marks_bulk_updated",
+                "user_id": entered_by_id,
+                "entity_type": "MarksEntry",
+                "entity_id": str(e.id),
+                "details": {
+                    "enrollment_id": str(e.enrollment_id),
+                    "subject_id": str(e.subject_id),
+                    "obtained_marks": f"{result.previous[key]} -> {e.obtained_marks}",
+                    "full_marks": e.full_marks,
+                },
+            })
+        if audit_rows:
+            AuditLog.log_many(audit_rows)
+
+    @staticmethod
+    def _audit_summary(result: MarksUpsertResult, entered_by_id: UUID) -> None:
+        if not result.changed:
+            return
+        AuditLog.log_many([{
+            "action": "marks_autosaved",
+            "user_id": entered_by_id,
+            "entity_type": "MarksEntry",
+            # First changed entry; every changed cell is listed in details.
+            "entity_id": result.changed[0].id,
+            "details": {
+                **result.counts(),
+                "cells": [
+                    {
+                        "id": str(e.id),
+                        "enrollment_id": str(e.enrollment_id),
+                        "subject_id": str(e.subject_id),
+                        "assessment_type_id": str(e.assessment_type_id),
+                        "obtained_marks": e.obtained_marks,
+                        "previous": result.previous.get(
+                            (e.enrollment_id, e.subject_id, e.assessment_type_id)
+                        ),
+                    }
+                    for e in result.changed
+                ],
+            },
+        }])
+
+    @staticmethod
+    def grid_to_entries(grid: dict) -> list[dict]:
+        """Flatten a validated marks grid into bulk-upsert entries, skipping null cells."""
+        subject_id = grid["subject_id"]
+        assessments = grid["assessments"]
+        entries = []
+        for student, row in zip(grid["students"], grid["marks"]):
+            for assessment, obtained in zip(assessments, row):
+                if obtained is None:
+                    continue
+                entries.append({
+                    "enrollment_id": student["enrollment_id"],
+                    "subject_id": subject_id,
+                    "assessment_type_id": assessment["id"],
+                    "full_marks": assessment["full_marks"],
+                    "obtained_marks": obtained,
+                })
+        return entries
 
     def authorize_entry(
         self, user_id: UUID, enrollment_id: UUID, subject_id: UUID
@@ -145,41 +258,73 @@ class MarksEntryService(BaseService):
         except User.DoesNotExist:
             return False, "User not found."
 
-        if user.role == "admin":
-            return True, None
-
-        if user.role != "teacher":
-            return False, "Only admins and teachers can enter marks."
+        return self.authorize_entries(
+            user, [{"enrollment_id": enrollment_id, "subject_id": subject_id}]
+        )
 
-        from enrollments.models import Enrollment
-        from academics.models import TeacherAssignment
-        from identity.models import TeacherProfile
+    def authorize_entries(
+        self, user, entries: list[dict]
+    ) -> tuple[bool, str | None]:
+        """Check a whole payload against one MarksAuthorizationIndex.
 
-        try:
-            enrollment = Enrollment.objects.select_related(
-                "class_field", "section", "session"
-            ).get(id=enrollment_id)
-        except Enrollment.DoesNotExist:
-            return False, "Enrollment not found."
+        Costs two queries for teachers and none for admins, however many
+        entries the payload holds.
+        """
+        index = MarksAuthorizationIndex.build(
+            user, (e["enrollment_id"] for e in entries)
+        )
+        for position, entry in enumerate(entries):
+            error = index.check(entry["enrollment_id"], entry["subject_id"])
+            if error is not None:
+                self.log.warning(
+                    "marks_entry.unauthorized",
+                    user_id=str(user.id),
+                    enrollment_id=str(entry["enrollment_id"]),
+                    subject_id=str(entry["subject_id"]),
+                )
+                if len(entries) > 1:
+                    error = f"Entry {position}: {error}"
+                return False, error
+        return True, None
 
-        try:
-            teacher_profile = TeacherProfile.objects.get(user=user)
-        except TeacherProfile.DoesNotExist:
-            return False, "Teacher profile not found."
-
-        has_assignment = TeacherAssignment.objects.filter(
-            teacher=teacher_profile,
-            class_ref=enrollment.class_field,
-            section=enrollment.section,
-            subject_id=subject_id,
-            session=enrollment.session,
-            is_active=True,
-        ).exists()
+    def authorize_grid(self, user, scope: dict) -> tuple[bool, str | None]:
+        """Check a user against a grid's session/class/section/subject."""
+        index = MarksAuthorizationIndex.build(user, (), session_ids=[scope["session_id"]])
+        error = index.check_scope(
+            scope["session_id"], scope["class_id"], scope["section_id"], scope["subject_id"]
+        )
+        if error is not None:
+            self.log.warning(
+                "marks_entry.grid_unauthorized",
+                user_id=str(user.id),
+                class_id=str(scope["class_id"]),
+                section_id=str(scope["section_id"]),
+                subject_id=str(scope["subject_id"]),
+            )
+            return False, error
+        return True, None
 
-        if not has_assignment:
-            return False, "You are not assigned to teach this subject for this class."
+    @staticmethod
+    def validate_grid_enrollments(grid: dict) -> str | None:
+        """Return an error if any grid row is not enrolled in the grid's section."""
+        from enrollments.models import Enrollment
 
-        return True, None
+        requested = {student["enrollment_id"] for student in grid["students"]}
+        in_scope = set(
+            Enrollment.objects.filter(
+                id__in=requested,
+                session_id=grid["session_id"],
+                class_field_id=grid["class_id"],
+                section_id=grid["section_id"],
+            ).values_list("id", flat=True)
+        )
+        outside = requested - in_scope
+        if outside:
+            return (
+                f"{len(outside)} enrollment(s) do not belong to this session, "
+                "class and section."
+            )
+        return None
 
     def get_entries_for_enrollment(self, enrollment_id: UUID) -> QuerySet[MarksEntry]:
         """Return all marks entries for a given enrollment."""
@@ -0,0 +1,271 @@
+"""Marks import service: streams CSV/XLSX marks sheets into marks entries."""
+
+from __future__ import annotations
+
+import csv
+import io
+from collections.abc import Iterator
+from itertools import islice
+from uuid import UUID
+
+import structlog
+from django.conf import settings
+from django.utils import timezone
+
+from shared.base_service import BaseService
+from shared.exceptions import MarksValidationException
+from results.models import MarksImportJob
+from results.services.marks_authorization import MarksAuthorizationIndex
+from results.services.marks_entry_service import MarksEntryService
+
+logger = structlog.get_logger(__name__)
+
+REQUIRED_COLUMNS = ("student_id", "subject_code", "assessment_code", "obtained_marks")
+
+
+class MarksImportService(BaseService):
+    """Validates and upserts marks from an uploaded sheet in fixed-size chunks.
+
+    Rows are read lazily (csv module or openpyxl read-only mode) and student
+    IDs, subject codes and assessment codes are resolved against lookup maps
+    loaded once per job, so memory and query count depend on the chunk size,
+    not the file size.
+    """
+
+    def __init__(self) -> None:
+        self._marks_service = MarksEntryService()
+
+    def create_job(self, session_id: UUID, uploaded_file, user) -> MarksImportJob:
+        job = MarksImportJob.objects.create(
+            session_id=session_id,
+            uploaded_by=user,
+            file=uploaded_file,
+            original_filename=getattr(uploaded_file, "name", ""),
+        )
+        self.log.info("marks_import.created", job_id=str(job.id), size=job.file.size)
+        return job
+
+    def should_run_async(self, job: MarksImportJob) -> bool:
+        return job.file.size > settings.MARKS_IMPORT_SYNC_MAX_BYTES
+
+    def run(self, job_id: UUID) -> MarksImportJob:
+        """Process a pending job to completion, updating progress after each chunk."""
+        job = MarksImportJob.objects.select_related("uploaded_by").get(id=job_id)
+        job.status = "running"
+        job.started_at = timezone.now()
+        job.save(update_fields=["status", "started_at", "updated_at"])
+
+        try:
+            lookups = self._load_lookups(job.session_id)
+            with job.file.open("rb") as fh:
+                rows = self._iter_rows(fh, job.original_filename or job.file.name)
+                chunk_size = settings.MARKS_IMPORT_CHUNK_SIZE
+                while chunk := list(islice(rows, chunk_size)):
+                    self._process_chunk(job, chunk, lookups)
+                    job.save(update_fields=[
+                        "rows_processed",
+                        "rows_failed",
+                        "created_count",
+                        "updated_count",
+                        "unchanged_count",
+                        "errors",
+                        "updated_at",
+                    ])
+        except MarksValidationException as exc:
+            self._fail(job, str(exc.detail))
+            return job
+        except Exception as exc:
+            self._fail(job, str(exc))
+            raise
+
+        job.status = "completed"
+        job.finished_at = timezone.now()
+        job.save(update_fields=["status", "finished_at", "updated_at"])
+        self.log.info(
+            "marks_import.completed",
+            job_id=str(job.id),
+            rows=job.rows_processed,
+            failed=job.rows_failed,
+        )
+        return job
+
+    def _fail(self, job: MarksImportJob, message: str) -> None:
+        job.status = "failed"
+        job.finished_at = timezone.now()
+        job.errors = [*job.errors, {"row": None, "error": message}]
+        job.save(update_fields=["status", "finished_at", "errors", "updated_at"])
+        self.log.error("marks_import.failed", job_id=str(job.id), error=message)
+
+    @staticmethod
+    def _load_lookups(session_id: UUID) -> dict:
+        """Preload every code -> id map a row may need, one query each."""
+        from academics.models import AssessmentType, AssessmentWeightage, Subject
+        from enrollments.models import Enrollment
+
+        enrollments = {
+            student_id: (enrollment_id, class_id)
+            for student_id, enrollment_id, class_id in Enrollment.objects.filter(
+                session_id=session_id, status="active"
+            ).values_list("student__student_id", "id", "class_field_id")
+        }
+        subjects = {
+            code.upper(): (subject_id, default_full)
+            for code, subject_id, default_full in Subject.objects.values_list(
+                "code", "id", "default_full_marks"
+            )
+        }
+        assessments = {
+            code.upper(): a_id
+            for code, a_id in AssessmentType.objects.filter(is_active=True).values_list(
+                "code", "id"
+            )
+        }
+        weightage_full = {
+            (class_id, subject_id, a_id): full
+            for class_id, subject_id, a_id, full in AssessmentWeightage.objects.filter(
+                class_ref_id__in={c for _, c in enrollments.values()}
+            ).values_list("class_ref_id", "subject_id", "assessment_type_id", "full_marks")
+        }
+        return {
+            "enrollments": enrollments,
+            "subjects": subjects,
+            "assessments": assessments,
+            "weightage_full": weightage_full,
+        }
+
+    @staticmethod
+    def _iter_rows(fh, filename: str) -> Iterator[tuple[int, dict]]:
+        """Yield (row_number, row_dict) pairs without loading the whole sheet."""
+        if filename.lower().endswith(".xlsx"):
+            import openpyxl
+
+            wb = openpyxl.load_workbook(fh, read_only=True, data_only=True)
+            try:
+                sheet_rows = wb.active.iter_rows(values_only=True)
+                header = next(sheet_rows, None)
+                if header is None:
+                    return
+                keys = [str(h or "").strip().lower() for h in header]
+                _check_header(keys)
+                for number, values in enumerate(sheet_rows, start=2):
+                    if values is None or all(v is None for v in values):
+                        continue
+                    yield number, dict(zip(keys, values))
+            finally:
+                wb.close()
+            return
+
+        text = io.TextIOWrapper(fh, encoding="utf-8-sig", newline="")
+        reader = csv.DictReader(text)
+        if reader.fieldnames is None:
+            return
+        reader.fieldnames = [f.strip().lower() for f in reader.fieldnames]
+        _check_header(reader.fieldnames)
+        for number, row in enumerate(reader, start=2):
+            if not any(v for v in row.values() if v):
+                continue
+            yield number, row
+
+    def _process_chunk(
+        self, job: MarksImportJob, chunk: list[tuple[int, dict]], lookups: dict
+    ) -> None:
+        errors: list[dict] = []
+        candidates: list[tuple[int, dict]] = []
+
+        for number, row in chunk:
+            entry, error = self._resolve_row(row, lookups)
+            if error:
+                errors.append({"row": number, "error": error})
+            else:
+                candidates.append((number, entry))
+
+        entries = []
+        if candidates and job.uploaded_by is None:
+            errors.extend(
+                {"row": number, "error": "Uploader account no longer exists."}
+                for number, _ in candidates
+            )
+        elif candidates:
+            index = MarksAuthorizationIndex.build(
+                job.uploaded_by, (e["enrollment_id"] for _, e in candidates)
+            )
+            for number, entry in candidates:
+                error = index.check(entry["enrollment_id"], entry["subject_id"])
+                if error:
+                    errors.append({"row": number, "error": error})
+                else:
+                    entries.append(entry)
+
+        if entries:
+            result = self._marks_service.bulk_upsert(
+                entries=entries, entered_by_id=job.uploaded_by_id
+            )
+            job.created_count += len(result.created)
+            job.updated_count += len(result.updated)
+            job.unchanged_count += len(result.unchanged)
+
+        job.rows_processed += len(chunk)
+        job.rows_failed += len(errors)
+        room = settings.MARKS_IMPORT_MAX_ERRORS - len(job.errors)
+        if room > 0:
+            job.errors = [*job.errors, *errors[:room]]
+
+    @staticmethod
+    def _resolve_row(row: dict, lookups: dict) -> tuple[dict | None, str | None]:
+        student_id = str(row.get("student_id") or "").strip()
+        subject_code = str(row.get("subject_code") or "").strip().upper()
+        assessment_code = str(row.get("assessment_code") or "").strip().upper()
+
+        placement = lookups["enrollments"].get(student_id)
+        if placement is None:
+            return None, f"No active enrollment for student '{student_id}' in this session."
+        subject = lookups["subjects"].get(subject_code)
+        if subject is None:
+            return None, f"Unknown subject code '{subject_code}'."
+        assessment_id = lookups["assessments"].get(assessment_code)
+        if assessment_id is None:
+            return None, f"Unknown assessment code '{assessment_code}'."
+
+        enrollment_id, class_id = placement
+        subject_id, default_full = subject
+        try:
+            obtained = _whole_number(row.get("obtained_marks"))
+            raw_full = row.get("full_marks")
+            full = (
+                _whole_number(raw_full)
+                if raw_full not in (None, "")
+                else lookups["weightage_full"].get(
+                    (class_id, subject_id, assessment_id), default_full
+                )
+            )
+        except (TypeError, ValueError):
+            return None, "obtained_marks and full_marks must be whole numbers."
+
+        try:
+            MarksEntryService._validate_marks(full, obtained)
+        except MarksValidationException as exc:
+            return None, str(exc.detail)
+
+        return {
+            "enrollment_id": enrollment_id,
+            "subject_id": subject_id,
+            "assessment_type_id": assessment_id,
+            "full_marks": full,
+            "obtained_marks": obtained,
+            "remarks": str(row.get("remarks") or ""),
+        }, None
+
+
+def _check_header(keys: list[str]) -> None:
+    missing = [c for c in REQUIRED_COLUMNS if c not in keys]
+    if missing:
+        raise MarksValidationException(
+            f"Missing required column(s): {', '.join(missing)}."
+        )
+
+
+def _whole_number(value) -> int:
+    number = float(value)
+    if not number.is_integer():
+        raise ValueError(value)
+    return int(number)
@@ -12,6 +12,8 @@ from shared.base_service import BaseService
 from core.models_audit import AuditLog
 from results.models import ResultPublication
 from results.repositories.result_repository import ResultRepository
+from results.services.result_service import ResultService
+from results.services.snapshot_service import ResultSnapshotService
 
 logger = structlog.get_logger(__name__)
 
@@ -92,7 +94,14 @@ class ResultPublicationService(BaseService):
                 current_status=publication.status,
             )
             return None
+        # Marks saved since the last background pass must be in the snapshot.
+        ResultService().recompute_dirty(
+            session_id=publication.session_id,
+            class_field_id=publication.class_field_id,
+            section_id=publication.section_id,
+        )
         publication.publish(user)
+        ResultSnapshotService().materialize(publication)
         self.log.info("publication_published", id=str(publication_id))
         AuditLog.log(
             action="result_published",
@@ -142,6 +151,7 @@ class ResultPublicationService(BaseService):
             )
             return None
         publication.unpublish()
+        ResultSnapshotService().discard(publication)
         self.log.info("publication_unpublished", id=str(publication_id))
         AuditLog.log(
             action="result_unpublished",
@@ -0,0 +1,253 @@
+"""Result engine: turns marks entries into per-subject totals, raw or weighted."""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from uuid import UUID
+
+import structlog
+from django.conf import settings
+from django.db.models import QuerySet, Sum
+
+from academics.models import AssessmentWeightage
+from results.models import MarksEntry
+from shared.base_service import BaseService
+
+AGGREGATION_RAW = "raw"
+AGGREGATION_WEIGHTED = "weighted"
+AGGREGATION_MODES = (AGGREGATION_RAW, AGGREGATION_WEIGHTED)
+
+PairKey = tuple[UUID, UUID]
+
+logger = structlog.get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class SubjectTotals:
+    """Aggregated marks for one (enrollment, subject)."""
+
+    total_obtained: int
+    total_full: int
+    percentage: float
+
+
+@dataclass(frozen=True)
+class WeightStructure:
+    """Configured assessments of one class-subject, as parallel columns."""
+
+    assessment_ids: tuple[UUID, ...]
+    full_marks: tuple[int, ...]
+    weights: tuple[float, ...]
+
+    def column_index(self) -> dict[UUID, int]:
+        return {a: i for i, a in enumerate(self.assessment_ids)}
+
+
+@dataclass
+class MarksMatrix:
+    """Columnar marks for one class-subject: enrollments x assessments.
+
+    Cells hold obtained/full ratios, or None where no entry exists.
+    """
+
+    structure: WeightStructure
+    enrollment_ids: list[UUID] = field(default_factory=list)
+    cells: list[list[float | None]] = field(default_factory=list)
+    _rows: dict[UUID, int] = field(default_factory=dict)
+    _columns: dict[UUID, int] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        self._columns = self.structure.column_index()
+
+    def put(self, enrollment_id: UUID, assessment_type_id: UUID, obtained: int, full: int) -> bool:
+        """Place one entry; False if its assessment type is not part of the structure.
+
+        Entries must carry positive full marks; the caller filters the rest out.
+        """
+        if full <= 0:
+            raise ValueError("Cannot weight an entry with no full marks.")
+        col = self._columns.get(assessment_type_id)
+        if col is None:
+            return False
+        row = self._rows.get(enrollment_id)
+        if row is None:
+            row = self._rows[enrollment_id] = len(self.enrollment_ids)
+            self.enrollment_ids.append(enrollment_id)
+            self.cells.append([None] * len(self._columns))
+        self.cells[row][col] = obtained / full
+        return True
+
+    def weighted_totals(self) -> Iterable[tuple[UUID, SubjectTotals]]:
+        """Apply the weight vector row by row; missing cells drop out of the denominator."""
+        weights = self.structure.weights
+        full_marks = self.structure.full_marks
+        for enrollment_id, row in zip(self.enrollment_ids, self.cells):
+            score = weight_sum = 0.0
+            total_full = 0
+            for ratio, weight, full in zip(row, weights, full_marks):
+                if ratio is None:
+                    continue
+                score += ratio * weight
+                weight_sum += weight
+                total_full += full
+            fraction = score / weight_sum if weight_sum else 0.0
+            yield enrollment_id, SubjectTotals(
+                total_obtained=round(fraction * total_full),
+                total_full=total_full,
+                percentage=round(fraction * 100, 2),
+            )
+
+
+class ResultEngine(BaseService):
+    """Aggregates marks into subject totals under the configured policy.
+
+    ``raw`` sums obtained/full marks as entered. ``weighted`` normalises every
+    assessment to its AssessmentWeightage full marks and applies the configured
+    weightage; class-subjects without a weightage structure fall back to raw.
+    Entries under an assessment type the structure does not cover are left out
+    and logged; a pair with no covered entries at all falls back to raw too.
+    """
+
+    def __init__(self, mode: str | None = None) -> None:
+        self.mode = mode or getattr(settings, "RESULT_AGGREGATION_MODE", AGGREGATION_RAW)
+        if self.mode not in AGGREGATION_MODES:
+            raise ValueError(f"Unknown result aggregation mode '{self.mode}'.")
+        self._structures: dict[PairKey, WeightStructure] = {}
+        self._loaded_classes: set[UUID] = set()
+
+    def load_weightages(self, class_ids: Iterable[UUID]) -> None:
+        """Load weightage structures for the given classes in one query."""
+        missing = set(class_ids) - self._loaded_classes
+        if not missing:
+            return
+        columns: dict[PairKey, list[tuple[int, UUID, int, float]]] = defaultdict(list)
+        rows = AssessmentWeightage.objects.filter(class_ref_id__in=missing).values_list(
+            "class_ref_id",
+            "subject_id",
+            "assessment_type_id",
+            "assessment_type__display_order",
+            "full_marks",
+            "weightage_pct",
+        )
+        for class_id, subject_id, assessment_id, order, full, pct in rows:
+            columns[(class_id, subject_id)].append((order, assessment_id, full, float(pct)))
+        for key, cols in columns.items():
+            cols.sort(key=lambda c: c[0])
+            self._structures[key] = WeightStructure(
+                assessment_ids=tuple(c[1] for c in cols),
+                full_marks=tuple(c[2] for c in cols),
+                weights=tuple(c[3] for c in cols),
+            )
+        self._loaded_classes |= missing
+
+    def structure_for(self, class_id: UUID, subject_id: UUID) -> WeightStructure | None:
+        return self._structures.get((class_id, subject_id))
+
+    def compute(self, marks_qs: QuerySet[MarksEntry]) -> dict[PairKey, SubjectTotals]:
+        """Return totals keyed by (enrollment_id, subject_id) for every pair in marks_qs."""
+        if self.mode == AGGREGATION_RAW:
+            return self._compute_raw(marks_qs)
+        return self._compute_weighted(marks_qs)
+
+    def compute_class_section(
+        self, class_id: UUID, section_id: UUID, session_id: UUID
+    ) -> dict[PairKey, SubjectTotals]:
+        """Totals for every active enrollment and subject of one class-section."""
+        return self.compute(
+            MarksEntry.objects.filter(
+                enrollment__class_field_id=class_id,
+                enrollment__section_id=section_id,
+                enrollment__session_id=session_id,
+                enrollment__status="active",
+            )
+        )
+
+    @staticmethod
+    def _compute_raw(marks_qs: QuerySet[MarksEntry]) -> dict[PairKey, SubjectTotals]:
+        aggregates = (
+            marks_qs.values("enrollment_id", "subject_id")
+            .annotate(
+                total_obtained=Sum("obtained_marks"),
+                total_full=Sum("full_marks"),
+            )
+            .order_by()
+        )
+        totals = {}
+        for row in aggregates:
+            obtained = row["total_obtained"] or 0
+            full = row["total_full"] or 0
+            totals[(row["enrollment_id"], row["subject_id"])] = SubjectTotals(
+                total_obtained=obtained,
+                total_full=full,
+                percentage=round((obtained / full) * 100, 2) if full else 0.0,
+            )
+        return totals
+
+    def _compute_weighted(self, marks_qs: QuerySet[MarksEntry]) -> dict[PairKey, SubjectTotals]:
+        rows = list(
+            marks_qs.order_by().values_list(
+                "enrollment_id",
+                "enrollment__class_field_id",
+                "subject_id",
+                "assessment_type_id",
+                "obtained_marks",
+                "full_marks",
+            )
+        )
+        self.load_weightages({r[1] for r in rows})
+
+        matrices: dict[PairKey, MarksMatrix] = {}
+        raw: dict[PairKey, list[int]] = defaultdict(lambda: [0, 0])
+        unweighted: dict[PairKey, list[int]] = defaultdict(lambda: [0, 0])
+        dropped: dict[PairKey, set[UUID]] = defaultdict(set)
+        skipped = 0
+        for enrollment_id, class_id, subject_id, assessment_id, obtained, full in rows:
+            structure = self._structures.get((class_id, subject_id))
+            if structure is None:
+                acc = raw[(enrollment_id, subject_id)]
+                acc[0] += obtained
+                acc[1] += full
+                continue
+            if full <= 0:
+                # No ratio to weight; left out of the matrix and the raw fallback.
+                skipped += 1
+                continue
+            matrix = matrices.get((class_id, subject_id))
+            if matrix is None:
+                matrix = matrices[(class_id, subject_id)] = MarksMatrix(structure)
+            if not matrix.put(enrollment_id, assessment_id, obtained, full):
+                acc = unweighted[(enrollment_id, subject_id)]
+                acc[0] += obtained
+                acc[1] += full
+                dropped[(class_id, subject_id)].add(assessment_id)
+
+        if skipped:
+            logger.warning("result_engine.zero_full_marks_skipped", entries=skipped)
+        for (class_id, subject_id), assessment_ids in dropped.items():
+            logger.warning(
+                "result_engine.unweighted_assessments",
+                class_id=str(class_id),
+                subject_id=str(subject_id),
+                assessment_type_ids=sorted(str(a) for a in assessment_ids),
+            )
+
+        totals: dict[PairKey, SubjectTotals] = {
+            key: _raw_totals(obtained, full) for key, (obtained, full) in raw.items()
+        }
+        for (_, subject_id), matrix in matrices.items():
+            for enrollment_id, subject_totals in matrix.weighted_totals():
+                totals[(enrollment_id, subject_id)] = subject_totals
+        # Pairs whose entries all sit outside the structure keep a raw total.
+        for key, (obtained, full) in unweighted.items():
+            totals.setdefault(key, _raw_totals(obtained, full))
+        return totals
+
+
+def _raw_totals(obtained: int, full: int) -> SubjectTotals:
+    return SubjectTotals(
+        total_obtained=obtained,
+        total_full=full,
+        percentage=round((obtained / full) * 100, 2) if full else 0.0,
+    )
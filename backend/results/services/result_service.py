@@ -2,25 +2,42 @@
 
 from __future__ import annotations
 
+import operator
+from collections.abc import Iterable
+from decimal import Decimal
+from functools import reduce
 from uuid import UUID
 
 import structlog
+from django.conf import settings
+from django.core.cache import cache
 from django.db import transaction
-from django.db.models import Sum
+from django.db.models import Count, Q, QuerySet, Sum
+from django.utils import timezone
 
 from shared.base_service import BaseService
 from shared.exceptions import NotFoundException
-from results.models import MarksEntry, SubjectResult
+from results.models import (
+    EnrollmentResult,
+    MarksEntry,
+    PendingResultRecompute,
+    SubjectResult,
+)
+from results.repositories.enrollment_result_repository import EnrollmentResultRepository
 from results.repositories.result_repository import ResultRepository
+from results.services.result_engine import ResultEngine
 
 logger = structlog.get_logger(__name__)
 
+DIRTY_RECOMPUTE_SCHEDULED_KEY = "results:dirty_recompute_scheduled"
+
 
 class ResultService(BaseService):
     """Computes and persists SubjectResult from MarksEntry data."""
 
     def __init__(self) -> None:
         self.repo = ResultRepository()
+        self.totals_repo = EnrollmentResultRepository()
 
     @transaction.atomic
     def compute_subject_result(
@@ -28,27 +45,27 @@ class ResultService(BaseService):
         enrollment_id: UUID,
         subject_id: UUID,
     ) -> SubjectResult:
-        """Compute aggregate marks for one enrollment+subject and upsert SubjectResult."""
+        """Compute aggregate marks for one enrollment+subject and upsert SubjectResult.
+
+        Refreshes the enrollment's totals and invalidates its stored ranks.
+        """
+        result = self._compute_subject_result(enrollment_id, subject_id)
+        self._results_changed([enrollment_id])
+        return result
+
+    def _compute_subject_result(self, enrollment_id: UUID, subject_id: UUID) -> SubjectResult:
         from academics.services.grading_service import GradingService
 
-        agg = (
+        totals = ResultEngine().compute(
             MarksEntry.objects.filter(
                 enrollment_id=enrollment_id,
                 subject_id=subject_id,
             )
-            .aggregate(
-                total_obtained=Sum("obtained_marks"),
-                total_full=Sum("full_marks"),
-            )
-        )
-
-        total_obtained = agg["total_obtained"] or 0
-        total_full = agg["total_full"] or 0
+        ).get((enrollment_id, subject_id))
 
-        if total_full == 0:
-            percentage = 0.0
-        else:
-            percentage = round((total_obtained / total_full) * 100, 2)
+        total_obtained = totals.total_obtained if totals else 0
+        total_full = totals.total_full if totals else 0
+        percentage = totals.percentage if totals else 0.0
 
         grading = GradingService()
         grade_label, grade_point = grading.calculate_grade(percentage)
@@ -85,8 +102,9 @@ class ResultService(BaseService):
 
         results = []
         for subject_id in subjects_with_marks:
-            result = self.compute_subject_result(enrollment_id, subject_id)
+            result = self._compute_subject_result(enrollment_id, subject_id)
             results.append(result)
+        self._results_changed([enrollment_id])
 
         self.log.info(
             "result.all_computed",
@@ -96,26 +114,318 @@ class ResultService(BaseService):
         return results
 
     @transaction.atomic
-    def refresh_all_results(self, session_id: UUID) -> int:
-        """Recompute all results for every enrollment in a session. Returns count."""
+    def refresh_all_results(self, session_id: UUID) -> dict:
+        """Recompute all results for every active enrollment in a session.
+
+        Set-based: marks are aggregated per (enrollment, subject) in one grouped
+        query, graded in memory and written back with a single bulk upsert.
+        Returns counts of inserted, updated and unchanged result rows.
+        """
+        summary = self._refresh_enrollments(session_id=session_id)
+        self.log.info("result.refresh_all", session_id=str(session_id), **summary)
+        return summary
+
+    @transaction.atomic
+    def refresh_section_results(
+        self, session_id: UUID, class_id: UUID, section_id: UUID
+    ) -> dict:
+        """refresh_all_results restricted to one class-section."""
+        summary = self._refresh_enrollments(
+            session_id=session_id, class_field_id=class_id, section_id=section_id
+        )
+        self.log.info(
+            "result.refresh_section",
+            session_id=str(session_id),
+            class_id=str(class_id),
+            section_id=str(section_id),
+            **summary,
+        )
+        return summary
+
+    def _refresh_enrollments(self, **enrollment_filter) -> dict:
         from enrollments.models import Enrollment
 
-        enrollment_ids = (
-            Enrollment.objects.filter(
-                session_id=session_id,
-                status="active",
+        enrollment_filter["status"] = "active"
+        related_filter = {f"enrollment__{k}": v for k, v in enrollment_filter.items()}
+        summary = self._bulk_recompute(
+            MarksEntry.objects.filter(**related_filter),
+            SubjectResult.objects.filter(**related_filter),
+        )
+        # Rebuild every total, not just changed ones, so grade policy edits apply.
+        self.refresh_enrollment_totals(
+            Enrollment.objects.filter(**enrollment_filter).values_list("id", flat=True)
+        )
+        return summary
+
+    def refresh_enrollment_totals(self, enrollment_ids: Iterable[UUID]) -> int:
+        """Rebuild EnrollmentResult rows from subject results in one grouped query.
+
+        Enrollments left without any subject result lose their totals row.
+        Returns the number of rows written.
+        """
+        enrollment_ids = set(enrollment_ids)
+        if not enrollment_ids:
+            return 0
+
+        totals = self._build_totals(enrollment_ids)
+        self.totals_repo.bulk_upsert(totals)
+        kept = {t.enrollment_id for t in totals}
+        self.totals_repo.delete_except(enrollment_ids, keep=kept)
+
+        from reporting.services.leaderboard_service import LeaderboardService
+
+        LeaderboardService().record(
+            {t.enrollment_id: float(t.percentage) for t in totals},
+            removed=enrollment_ids - kept,
+        )
+        return len(totals)
+
+    @staticmethod
+    def _build_totals(enrollment_ids: set[UUID]) -> list[EnrollmentResult]:
+        """Unsaved EnrollmentResult rows summed from subject results in one grouped query."""
+        from academics.services.grading_service import GradingService
+
+        sums = list(
+            SubjectResult.objects.filter(enrollment_id__in=enrollment_ids)
+            .values("enrollment_id")
+            .annotate(
+                total_obtained=Sum("total_obtained"),
+                total_full=Sum("total_full"),
+                subject_count=Count("id"),
             )
-            .values_list("id", flat=True)
+            .order_by()
         )
+        percentages = [
+            round((r["total_obtained"] / r["total_full"]) * 100, 2) if r["total_full"] else 0.0
+            for r in sums
+        ]
+        grades = GradingService().calculate_grades(percentages)
 
-        count = 0
-        for enrollment_id in enrollment_ids:
-            self.compute_all_results(enrollment_id)
-            count += 1
+        return [
+            EnrollmentResult(
+                enrollment_id=r["enrollment_id"],
+                total_obtained=r["total_obtained"],
+                total_full=r["total_full"],
+                percentage=Decimal(str(percentage)).quantize(Decimal("0.01")),
+                overall_grade=grade_label,
+                overall_grade_point=Decimal(str(grade_point)).quantize(Decimal("0.1")),
+                subject_count=r["subject_count"],
+            )
+            for r, percentage, (grade_label, grade_point) in zip(sums, percentages, grades)
+        ]
 
-        self.log.info(
-            "result.refresh_all",
-            session_id=str(session_id),
-            enrollments_processed=count,
+    def _results_changed(self, enrollment_ids: Iterable[UUID]) -> None:
+        """Rebuild totals and invalidate stored ranks after subject results were written."""
+        from reporting.services.ranking_service import RankingService
+
+        enrollment_ids = set(enrollment_ids)
+        self.refresh_enrollment_totals(enrollment_ids)
+        RankingService.invalidate_for_enrollments(enrollment_ids)
+
+    def get_enrollment_totals(self, enrollment) -> EnrollmentResult:
+        """Stored totals for an enrollment, summed in memory if the row is missing.
+
+        Read-only: a missing row is left for refresh_enrollment_totals to write.
+        Pass an enrollment loaded with ``select_related("result_summary")`` to
+        avoid an extra query. Enrollments without results get unsaved zero totals.
+        """
+        return self.get_totals_for_enrollments([enrollment])[enrollment.id]
+
+    def get_totals_for_enrollments(self, enrollments) -> dict[UUID, EnrollmentResult]:
+        """get_enrollment_totals for many enrollments, keyed by enrollment id.
+
+        Totals missing from the stored rows are summed together in one query.
+        """
+        totals: dict[UUID, EnrollmentResult] = {}
+        missing: set[UUID] = set()
+        for enrollment in enrollments:
+            summary = getattr(enrollment, "result_summary", None)
+            if summary is None:
+                missing.add(enrollment.id)
+            else:
+                totals[enrollment.id] = summary
+        if not missing:
+            return totals
+
+        totals.update((t.enrollment_id, t) for t in self._build_totals(missing))
+        if missing - totals.keys():
+            from academics.services.grading_service import GradingService
+
+            grade_label, _ = GradingService().calculate_grade(0.0)
+            for enrollment_id in missing - totals.keys():
+                totals[enrollment_id] = EnrollmentResult(
+                    enrollment_id=enrollment_id, overall_grade=grade_label
+                )
+        return totals
+
+    def mark_dirty(self, pairs: Iterable[tuple[UUID, UUID]]) -> None:
+        """Queue (enrollment, subject) pairs for a debounced background recompute.
+
+        Re-marking a pending pair only bumps its timestamp, so repeated edits to
+        the same cell collapse into one recompute.
+        """
+        now = timezone.now()
+        rows = [
+            PendingResultRecompute(enrollment_id=e, subject_id=s, marked_at=now)
+            for e, s in set(pairs)
+        ]
+        if not rows:
+            return
+        PendingResultRecompute.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=["enrollment", "subject"],
+            update_fields=["marked_at"],
         )
-        return count
+        transaction.on_commit(self._schedule_dirty_recompute)
+
+    def recompute_dirty(self, batch_size: int | None = None, **enrollment_filter) -> dict:
+        """Drain the pending queue in batches, recomputing only the marked pairs.
+
+        Each pending row is deleted only if its ``marked_at`` is still the value
+        read with the batch, so a pair re-marked by any transaction that commits
+        after that read stays queued for the next run. ``enrollment_filter``
+        (e.g. ``session_id=..., section_id=...``) drains just that scope.
+        """
+        batch_size = batch_size or settings.RESULT_RECOMPUTE_BATCH_SIZE
+        queue = PendingResultRecompute.objects.filter(
+            **{f"enrollment__{k}": v for k, v in enrollment_filter.items()}
+        )
+        totals = {"pairs": 0, "inserted": 0, "updated": 0, "unchanged": 0, "deleted": 0}
+
+        while True:
+            with transaction.atomic():
+                pending = list(
+                    queue.order_by("marked_at").values(
+                        "id", "enrollment_id", "subject_id", "marked_at"
+                    )[:batch_size]
+                )
+                if not pending:
+                    break
+
+                pairs = {(p["enrollment_id"], p["subject_id"]) for p in pending}
+                enrollment_ids = {e for e, _ in pairs}
+                subject_ids = {s for _, s in pairs}
+                summary = self._bulk_recompute(
+                    MarksEntry.objects.filter(
+                        enrollment_id__in=enrollment_ids, subject_id__in=subject_ids
+                    ),
+                    SubjectResult.objects.filter(
+                        enrollment_id__in=enrollment_ids, subject_id__in=subject_ids
+                    ),
+                    pairs=pairs,
+                )
+                PendingResultRecompute.objects.filter(
+                    reduce(
+                        operator.or_,
+                        (Q(id=p["id"], marked_at=p["marked_at"]) for p in pending),
+                    )
+                ).delete()
+
+            totals["pairs"] += len(pairs)
+            for key in ("inserted", "updated", "unchanged", "deleted"):
+                totals[key] += summary[key]
+
+        self.log.info("result.recompute_dirty", **totals)
+        return totals
+
+    @staticmethod
+    def _schedule_dirty_recompute() -> None:
+        """Enqueue one recompute per debounce window, however many writes land in it."""
+        debounce = settings.RESULT_RECOMPUTE_DEBOUNCE
+        if not cache.add(DIRTY_RECOMPUTE_SCHEDULED_KEY, 1, timeout=debounce):
+            return
+        from tasks.ranking_tasks import recompute_dirty_results
+
+        recompute_dirty_results.apply_async(countdown=debounce)
+
+    def _bulk_recompute(
+        self,
+        marks_qs: QuerySet[MarksEntry],
+        results_qs: QuerySet[SubjectResult],
+        pairs: set[tuple[UUID, UUID]] | None = None,
+    ) -> dict:
+        """Aggregate (via ResultEngine), grade and upsert results for the given marks.
+
+        When ``pairs`` is given, only those (enrollment, subject) keys are written.
+        Existing results whose marks have all been deleted are removed.
+        """
+        from academics.services.grading_service import GradingService
+
+        computed = ResultEngine().compute(marks_qs)
+
+        existing = {
+            (r["enrollment_id"], r["subject_id"]): r
+            for r in results_qs.values(
+                "id",
+                "enrollment_id",
+                "subject_id",
+                "total_obtained",
+                "total_full",
+                "percentage",
+                "grade",
+                "grade_point",
+            )
+        }
+
+        rows = [
+            (key, t.total_obtained, t.total_full, t.percentage)
+            for key, t in computed.items()
+            if pairs is None or key in pairs
+        ]
+
+        grades = GradingService().calculate_grades(r[3] for r in rows)
+
+        to_write: list[SubjectResult] = []
+        enrollment_ids: set[UUID] = set()
+        inserted = updated = unchanged = 0
+
+        for (key, total_obtained, total_full, percentage), (grade_label, grade_point) in zip(
+            rows, grades
+        ):
+            values = {
+                "total_obtained": total_obtained,
+                "total_full": total_full,
+                "percentage": Decimal(str(percentage)).quantize(Decimal("0.01")),
+                "grade": grade_label,
+                "grade_point": Decimal(str(grade_point)).quantize(Decimal("0.1")),
+            }
+            enrollment_ids.add(key[0])
+
+            current = existing.get(key)
+            if current is not None:
+                if all(current[field] == value for field, value in values.items()):
+                    unchanged += 1
+                    continue
+                updated += 1
+            else:
+                inserted += 1
+
+            result = SubjectResult(enrollment_id=key[0], subject_id=key[1], **values)
+            if current is not None:
+                result.id = current["id"]
+            to_write.append(result)
+
+        orphaned = [
+            key
+            for key in existing
+            if key not in computed and (pairs is None or key in pairs)
+        ]
+        if orphaned:
+            SubjectResult.objects.filter(
+                id__in=[existing[key]["id"] for key in orphaned]
+            ).delete()
+            enrollment_ids.update(e for e, _ in orphaned)
+
+        self.repo.bulk_upsert(to_write)
+        changed = {r.enrollment_id for r in to_write} | {e for e, _ in orphaned}
+        if changed:
+            self._results_changed(changed)
+
+        return {
+            "refreshed_enrollments": len(enrollment_ids),
+            "inserted": inserted,
+            "updated": updated,
+            "unchanged": unchanged,
+            "deleted": len(orphaned),
+        }
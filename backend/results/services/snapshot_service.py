@@ -0,0 +1,122 @@
+"""Result snapshot service: freezes published results for cheap portal reads."""
+
+from __future__ import annotations
+
+from dataclasses import replace
+from decimal import Decimal
+from uuid import UUID
+
+import structlog
+from django.db import transaction
+
+from shared.base_service import BaseService
+from results.models import ResultPublication, ResultSnapshot
+
+logger = structlog.get_logger(__name__)
+
+
+class ResultSnapshotService(BaseService):
+    """Materializes and serves per-enrollment snapshots of published results."""
+
+    @transaction.atomic
+    def materialize(self, publication: ResultPublication) -> int:
+        """Compute report cards, marksheets and ranks for the section once and store them.
+
+        Snapshots are serialized with the student portal serializers, so a
+        published result has the same shape as the live one. Replaces any
+        earlier snapshot of the same publication. Returns the number of
+        snapshots written.
+        """
+        from reporting.services.marksheet_service import MarksheetService
+        from reporting.services.ranking_service import RankingService
+        from reporting.services.report_card_service import ReportCardService
+        from student.api.serializers import MarksheetSerializer, ReportCardSerializer
+
+        scope = (
+            publication.class_field_id,
+            publication.section_id,
+            publication.session_id,
+        )
+        rankings = RankingService().compute_class_rankings(*scope)
+        report_cards = {
+            r.student_id: r for r in ReportCardService().generate_class_report_cards(*scope)
+        }
+        marksheets = {
+            m.student_id: m for m in MarksheetService().generate_class_marksheet(*scope)
+        }
+
+        snapshots = []
+        for ranking in rankings:
+            report = report_cards.get(ranking["student_id"])
+            marksheet = marksheets.get(ranking["student_id"])
+            if report is None or marksheet is None:
+                continue
+            report = replace(report, rank=ranking["rank"])
+            marksheet = replace(marksheet, rank=ranking["rank"])
+            snapshots.append(
+                ResultSnapshot(
+                    publication=publication,
+                    enrollment_id=UUID(ranking["enrollment_id"]),
+                    report_card=ReportCardSerializer(report).data,
+                    marksheet=MarksheetSerializer(marksheet).data,
+                    rank=ranking["rank"],
+                    total_students=len(rankings),
+                    total_obtained=report.total_marks,
+                    total_full=report.total_full,
+                    percentage=report.percentage,
+                    overall_grade=report.overall_grade,
+                )
+            )
+
+        ResultSnapshot.objects.filter(publication=publication).delete()
+        ResultSnapshot.objects.bulk_create(snapshots, batch_size=500)
+        self.log.info(
+            "snapshot.materialized",
+            publication_id=str(publication.id),
+            count=len(snapshots),
+        )
+        return len(snapshots)
+
+    def discard(self, publication: ResultPublication) -> int:
+        deleted, _ = ResultSnapshot.objects.filter(publication=publication).delete()
+        self.log.info(
+            "snapshot.discarded",
+            publication_id=str(publication.id),
+            count=deleted,
+        )
+        return deleted
+
+    def get_published(self, enrollment_id: UUID) -> ResultSnapshot | None:
+        """Return the live snapshot for an enrollment, or None if not published."""
+        return (
+            ResultSnapshot.objects.filter(
+                enrollment_id=enrollment_id,
+                publication__status="published",
+            )
+            .order_by("-created_at")
+            .first()
+        )
+
+    def get_published_for_student(
+        self, student_id: UUID, session_id: UUID
+    ) -> ResultSnapshot | None:
+        return (
+            ResultSnapshot.objects.filter(
+                enrollment__student_id=student_id,
+                enrollment__session_id=session_id,
+                publication__status="published",
+            )
+            .order_by("-created_at")
+            .first()
+        )
+
+    @staticmethod
+    def ranking_payload(snapshot: ResultSnapshot) -> dict:
+        return {
+            "rank": snapshot.rank,
+            "total_students": snapshot.total_students,
+            "percentage": Decimal(snapshot.percentage),
+            "grade": snapshot.overall_grade,
+            "class_rank": snapshot.report_card.get("class_rank"),
+            "percentile": snapshot.report_card.get("percentile"),
+        }
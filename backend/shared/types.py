@@ -99,6 +99,8 @@ class SubjectResultDTO:
     percentage: Decimal
     grade: str
     grade_point: Decimal
+    subject_name: str = ""
+    subject_code: str = ""
 
 
 @dataclass(frozen=True)
@@ -125,6 +127,8 @@ class ReportCardDTO:
     percentage: Decimal = Decimal("0")
     overall_grade: str = ""
     rank: int | None = None
+    class_rank: int | None = None
+    percentile: float | None = None
 
 
 @dataclass(frozen=True)
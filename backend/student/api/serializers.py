@@ -33,6 +33,17 @@ class SubjectResultSerializer(serializers.Serializer):
     grade_point = serializers.DecimalField(max_digits=3, decimal_places=1)
 
 
+class ReportCardResultSerializer(serializers.Serializer):
+    subject_id = serializers.UUIDField()
+    subject_name = serializers.CharField()
+    subject_code = serializers.CharField()
+    total_obtained = serializers.IntegerField()
+    total_full = serializers.IntegerField()
+    percentage = serializers.DecimalField(max_digits=5, decimal_places=2)
+    grade = serializers.CharField()
+    grade_point = serializers.DecimalField(max_digits=3, decimal_places=1)
+
+
 class ReportCardSerializer(serializers.Serializer):
     student_name = serializers.CharField()
     student_id = serializers.CharField()
@@ -40,12 +51,14 @@ class ReportCardSerializer(serializers.Serializer):
     class_name = serializers.CharField()
     section_name = serializers.CharField()
     session_name = serializers.CharField()
-    results = SubjectResultSerializer(many=True)
+    results = ReportCardResultSerializer(many=True)
     total_marks = serializers.IntegerField()
     total_full = serializers.IntegerField()
     percentage = serializers.DecimalField(max_digits=5, decimal_places=2)
     overall_grade = serializers.CharField()
     rank = serializers.IntegerField(allow_null=True)
+    class_rank = serializers.IntegerField(allow_null=True, required=False)
+    percentile = serializers.FloatField(allow_null=True, required=False)
 
 
 class AssessmentDetailSerializer(serializers.Serializer):
@@ -89,6 +102,9 @@ class RankingSerializer(serializers.Serializer):
     total_students = serializers.IntegerField(allow_null=True)
     percentage = serializers.DecimalField(max_digits=5, decimal_places=2, allow_null=True)
     grade = serializers.CharField(allow_null=True)
+    class_rank = serializers.IntegerField(allow_null=True, required=False)
+    class_size = serializers.IntegerField(allow_null=True, required=False)
+    percentile = serializers.FloatField(allow_null=True, required=False)
 
 
 class EnrollmentHistorySerializer(serializers.Serializer):
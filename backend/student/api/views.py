@@ -14,6 +14,7 @@ from results.models import SubjectResult
 from reporting.services.ranking_service import RankingService
 from reporting.services.report_card_service import ReportCardService
 from reporting.services.marksheet_service import MarksheetService
+from results.services.snapshot_service import ResultSnapshotService
 
 from .serializers import (
     StudentProfileSerializer,
@@ -151,6 +152,10 @@ class StudentReportCardView(APIView):
             session_id=session_uuid,
         )
 
+        snapshot = ResultSnapshotService().get_published(enrollment.id)
+        if snapshot is not None:
+            return Response(snapshot.report_card)
+
         service = ReportCardService()
         report = service.generate_student_report_card(enrollment.id)
 
@@ -187,6 +192,10 @@ class StudentMarksheetView(APIView):
             session_id=session_uuid,
         )
 
+        snapshot = ResultSnapshotService().get_published(enrollment.id)
+        if snapshot is not None:
+            return Response(snapshot.marksheet)
+
         service = MarksheetService()
         marksheet = service.generate_student_marksheet(enrollment.id)
 
@@ -217,6 +226,13 @@ class StudentRankingView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
+        snapshot_svc = ResultSnapshotService()
+        snapshot = snapshot_svc.get_published_for_student(student.id, session_uuid)
+        if snapshot is not None:
+            return Response(
+                RankingSerializer(snapshot_svc.ranking_payload(snapshot)).data
+            )
+
         service = RankingService()
         ranking = service.get_student_rank(
             student_id=student.id,
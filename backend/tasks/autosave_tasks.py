@@ -0,0 +1,24 @@
+"""Celery tasks for marks autosave."""
+
+from __future__ import annotations
+
+import structlog
+from tasks.celery_app import app
+
+logger = structlog.get_logger(__name__)
+
+
+@app.task(bind=True, queue="compute", max_retries=3, default_retry_delay=5)
+def flush_marks_autosave(self, user_id: str) -> dict:
+    """Write out a teacher's buffered autosave cells if nothing flushed them first."""
+    from uuid import UUID
+
+    from results.services.autosave_service import MarksAutosaveService
+
+    try:
+        counts = MarksAutosaveService().flush(UUID(user_id))
+        logger.info("task.flush_marks_autosave.success", user_id=user_id, **counts)
+        return counts
+    except Exception as exc:
+        logger.error("task.flush_marks_autosave.failed", user_id=user_id, error=str(exc))
+        raise self.retry(exc=exc)
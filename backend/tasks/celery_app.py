@@ -20,5 +20,7 @@ app.conf.update(
     task_routes={
         "tasks.report_tasks.*": {"queue": "reports"},
         "tasks.ranking_tasks.*": {"queue": "compute"},
+        "tasks.import_tasks.*": {"queue": "compute"},
+        "tasks.autosave_tasks.*": {"queue": "compute"},
     },
 )
@@ -0,0 +1,24 @@
+"""Celery tasks for marks imports."""
+
+from __future__ import annotations
+
+import structlog
+from tasks.celery_app import app
+
+logger = structlog.get_logger(__name__)
+
+
+@app.task(bind=True, queue="compute", max_retries=0)
+def run_marks_import(self, job_id: str) -> dict:
+    """Stream an uploaded marks sheet into marks entries chunk by chunk."""
+    from results.services.marks_import_service import MarksImportService
+
+    job = MarksImportService().run(job_id)
+    logger.info(
+        "task.marks_import.finished",
+        job_id=job_id,
+        status=job.status,
+        rows=job.rows_processed,
+        failed=job.rows_failed,
+    )
+    return {"status": job.status, "rows_processed": job.rows_processed}
@@ -3,6 +3,8 @@
 from __future__ import annotations
 
 import structlog
+from celery import chord
+
 from tasks.celery_app import app
 
 logger = structlog.get_logger(__name__)
@@ -10,29 +12,24 @@ logger = structlog.get_logger(__name__)
 
 @app.task(bind=True, queue="compute", max_retries=3, default_retry_delay=120)
 def compute_class_rankings(self, session_id: str, class_id: str | None = None) -> dict:
-    """Compute rankings for a session/class (all sections)."""
+    """Compute and store section rank, class rank and percentile for a session.
+
+    Class ranks and percentiles span sections, so the whole session is ranked
+    in one pass even when ``class_id`` is given.
+    """
     try:
-        from reporting.services.ranking_service import RankingService
-        from academics.models import Section
-
-        service = RankingService()
-        total = 0
-
-        if class_id:
-            sections = Section.objects.filter(class_ref_id=class_id)
-            for section in sections:
-                results = service.compute_class_rankings(class_id, str(section.id), session_id)
-                total += len(results)
-        else:
-            from academics.models import Class
-            classes = Class.objects.filter(is_active=True)
-            for cls in classes:
-                sections = Section.objects.filter(class_ref=cls)
-                for section in sections:
-                    results = service.compute_class_rankings(str(cls.id), str(section.id), session_id)
-                    total += len(results)
-
-        logger.info("task.rankings.success", session_id=session_id, count=total)
+        from django.core.cache import cache
+        from reporting.services.ranking_service import (
+            RECOMPUTE_SCHEDULED_KEY,
+            RankingService,
+        )
+
+        # Invalidations landing while we run must schedule a follow-up pass.
+        cache.delete(RECOMPUTE_SCHEDULED_KEY.format(session_id=session_id))
+        rankings = RankingService().persist_session_rankings(session_id)
+        total = len(rankings)
+
+        logger.info("task.rankings.success", session_id=session_id, class_id=class_id, count=total)
         return {"status": "success", "count": total}
     except Exception as exc:
         logger.error("task.rankings.failed", session_id=session_id, error=str(exc))
@@ -41,13 +38,114 @@ def compute_class_rankings(self, session_id: str, class_id: str | None = None) -
 
 @app.task(bind=True, queue="compute", max_retries=3, default_retry_delay=60)
 def refresh_subject_results(self, session_id: str) -> dict:
-    """Recompute all subject_results from marks_entries for a session."""
+    """Recompute all subject_results for a session, one subtask per class-section.
+
+    The sections run as a chord on the compute queue; each retries on its own,
+    and the callback aggregates their summaries and re-ranks the session.
+    """
     try:
-        from results.services.result_service import ResultService
-        service = ResultService()
-        count = service.refresh_all_results(session_id)
-        logger.info("task.refresh_results.success", session_id=session_id, count=count)
-        return {"status": "success", "count": count}
+        from enrollments.models import Enrollment
+
+        sections = list(
+            Enrollment.objects.filter(session_id=session_id, status="active")
+            .values_list("class_field_id", "section_id")
+            .distinct()
+        )
+        if not sections:
+            return summarize_section_refreshes([], session_id)
+
+        result = chord([
+            refresh_section_results.s(session_id, str(class_id), str(section_id))
+            for class_id, section_id in sections
+        ])(summarize_section_refreshes.s(session_id))
+        logger.info(
+            "task.refresh_results.dispatched",
+            session_id=session_id,
+            sections=len(sections),
+        )
+        return {"status": "dispatched", "sections": len(sections), "summary_task_id": result.id}
     except Exception as exc:
         logger.error("task.refresh_results.failed", session_id=session_id, error=str(exc))
         raise self.retry(exc=exc)
+
+
+@app.task(bind=True, queue="compute", max_retries=3, default_retry_delay=60)
+def refresh_section_results(self, session_id: str, class_id: str, section_id: str) -> dict:
+    """Recompute subject_results for one class-section of a session."""
+    try:
+        from results.services.result_service import ResultService
+
+        summary = ResultService().refresh_section_results(session_id, class_id, section_id)
+        logger.info(
+            "task.refresh_section.success",
+            session_id=session_id,
+            class_id=class_id,
+            section_id=section_id,
+            **summary,
+        )
+        return summary
+    except Exception as exc:
+        logger.error(
+            "task.refresh_section.failed",
+            session_id=session_id,
+            section_id=section_id,
+            error=str(exc),
+        )
+        raise self.retry(exc=exc)
+
+
+@app.task(bind=True, queue="compute", max_retries=3, default_retry_delay=60)
+def summarize_section_refreshes(self, summaries: list[dict], session_id: str) -> dict:
+    """Chord callback: add up the section summaries and re-rank the session."""
+    try:
+        from reporting.services.ranking_service import RankingService
+
+        totals = {
+            "refreshed_enrollments": 0,
+            "inserted": 0,
+            "updated": 0,
+            "unchanged": 0,
+            "deleted": 0,
+        }
+        for summary in summaries:
+            for key in totals:
+                totals[key] += summary[key]
+        ranked = len(RankingService().persist_session_rankings(session_id))
+
+        logger.info(
+            "task.refresh_results.success",
+            session_id=session_id,
+            sections=len(summaries),
+            ranked=ranked,
+            **totals,
+        )
+        return {
+            "status": "success",
+            "count": totals["refreshed_enrollments"],
+            "sections": len(summaries),
+            "ranked": ranked,
+            **totals,
+        }
+    except Exception as exc:
+        logger.error("task.refresh_results.summary_failed", session_id=session_id, error=str(exc))
+        raise self.retry(exc=exc)
+
+
+@app.task(bind=True, queue="compute", max_retries=3, default_retry_delay=30)
+def recompute_dirty_results(self) -> dict:
+    """Recompute subject_results for (enrollment, subject) pairs touched by marks writes."""
+    try:
+        from django.core.cache import cache
+        from results.services.result_service import (
+            DIRTY_RECOMPUTE_SCHEDULED_KEY,
+            ResultService,
+        )
+
+        # Writes landing while we run must schedule a follow-up pass.
+        cache.delete(DIRTY_RECOMPUTE_SCHEDULED_KEY)
+        summary = ResultService().recompute_dirty()
+        logger.info("task.recompute_dirty.success", **summary)
+        return {"status": "success", **summary}
+    except Exception as exc:
+        logger.error("task.recompute_dirty.failed", error=str(exc))
+        raise self.retry(exc=exc)
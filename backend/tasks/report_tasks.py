@@ -48,3 +48,116 @@ def generate_class_marksheet(self, class_id: str, section_id: str, session_id: s
     except Exception as exc:
         logger.error("task.class_marksheet.failed", class_id=class_id, error=str(exc))
         raise self.retry(exc=exc)
+
+
+# Whole-session exports outlive the default task time limits.
+@app.task(bind=True, queue="reports", max_retries=0, soft_time_limit=1800, time_limit=1860)
+def run_export_job(self, job_id: str) -> dict:
+    """Render a PDF/Excel export job into media storage."""
+    from reporting.services.export_job_service import ExportJobService
+
+    job = ExportJobService().run(job_id)
+    logger.info(
+        "task.export_job.finished",
+        job_id=job_id,
+        kind=job.kind,
+        status=job.status,
+        items=job.items_total,
+    )
+    return {"status": job.status, "items_total": job.items_total}
+
+
+@app.task(bind=True, queue="reports", max_retries=3, default_retry_delay=30)
+def render_export_chunk(self, job_id: str, index: int, chunk: dict) -> str:
+    """Chord member: render one chunk of a fanned-out PDF export job to a part file."""
+    from reporting.services.export_job_service import ExportJobService
+
+    service = ExportJobService()
+    try:
+        return service.render_chunk(job_id, index, chunk)
+    except Exception as exc:
+        logger.error("task.export_chunk.failed", job_id=job_id, index=index, error=str(exc))
+        if self.request.retries >= self.max_retries:
+            service.fail(job_id, str(exc))
+            raise
+        raise self.retry(exc=exc)
+
+
+@app.task(bind=True, queue="reports", max_retries=0, soft_time_limit=1800, time_limit=1860)
+def merge_export_chunks(self, paths: list[str], job_id: str, digest: str) -> dict:
+    """Chord callback: merge a fanned-out PDF export job's parts and complete the job."""
+    from reporting.services.export_job_service import ExportJobService
+
+    job = ExportJobService().merge_chunks(job_id, paths, digest)
+    logger.info(
+        "task.export_job.finished",
+        job_id=job_id,
+        kind=job.kind,
+        status=job.status,
+        items=job.items_total,
+        chunks=len(paths),
+    )
+    return {"status": job.status, "items_total": job.items_total}
+
+
+@app.task(bind=True, queue="reports", max_retries=3, default_retry_delay=60)
+def fail_stale_export_jobs(self) -> dict:
+    """Periodic: mark export jobs whose worker died mid-render as failed."""
+    try:
+        from reporting.services.export_job_service import ExportJobService
+
+        failed = ExportJobService().fail_stale()
+        logger.info("task.fail_stale_export_jobs.success", count=failed)
+        return {"status": "success", "count": failed}
+    except Exception as exc:
+        logger.error("task.fail_stale_export_jobs.failed", error=str(exc))
+        raise self.retry(exc=exc)
+
+
+@app.task(bind=True, queue="reports", max_retries=3, default_retry_delay=300)
+def evict_export_cache(self) -> dict:
+    """Periodic: delete cached export artifacts nothing recent refers to."""
+    try:
+        from reporting.services.export_cache_service import ExportCacheService
+
+        deleted = ExportCacheService().evict()
+        logger.info("task.evict_export_cache.success", count=deleted)
+        return {"status": "success", "count": deleted}
+    except Exception as exc:
+        logger.error("task.evict_export_cache.failed", error=str(exc))
+        raise self.retry(exc=exc)
+
+
+@app.task(
+    bind=True,
+    queue="reports",
+    acks_late=True,
+    max_retries=5,
+    default_retry_delay=30,
+    soft_time_limit=1800,
+    time_limit=1860,
+)
+def generate_session_report_cards(self, job_id: str) -> dict:
+    """Generate report cards for every section of a session, resuming from checkpoints.
+
+    A retry (including one after a soft time-limit) or a redelivery after a worker
+    crash picks up at the first section without a checkpoint.
+    """
+    from reporting.services.report_generation_service import ReportGenerationService
+
+    service = ReportGenerationService()
+    try:
+        job = service.run(job_id)
+    except Exception as exc:
+        logger.error("task.session_report_cards.failed", job_id=job_id, error=str(exc))
+        if self.request.retries >= self.max_retries:
+            service.fail(job_id, str(exc))
+            raise
+        raise self.retry(exc=exc)
+    logger.info(
+        "task.session_report_cards.success",
+        job_id=job_id,
+        sections=job.sections_done,
+        students=job.students_done,
+    )
+    return {"status": job.status, "sections_done": job.sections_done}
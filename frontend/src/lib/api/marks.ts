@@ -1,5 +1,5 @@
 import api from './client';
-import type { MarksEntry } from '@/types';
+import type { BulkUpsertMarksResponse, MarksEntry } from '@/types';
 
 export const marksApi = {
   getAll: async (params?: {
@@ -19,7 +19,7 @@ export const marksApi = {
   update: async (id: string, data: Partial<MarksEntry>): Promise<MarksEntry> => {
     return api.patch<MarksEntry>(`/results/subject-marks/${id}/`, data);
   },
-  bulkUpsert: async (marks: Partial<MarksEntry>[]): Promise<MarksEntry[]> => {
-    return api.post<MarksEntry[]>('/results/subject-marks/bulk-upsert/', { marks });
+  bulkUpsert: async (marks: Partial<MarksEntry>[]): Promise<BulkUpsertMarksResponse> => {
+    return api.post<BulkUpsertMarksResponse>('/results/subject-marks/bulk-upsert/', { marks });
   },
 };
@@ -27,6 +27,7 @@ export type {
 
 export type {
   MarksEntry,
+  BulkUpsertMarksResponse,
   SubjectResult,
 } from './marks';
 
@@ -13,6 +13,13 @@ export interface MarksEntry {
   subject?: { id: string; name: string };
 }
 
+export interface BulkUpsertMarksResponse {
+  created: number;
+  updated: number;
+  unchanged: number;
+  entries: MarksEntry[];
+}
+
 export interface SubjectResult {
   id: string;
   student_id: string;